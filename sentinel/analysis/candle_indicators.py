@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """``y[0] = x[0]; y[i] = (1 - alpha) * y[i-1] + alpha * x[i]`` over *values*."""
+    if values.size == 0:
+        return np.empty(0, dtype=np.float64)
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+class CandleIndicators:
+    """Heikin-Ashi candles and an EMA of the closes, kept in step with a candle series.
+
+    `recompute` rebuilds everything from full OHLC arrays in vectorized form
+    (history loads and replacements). After that, `update_last` and `append`
+    advance the state one bar at a time, since both indicators only depend on
+    the previous bar's values: a live tick costs O(1) instead of a pass over
+    the whole history. `trim` drops bars from the front the same way the
+    chart does, keeping the remaining values (and their seed) unchanged.
+
+    Like `OHLCVBuffer`, the bars live in a preallocated block: `append`
+    writes into spare capacity, which doubles when it runs out, and `trim`
+    only advances the start of the live window, so both are amortized O(1).
+    """
+
+    def __init__(self, ema_span: int = 20) -> None:
+        self.ema_span = ema_span
+        self.ema_alpha = 2.0 / (ema_span + 1.0)
+        # Rows: HA open, HA high, HA low, HA close, EMA; bars [_start, _end) are live
+        self._data = np.empty((5, 0), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def _values(self) -> np.ndarray:
+        return self._data[:, self._start:self._end]
+
+    @property
+    def heikin_ashi(self) -> np.ndarray:
+        """(4, n) HA open, high, low and close."""
+        return self._values[:4]
+
+    @property
+    def ema(self) -> np.ndarray:
+        return self._values[4]
+
+    def clear(self) -> None:
+        self._start = 0
+        self._end = 0
+
+    def recompute(self, opens, highs, lows, closes) -> None:
+        """Rebuild both indicators from full OHLC arrays."""
+        opens, highs, lows, closes = (np.asarray(v, dtype=np.float64) for v in (opens, highs, lows, closes))
+        if opens.size == 0:
+            self.clear()
+            return
+        ha_close = (opens + highs + lows + closes) / 4.0
+        # HA open is the midpoint of the previous HA candle: an EWM with alpha 1/2
+        # over the previous HA closes, seeded with the first bar's (open + close) / 2.
+        seeds = np.empty_like(ha_close)
+        seeds[0] = (opens[0] + closes[0]) / 2.0
+        seeds[1:] = ha_close[:-1]
+        ha_open = _ewm(seeds, 0.5)
+        self._data = np.vstack(
+            [
+                ha_open,
+                np.maximum(highs, np.maximum(ha_open, ha_close)),
+                np.minimum(lows, np.minimum(ha_open, ha_close)),
+                ha_close,
+                _ewm(closes, self.ema_alpha),
+            ]
+        )
+        self._start = 0
+        self._end = opens.size
+
+    def _bar(self, previous: np.ndarray | None, o: float, h: float, l: float, c: float) -> np.ndarray:
+        ha_close = (o + h + l + c) / 4.0
+        if previous is None:
+            ha_open = (o + c) / 2.0
+            ema = c
+        else:
+            ha_open = (previous[0] + previous[3]) / 2.0
+            ema = previous[4] + self.ema_alpha * (c - previous[4])
+        return np.array(
+            [ha_open, max(h, ha_open, ha_close), min(l, ha_open, ha_close), ha_close, ema], dtype=np.float64
+        )
+
+    def update_last(self, o: float, h: float, l: float, c: float) -> None:
+        """Re-derive the last bar after the live candle changed."""
+        if len(self) == 0:
+            return
+        previous = self._data[:, self._end - 2] if len(self) > 1 else None
+        self._data[:, self._end - 1] = self._bar(previous, o, h, l, c)
+
+    def append(self, o: float, h: float, l: float, c: float) -> None:
+        """Extend the indicators with a new candle."""
+        previous = self._data[:, self._end - 1] if len(self) else None
+        bar = self._bar(previous, o, h, l, c)
+        if self._end == self._data.shape[1]:
+            self._reserve()
+        self._data[:, self._end] = bar
+        self._end += 1
+
+    def trim(self, count: int) -> None:
+        """Keep only the last *count* bars."""
+        if len(self) > count:
+            self._start = self._end - count
+
+    def _reserve(self) -> None:
+        """Move the live bars to the front of a block with room for as many again."""
+        live = len(self)
+        fresh = np.empty((5, max(2 * live, 64)), dtype=np.float64)
+        fresh[:, :live] = self._values
+        self._data = fresh
+        self._start = 0
+        self._end = live
@@ -0,0 +1,327 @@
+import logging
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+class OrderBookSide:
+    """One side of an incrementally maintained order book.
+
+    Raw levels live in a ``price -> qty`` dict. For every tick size a consumer
+    has asked for, tick buckets (``bucket index -> [qty, level count]``) are
+    kept in step with each level change, so an update costs O(changed levels)
+    instead of re-aggregating the whole side. Bids bucket down (floor) and
+    asks bucket up (ceil), matching `OrderBookProcessor._vector_aggregate`.
+    """
+
+    # Tick sizes tracked incrementally at once; older ones are rebuilt on demand
+    max_bucketings = 4
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: dict[float, float] = {}
+        self._sorted = None  # (prices ascending, qtys) cache, None when stale
+        self._bucketings: "OrderedDict[float, dict[int, list]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def _bucket_index(self, price: float, tick: float) -> int:
+        scaled = price / tick
+        return math.floor(scaled) if self.is_bid else math.ceil(scaled)
+
+    def set_level(self, price: float, qty: float) -> bool:
+        """Set (or remove, when ``qty <= 0``) one price level. Returns True if it changed."""
+        old = self.levels.get(price)
+        if qty <= 0:
+            if old is None:
+                return False
+            del self.levels[price]
+            delta_qty, delta_count = -old, -1
+        else:
+            if old == qty:
+                return False
+            self.levels[price] = qty
+            delta_qty = qty - (old or 0.0)
+            delta_count = 0 if old is not None else 1
+
+        for tick, buckets in self._bucketings.items():
+            index = self._bucket_index(price, tick)
+            entry = buckets.get(index)
+            if entry is None:
+                buckets[index] = [delta_qty, delta_count]
+                continue
+            entry[0] += delta_qty
+            entry[1] += delta_count
+            if entry[1] <= 0:
+                # Drop emptied buckets so float residue never shows as depth
+                del buckets[index]
+        self._sorted = None
+        return True
+
+    def sorted_levels(self):
+        """Return raw levels as ``(prices ascending, qtys)`` arrays."""
+        if self._sorted is None:
+            count = len(self.levels)
+            prices = np.fromiter(self.levels.keys(), dtype=np.float64, count=count)
+            qtys = np.fromiter(self.levels.values(), dtype=np.float64, count=count)
+            order = np.argsort(prices)
+            self._sorted = (prices[order], qtys[order])
+        return self._sorted
+
+    def diff(self, snapshot):
+        """Return the ``(prices, qtys)`` changes that turn this side into *snapshot*.
+
+        Removed levels are reported with qty 0. The comparison is vectorized,
+        so only the changed levels are touched in Python afterwards.
+        """
+        new = np.asarray(snapshot, dtype=np.float64) if len(snapshot) else np.empty((0, 2))
+        if new.ndim != 2 or new.shape[1] < 2:
+            raise ValueError(f"expected [[price, qty], ...], got shape {new.shape}")
+        new = new[new[:, 1] > 0, :2]
+        order = np.argsort(new[:, 0], kind="stable")
+        new_prices, new_qtys = new[order, 0], new[order, 1]
+        old_prices, old_qtys = self.sorted_levels()
+
+        if old_prices.size == 0:
+            return new_prices, new_qtys, (new_prices, new_qtys)
+
+        idx = np.minimum(np.searchsorted(old_prices, new_prices), old_prices.size - 1)
+        matched = old_prices[idx] == new_prices
+        changed = ~matched | (old_qtys[idx] != new_qtys)
+
+        if new_prices.size:
+            back = np.minimum(np.searchsorted(new_prices, old_prices), new_prices.size - 1)
+            removed = new_prices[back] != old_prices
+        else:
+            removed = np.ones(old_prices.size, dtype=bool)
+
+        prices = np.concatenate((new_prices[changed], old_prices[removed]))
+        qtys = np.concatenate((new_qtys[changed], np.zeros(int(removed.sum()))))
+        return prices, qtys, (new_prices, new_qtys)
+
+    def buckets(self, tick: float) -> dict:
+        """Tick buckets for *tick*, built once and then maintained incrementally."""
+        buckets = self._bucketings.get(tick)
+        if buckets is not None:
+            self._bucketings.move_to_end(tick)
+            return buckets
+        buckets = {}
+        for price, qty in self.levels.items():
+            index = self._bucket_index(price, tick)
+            entry = buckets.get(index)
+            if entry is None:
+                buckets[index] = [qty, 1]
+            else:
+                entry[0] += qty
+                entry[1] += 1
+        self._bucketings[tick] = buckets
+        while len(self._bucketings) > self.max_bucketings:
+            self._bucketings.popitem(last=False)
+        return buckets
+
+    def aggregated(self, tick: float):
+        """Return ``(prices, qtys)`` per tick bucket, best price first."""
+        buckets = self.buckets(tick)
+        count = len(buckets)
+        indices = np.fromiter(buckets.keys(), dtype=np.float64, count=count)
+        qtys = np.fromiter((entry[0] for entry in buckets.values()), dtype=np.float64, count=count)
+        order = np.argsort(-indices) if self.is_bid else np.argsort(indices)
+        return indices[order] * tick, qtys[order]
+
+    def best_first(self):
+        """Return raw ``(prices, qtys)`` with the best price first."""
+        prices, qtys = self.sorted_levels()
+        if self.is_bid:
+            return prices[::-1], qtys[::-1]
+        return prices, qtys
+
+
+class _SnapshotSide:
+    """Frozen copy of one `OrderBookSide`, with the same read interface."""
+
+    def __init__(self, is_bid: bool, prices: np.ndarray, qtys: np.ndarray):
+        self.is_bid = is_bid
+        self._prices = prices
+        self._qtys = qtys
+
+    def __len__(self) -> int:
+        return self._prices.size
+
+    def sorted_levels(self):
+        return self._prices, self._qtys
+
+    def best_first(self):
+        if self.is_bid:
+            return self._prices[::-1], self._qtys[::-1]
+        return self._prices, self._qtys
+
+    def aggregated(self, tick: float):
+        """`OrderBookSide.aggregated`, vectorized over the sorted levels."""
+        scaled = self._prices / tick
+        indices = np.floor(scaled) if self.is_bid else np.ceil(scaled)
+        if indices.size == 0:
+            return indices, indices.copy()
+        # Prices ascend, so equal bucket indices are contiguous runs
+        starts = np.flatnonzero(np.concatenate(([True], indices[1:] != indices[:-1])))
+        prices, qtys = indices[starts] * tick, np.add.reduceat(self._qtys, starts)
+        if self.is_bid:
+            return prices[::-1], qtys[::-1]
+        return prices, qtys
+
+
+class BookSnapshot:
+    """Immutable point-in-time view of an `OrderBookModel`.
+
+    It exposes the read side of the model (``bids``/``asks`` with
+    ``best_first``, `processed`, ``empty``) over arrays that are never
+    mutated afterwards, so it can be handed to a worker thread while the
+    live model keeps applying updates on the GUI thread.
+    """
+
+    def __init__(self, exchange: str, symbol: str, version: int, bids: _SnapshotSide, asks: _SnapshotSide):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.version = version
+        self.bids = bids
+        self.asks = asks
+        self._processed = {}
+
+    @property
+    def empty(self) -> bool:
+        return not len(self.bids) or not len(self.asks)
+
+    def sides(self, tick_size: float, aggregate: bool):
+        if aggregate and tick_size > 0:
+            return self.bids.aggregated(tick_size), self.asks.aggregated(tick_size)
+        return self.bids.best_first(), self.asks.best_first()
+
+    def processed(self, tick_size: float, aggregate: bool):
+        """Same rows as `OrderBookModel.processed` for this snapshot."""
+        key = (float(tick_size), True) if aggregate and tick_size > 0 else (None, False)
+        cached = self._processed.get(key)
+        if cached is None:
+            (bid_prices, bid_qtys), (ask_prices, ask_qtys) = self.sides(tick_size, aggregate)
+            bids = np.column_stack((bid_prices, bid_qtys, np.cumsum(bid_qtys)))
+            asks = np.column_stack((ask_prices, ask_qtys, np.cumsum(ask_qtys)))
+            bids.flags.writeable = False
+            asks.flags.writeable = False
+            cached = self._processed[key] = (bids, asks)
+        return cached
+
+
+class OrderBookModel:
+    """Persistent book for one (exchange, symbol), updated by level deltas.
+
+    Feeds that deliver deltas call `apply_deltas`; feeds that deliver full
+    books (ccxt ``watch_order_book``) call `apply_snapshot`, which diffs the
+    payload against the current state and applies only what changed.
+    ``version`` increases on every effective change so readers can tell when
+    cached derived data is stale.
+
+    `processed` memoizes the cumulative ``[[price, qty, cum], ...]`` sides per
+    (tick size, aggregation) and version, so every widget rendering the same
+    book at the same tick shares one computation per update.
+    """
+
+    # (tick size, aggregation) views memoized at once
+    max_processed_views = 4
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.bids = OrderBookSide(is_bid=True)
+        self.asks = OrderBookSide(is_bid=False)
+        self.version = 0
+        self.nonce = None
+        self.timestamp = None
+        self.last_changed_levels = 0
+        self._processed: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.processed_hits = 0
+        self.processed_misses = 0
+        self._snapshot = None
+
+    @property
+    def empty(self) -> bool:
+        return not self.bids.levels or not self.asks.levels
+
+    def apply_deltas(self, bids=(), asks=(), nonce=None, timestamp=None) -> int:
+        """Apply ``[[price, qty], ...]`` level changes (qty 0 removes). Returns levels changed."""
+        changed = 0
+        for price, qty in bids:
+            changed += self.bids.set_level(float(price), float(qty))
+        for price, qty in asks:
+            changed += self.asks.set_level(float(price), float(qty))
+        return self._commit(changed, nonce, timestamp)
+
+    def apply_snapshot(self, bids, asks, nonce=None, timestamp=None) -> int:
+        """Bring the model in line with a full book, touching only changed levels."""
+        changed = 0
+        for side, snapshot in ((self.bids, bids), (self.asks, asks)):
+            try:
+                prices, qtys, sorted_snapshot = side.diff(snapshot)
+            except (TypeError, ValueError) as e:
+                logging.warning(f"OrderBookModel ({self.exchange}/{self.symbol}) could not read snapshot: {e}")
+                continue
+            for price, qty in zip(prices.tolist(), qtys.tolist()):
+                changed += side.set_level(price, qty)
+            # The side now equals the snapshot; reuse its sorted arrays
+            side._sorted = sorted_snapshot
+        return self._commit(changed, nonce, timestamp)
+
+    def _commit(self, changed: int, nonce, timestamp) -> int:
+        if nonce is not None:
+            self.nonce = nonce
+        if timestamp is not None:
+            self.timestamp = timestamp
+        self.last_changed_levels = changed
+        if changed:
+            self.version += 1
+        return changed
+
+    def sides(self, tick_size: float, aggregate: bool):
+        """Return best-first ``(bid_prices, bid_qtys), (ask_prices, ask_qtys)`` for a view."""
+        if aggregate and tick_size > 0:
+            return self.bids.aggregated(tick_size), self.asks.aggregated(tick_size)
+        return self.bids.best_first(), self.asks.best_first()
+
+    def processed(self, tick_size: float, aggregate: bool):
+        """Return read-only best-first ``(bids, asks)`` arrays of ``[price, qty, cum]`` rows.
+
+        The result is computed once per version and view and shared by all callers.
+        """
+        key = (float(tick_size), True) if aggregate and tick_size > 0 else (None, False)
+        cached = self._processed.get(key)
+        if cached is not None and cached[0] == self.version:
+            self._processed.move_to_end(key)
+            self.processed_hits += 1
+            return cached[1], cached[2]
+
+        self.processed_misses += 1
+        (bid_prices, bid_qtys), (ask_prices, ask_qtys) = self.sides(tick_size, aggregate)
+        bids = np.column_stack((bid_prices, bid_qtys, np.cumsum(bid_qtys)))
+        asks = np.column_stack((ask_prices, ask_qtys, np.cumsum(ask_qtys)))
+        bids.flags.writeable = False
+        asks.flags.writeable = False
+        self._processed[key] = (self.version, bids, asks)
+        self._processed.move_to_end(key)
+        while len(self._processed) > self.max_processed_views:
+            self._processed.popitem(last=False)
+        return bids, asks
+
+    def snapshot(self) -> BookSnapshot:
+        """Return a `BookSnapshot` of the current version, shared until the next change.
+
+        The sorted level arrays are replaced, never written to, when the book
+        changes, so the snapshot references them without copying.
+        """
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = BookSnapshot(
+                self.exchange,
+                self.symbol,
+                self.version,
+                _SnapshotSide(True, *self.bids.sorted_levels()),
+                _SnapshotSide(False, *self.asks.sorted_levels()),
+            )
+        return self._snapshot
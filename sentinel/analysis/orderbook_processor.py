@@ -1,8 +1,149 @@
 import math
 import logging
+from dataclasses import dataclass, fields
+
 import numpy as np
 
 
+# Ladder row kinds as stored in LadderColumns.kind
+KIND_BID, KIND_MID, KIND_ASK = -1, 0, 1
+KIND_NAMES = {KIND_BID: "bid", KIND_MID: "mid", KIND_ASK: "ask"}
+_KIND_CODES = {name: code for code, name in KIND_NAMES.items()}
+
+
+@dataclass(frozen=True, slots=True)
+class LadderColumns:
+    """Ladder rows as parallel NumPy columns, highest price first.
+
+    Ask rows only carry ``ask_qty``/``ask_cum`` and bid rows only
+    ``bid_qty``/``bid_cum``; the mid row carries none.
+    """
+
+    price: np.ndarray
+    bid_qty: np.ndarray
+    bid_cum: np.ndarray
+    ask_qty: np.ndarray
+    ask_cum: np.ndarray
+    kind: np.ndarray  # int8 KIND_* codes
+
+    def __len__(self) -> int:
+        return int(self.price.size)
+
+    @property
+    def size(self) -> np.ndarray:
+        """Per-row quantity regardless of side."""
+        return np.where(self.kind == KIND_ASK, self.ask_qty, self.bid_qty)
+
+    @property
+    def total(self) -> np.ndarray:
+        """Per-row cumulative quantity regardless of side."""
+        return np.where(self.kind == KIND_ASK, self.ask_cum, self.bid_cum)
+
+    @classmethod
+    def from_parts(cls, asks=None, bids=None, mid_price=None):
+        """Stack [[price, qty, cum], ...] ask and bid blocks plus an optional mid row.
+
+        Blocks are stacked asks, mid, bids; callers pass them already ordered
+        highest price first.
+        """
+        asks = np.empty((0, 3)) if asks is None else asks
+        bids = np.empty((0, 3)) if bids is None else bids
+        n_ask, n_bid = len(asks), len(bids)
+        n_mid = 0 if mid_price is None else 1
+        n = n_ask + n_mid + n_bid
+
+        price = np.empty(n, dtype=np.float64)
+        bid_qty = np.zeros(n, dtype=np.float64)
+        bid_cum = np.zeros(n, dtype=np.float64)
+        ask_qty = np.zeros(n, dtype=np.float64)
+        ask_cum = np.zeros(n, dtype=np.float64)
+        kind = np.empty(n, dtype=np.int8)
+
+        price[:n_ask] = asks[:, 0]
+        ask_qty[:n_ask] = asks[:, 1]
+        ask_cum[:n_ask] = asks[:, 2]
+        kind[:n_ask] = KIND_ASK
+        if n_mid:
+            price[n_ask] = mid_price
+            kind[n_ask] = KIND_MID
+        start = n_ask + n_mid
+        price[start:] = bids[:, 0]
+        bid_qty[start:] = bids[:, 1]
+        bid_cum[start:] = bids[:, 2]
+        kind[start:] = KIND_BID
+        return cls(price, bid_qty, bid_cum, ask_qty, ask_cum, kind)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build columns from ladder row dicts (DOM or visible-ladder keys)."""
+        n = len(rows)
+        kind = np.fromiter((_KIND_CODES[str(row["kind"])] for row in rows), dtype=np.int8, count=n)
+        price = np.fromiter((float(row["price"]) for row in rows), dtype=np.float64, count=n)
+
+        def column(key, fallback, side):
+            values = np.fromiter(
+                (float(row.get(key, row.get(fallback, 0.0))) for row in rows), dtype=np.float64, count=n
+            )
+            return np.where(kind == side, values, 0.0)
+
+        return cls(
+            price,
+            column("bid_qty", "size", KIND_BID),
+            column("bid_cum", "total", KIND_BID),
+            column("ask_qty", "size", KIND_ASK),
+            column("ask_cum", "total", KIND_ASK),
+            kind,
+        )
+
+    @classmethod
+    def concat(cls, *parts):
+        """Stack several column sets in order."""
+        return cls(*(np.concatenate([getattr(part, f.name) for part in parts]) for f in fields(cls)))
+
+    def take(self, index):
+        """Return the rows selected by an index array or mask."""
+        return LadderColumns(
+            self.price[index],
+            self.bid_qty[index],
+            self.bid_cum[index],
+            self.ask_qty[index],
+            self.ask_cum[index],
+            self.kind[index],
+        )
+
+    def to_rows(self) -> list[dict]:
+        """DOM-style row dicts (bid/ask qty and cum)."""
+        kinds = [KIND_NAMES[code] for code in self.kind.tolist()]
+        return [
+            {
+                "kind": kind,
+                "price": price,
+                "bid_qty": bid_qty,
+                "bid_cum": bid_cum,
+                "ask_cum": ask_cum,
+                "ask_qty": ask_qty,
+            }
+            for kind, price, bid_qty, bid_cum, ask_qty, ask_cum in zip(
+                kinds,
+                self.price.tolist(),
+                self.bid_qty.tolist(),
+                self.bid_cum.tolist(),
+                self.ask_qty.tolist(),
+                self.ask_cum.tolist(),
+            )
+        ]
+
+    def to_visible_rows(self) -> list[dict]:
+        """Visible-ladder row dicts (size and total)."""
+        kinds = [KIND_NAMES[code] for code in self.kind.tolist()]
+        return [
+            {"kind": kind, "price": price, "size": size, "total": total}
+            for kind, price, size, total in zip(
+                kinds, self.price.tolist(), self.size.tolist(), self.total.tolist()
+            )
+        ]
+
+
 class OrderBookProcessor:
     def __init__(self, price_precision, initial_tick_size=None):
         self.aggregation_enabled = True
@@ -16,7 +157,7 @@ class OrderBookProcessor:
         self._bid_len = 0
         self._ask_len = 0
         
-    def process_orderbook(self, raw_bids, raw_asks, current_price=None):
+    def process_orderbook(self, raw_bids, raw_asks, current_price=None, book=None, as_arrays=False):
         """
         Process the raw orderbook data based on current settings.
         
@@ -24,6 +165,10 @@ class OrderBookProcessor:
             raw_bids (list): Raw bid data as [[price, quantity], ...]
             raw_asks (list): Raw ask data as [[price, quantity], ...]
             current_price (float, optional): Current market price, used for calculations
+            book (OrderBookModel, optional): Incrementally maintained book for this market.
+                When given, its tick buckets are used and raw_bids/raw_asks are ignored.
+            as_arrays (bool): Return the processed sides as (N, 3) NumPy arrays
+                instead of nested lists, for callers that plot the columns directly.
         
         Returns:
             dict: A dictionary containing:
@@ -33,6 +178,19 @@ class OrderBookProcessor:
                 - bid_ask_ratio: Current bid/ask volume ratio
                 - best_bid/best_ask: Best bid and ask prices
         """
+        sides = self._processed_sides(raw_bids, raw_asks, current_price, book)
+        if sides is None:
+            return None
+        return self._summarize(*sides, as_arrays=as_arrays)
+
+    def _processed_sides(self, raw_bids, raw_asks, current_price=None, book=None):
+        """
+        Return best-first (bids_processed, asks_processed) [[price, qty, cum], ...]
+        arrays within 25% of the current price, or None without data.
+        """
+        if book is not None:
+            return self._book_sides(book, current_price)
+
         # Check if lists are empty
         if not raw_bids or not raw_asks:
             logging.debug(f"Empty order book data received. Skipping processing.")
@@ -64,26 +222,54 @@ class OrderBookProcessor:
             limited_asks = asks_arr[:100]
             
         # Process the filtered orderbook
-        bids_processed, asks_processed = self._aggregate_and_group_order_book(
-            limited_bids, limited_asks
-        )
-        
-        # Return early if processing resulted in empty lists
-        if len(bids_processed) == 0 or len(asks_processed) == 0:
-            logging.debug(f"Processing resulted in empty order book. Skipping.")
+        return self._aggregate_and_group_order_book(limited_bids, limited_asks)
+
+    def _book_sides(self, book, current_price=None):
+        """
+        `_processed_sides` over an `OrderBookModel`. The model memoizes the
+        full processed sides per tick/aggregation and version, so this is a
+        prefix slice of the shared arrays; cumulative depth is unaffected
+        because both sides are ordered best first.
+        """
+        if book.empty:
+            logging.debug(f"Empty order book model for {book.exchange}/{book.symbol}. Skipping processing.")
             return None
-            
-        # Calculate visualization parameters
-        best_bid = bids_processed[0][0] if bids_processed.size > 0 else 0
-        best_ask = asks_processed[0][0] if asks_processed.size > 0 else 0
-        
+
+        bids, asks = book.processed(self.tick_size, self.aggregation_enabled)
+
+        price_range_percentage = 0.25  # 25% range to capture, as for raw books
+        if current_price is None:
+            best_bid_price = book.bids.best_first()[0][0]
+            best_ask_price = book.asks.best_first()[0][0]
+            current_price = (best_bid_price + best_ask_price) / 2
+        if current_price:
+            min_price = current_price * (1 - price_range_percentage)
+            max_price = current_price * (1 + price_range_percentage)
+            bids = bids[:np.searchsorted(-bids[:, 0], -min_price, side="right")]
+            asks = asks[:np.searchsorted(asks[:, 0], max_price, side="right")]
+        return bids, asks
+
+    def _best_prices(self, bids_processed, asks_processed):
+        """Return (best_bid, best_ask, midpoint) of non-empty processed sides."""
+        best_bid = bids_processed[0][0]
+        best_ask = asks_processed[0][0]
+
         # Handle equal bid/ask edge case (usually from aggregation)
         if best_ask <= best_bid:
             logging.debug(f"Equal bid/ask ({best_bid}/{best_ask}) detected - likely due to aggregation.")
             best_ask = best_bid * 1.000001  # Add tiny artificial spread
+
+        return best_bid, best_ask, (best_bid + best_ask) / 2
+
+    def _summarize(self, bids_processed, asks_processed, as_arrays=False):
+        """Derive best prices, axis limits and ratio from processed [[price, qty, cum], ...] sides."""
+        # Return early if processing resulted in empty lists
+        if len(bids_processed) == 0 or len(asks_processed) == 0:
+            logging.debug(f"Processing resulted in empty order book. Skipping.")
+            return None
             
-        # Calculate midpoint
-        midpoint = (best_bid + best_ask) / 2
+        # Calculate visualization parameters
+        best_bid, best_ask, midpoint = self._best_prices(bids_processed, asks_processed)
         
         # Calculate axis limits and visible data
         x_axis_limits, visible_bids, visible_asks = self._calculate_axis_limits(
@@ -96,8 +282,12 @@ class OrderBookProcessor:
         )
         
         # Convert NumPy arrays to lists for compatibility with existing code
-        bids_processed_list = bids_processed.tolist() if isinstance(bids_processed, np.ndarray) else bids_processed
-        asks_processed_list = asks_processed.tolist() if isinstance(asks_processed, np.ndarray) else asks_processed
+        if as_arrays:
+            bids_processed_list = np.asarray(bids_processed, dtype=np.float64).reshape(-1, 3)
+            asks_processed_list = np.asarray(asks_processed, dtype=np.float64).reshape(-1, 3)
+        else:
+            bids_processed_list = bids_processed.tolist() if isinstance(bids_processed, np.ndarray) else bids_processed
+            asks_processed_list = asks_processed.tolist() if isinstance(asks_processed, np.ndarray) else asks_processed
         
         # Return all processed data in a single dictionary
         return {
@@ -394,80 +584,44 @@ class OrderBookProcessor:
 
         return sorted(presets)
 
-    def build_dom_ladder(self, raw_bids, raw_asks, levels_per_side: int, current_price=None):
+    def build_dom_ladder(
+        self, raw_bids, raw_asks, levels_per_side: int, current_price=None, book=None, columnar: bool = False
+    ):
         """
         Build a DOM ladder centered on a discrete mid-price row.
 
         Returns:
             dict with:
-                - rows: list[dict]
+                - rows: list[dict], or columns: LadderColumns when ``columnar``
                 - best_bid
                 - best_ask
                 - midpoint
         """
-        processed = self.process_orderbook(raw_bids, raw_asks, current_price)
-        if not processed:
+        sides = self._processed_sides(raw_bids, raw_asks, current_price, book)
+        if sides is None:
             return None
-
-        bids = processed["bids_processed"]
-        asks = processed["asks_processed"]
-        if not bids or not asks:
+        bids, asks = sides
+        if len(bids) == 0 or len(asks) == 0:
             return None
 
-        best_bid = float(processed["best_bid"])
-        best_ask = float(processed["best_ask"])
-        midpoint = float(processed["midpoint"])
+        best_bid, best_ask, midpoint = (float(v) for v in self._best_prices(bids, asks))
         tick = float(self.tick_size)
         center_price = self._normalize_price(round(midpoint / tick) * tick)
 
-        ask_rows_inside_out = [
-            row for row in asks if self._normalize_price(float(row[0])) > center_price and float(row[1]) > 0
-        ][:levels_per_side]
-        bid_rows_inside_out = [
-            row for row in bids if self._normalize_price(float(row[0])) < center_price and float(row[1]) > 0
-        ][:levels_per_side]
-
-        ask_rows = []
-        for row in reversed(ask_rows_inside_out):
-            ask_rows.append(
-                {
-                    "kind": "ask",
-                    "price": self._normalize_price(float(row[0])),
-                    "bid_qty": 0.0,
-                    "bid_cum": 0.0,
-                    "ask_cum": float(row[2]),
-                    "ask_qty": float(row[1]),
-                }
-            )
-
-        mid_row = {
-            "kind": "mid",
-            "price": midpoint,
-            "bid_qty": 0.0,
-            "bid_cum": 0.0,
-            "ask_cum": 0.0,
-            "ask_qty": 0.0,
-        }
-
-        bid_rows = []
-        for row in bid_rows_inside_out:
-            bid_rows.append(
-                {
-                    "kind": "bid",
-                    "price": self._normalize_price(float(row[0])),
-                    "bid_qty": float(row[1]),
-                    "bid_cum": float(row[2]),
-                    "ask_cum": 0.0,
-                    "ask_qty": 0.0,
-                }
-            )
+        # Sides are best first, so the rows nearest the center are a prefix of
+        # what lies beyond it; only that prefix is ever materialized.
+        ask_rows_inside_out = self._rows_beyond(asks, center_price, levels_per_side, above=True)
+        bid_rows_inside_out = self._rows_beyond(bids, center_price, levels_per_side, above=False)
+        columns = LadderColumns.from_parts(
+            asks=ask_rows_inside_out[::-1], bids=bid_rows_inside_out, mid_price=midpoint
+        )
 
-        return {
-            "rows": ask_rows + [mid_row] + bid_rows,
-            "best_bid": best_bid,
-            "best_ask": best_ask,
-            "midpoint": midpoint,
-        }
+        ladder = {"best_bid": best_bid, "best_ask": best_ask, "midpoint": midpoint}
+        if columnar:
+            ladder["columns"] = columns
+        else:
+            ladder["rows"] = columns.to_rows()
+        return ladder
 
     def build_visible_ladder(
         self,
@@ -477,70 +631,76 @@ class OrderBookProcessor:
         price_min: float,
         price_max: float,
         current_price=None,
+        book=None,
+        columnar: bool = False,
     ):
         """
         Build a visible price-aligned ladder for the composite chart/orderflow view.
         Rows are populated levels only plus a center row when it falls inside the
-        visible range.
+        visible range. With ``columnar`` the rows come back as ``columns``
+        (LadderColumns) instead of ``rows`` dicts.
         """
-        processed = self.process_orderbook(raw_bids, raw_asks, current_price)
-        if not processed:
+        sides = self._processed_sides(raw_bids, raw_asks, current_price, book)
+        if sides is None:
             return None
-
-        bids = processed["bids_processed"]
-        asks = processed["asks_processed"]
-        if not bids or not asks:
+        bids, asks = sides
+        if len(bids) == 0 or len(asks) == 0:
             return None
 
-        best_bid = float(processed["best_bid"])
-        best_ask = float(processed["best_ask"])
-        midpoint = float(processed["midpoint"])
+        best_bid, best_ask, midpoint = (float(v) for v in self._best_prices(bids, asks))
         lower = min(price_min, price_max)
         upper = max(price_min, price_max)
 
-        ask_rows = [
-            {
-                "kind": "ask",
-                "price": self._normalize_price(float(row[0])),
-                "size": float(row[1]),
-                "total": float(row[2]),
-            }
-            for row in asks
-            if lower <= float(row[0]) <= upper and float(row[1]) > 0
-        ]
-        bid_rows = [
-            {
-                "kind": "bid",
-                "price": self._normalize_price(float(row[0])),
-                "size": float(row[1]),
-                "total": float(row[2]),
-            }
-            for row in bids
-            if lower <= float(row[0]) <= upper and float(row[1]) > 0
-        ]
+        # Asks ascend and bids descend, so the visible band of each side is one slice
+        ask_slice = asks[np.searchsorted(asks[:, 0], lower, side="left"):np.searchsorted(asks[:, 0], upper, side="right")]
+        bid_slice = bids[np.searchsorted(-bids[:, 0], -upper, side="left"):np.searchsorted(-bids[:, 0], -lower, side="right")]
+        ask_slice = self._rounded(ask_slice[ask_slice[:, 1] > 0])
+        bid_slice = self._rounded(bid_slice[bid_slice[:, 1] > 0])
 
-        rows = sorted(ask_rows + bid_rows, key=lambda row: row["price"], reverse=True)
-        if lower <= midpoint <= upper:
-            rows.append(
-                {
-                    "kind": "mid",
-                    "price": midpoint,
-                    "size": 0.0,
-                    "total": 0.0,
-                }
-            )
-            rows.sort(key=lambda row: row["price"], reverse=True)
+        columns = LadderColumns.from_parts(
+            asks=ask_slice, bids=bid_slice, mid_price=midpoint if lower <= midpoint <= upper else None
+        )
+        # Stable descending sort: at equal prices asks stay ahead of the mid row
+        columns = columns.take(np.argsort(-columns.price, kind="stable"))
 
-        return {
-            "rows": rows,
-            "best_bid": best_bid,
-            "best_ask": best_ask,
-            "midpoint": midpoint,
-        }
+        ladder = {"best_bid": best_bid, "best_ask": best_ask, "midpoint": midpoint}
+        if columnar:
+            ladder["columns"] = columns
+        else:
+            ladder["rows"] = columns.to_visible_rows()
+        return ladder
 
     def _normalize_price(self, price: float) -> float:
         return round(float(price), 10)
-    
+
+    def _rounded(self, side):
+        """Copy of [[price, qty, cum], ...] rows with normalized prices."""
+        rows = np.array(side, dtype=np.float64).reshape(-1, 3)
+        rows[:, 0] = np.round(rows[:, 0], 10)
+        return rows
+
+    def _rows_beyond(self, side, center_price: float, count: int, above: bool):
+        """First *count* populated rows of a best-first side strictly beyond *center_price*."""
+        prices = side[:, 0]
+        # Rounding only nudges prices by < 1e-10, so a padded search brackets the boundary
+        if above:
+            start = int(np.searchsorted(prices, center_price - 1e-9, side="left"))
+        else:
+            start = int(np.searchsorted(-prices, -(center_price + 1e-9), side="left"))
+        found = []
+        have = 0
+        step = max(count, 1)
+        while have < count and start < len(side):
+            window = self._rounded(side[start:start + step])
+            beyond = window[:, 0] > center_price if above else window[:, 0] < center_price
+            window = window[beyond & (window[:, 1] > 0)][:count - have]
+            found.append(window)
+            have += len(window)
+            start += step
+        if not found:
+            return np.empty((0, 3))
+        return np.concatenate(found)
+
     def increase_tick_size(self, current_price):
         """
         Increase tick size to the next preset value.
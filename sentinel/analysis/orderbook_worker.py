@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class SnapshotBuffer:
+    """Double buffer handing finished results from a worker to the GUI thread.
+
+    The worker fills the back slot and swaps it to the front under a lock;
+    the GUI thread takes whatever is in front. A result that gets replaced
+    before the GUI took it was never shown and is counted as ``dropped``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._front = None
+        self._back = None
+        self._fresh = False
+        self.published = 0
+        self.taken = 0
+        self.dropped = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._fresh
+
+    def publish(self, value) -> None:
+        self._back = value
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._front, self._back = self._back, self._front
+            self._fresh = True
+            self.published += 1
+
+    def take(self):
+        """Return the newest unseen result, or None if nothing new was published."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._fresh = False
+            self.taken += 1
+            return self._front
+
+
+_EXECUTOR: Executor | None = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def shared_executor() -> Executor:
+    """Thread pool shared by every `OrderBookComputeWorker` that was not given one."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="orderbook-compute"
+            )
+        return _EXECUTOR
+
+
+class OrderBookComputeWorker:
+    """Runs one widget's orderbook aggregation off the GUI thread.
+
+    At most one job per worker is in flight, so results come back in
+    submission order. Submitting while a job runs parks the call as pending;
+    a newer submission replaces the parked one, which counts as
+    ``superseded``. Finished results go through a `SnapshotBuffer`, so the
+    GUI thread only ever picks up the latest completed snapshot.
+
+    Jobs must only read inputs that nothing mutates while they run, e.g. a
+    `BookSnapshot` and a copy of the processor with its current settings.
+    NumPy releases the GIL in the heavy parts of the aggregation, so a
+    thread pool is enough to keep deep books from stalling the UI.
+    """
+
+    def __init__(self, executor: Executor | None = None):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._running = False
+        self._pending: tuple[Callable, tuple, dict] | None = None
+        self._closed = False
+        self.buffer = SnapshotBuffer()
+        self.submitted = 0
+        self.completed = 0
+        self.superseded = 0
+        self.failed = 0
+
+    @property
+    def ready(self) -> bool:
+        """True when a finished result is waiting for `take`."""
+        return self.buffer.ready
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        """Compute ``fn(*args, **kwargs)`` in the pool; the result shows up in `take`."""
+        with self._lock:
+            if self._closed:
+                return
+            self.submitted += 1
+            if self._running:
+                if self._pending is not None:
+                    self.superseded += 1
+                self._pending = (fn, args, kwargs)
+                return
+            self._running = True
+        self._start(fn, args, kwargs)
+
+    def take(self):
+        """Latest finished result not yet taken, or None."""
+        return self.buffer.take()
+
+    def _start(self, fn, args, kwargs) -> None:
+        executor = self._executor or shared_executor()
+        try:
+            executor.submit(self._run, fn, args, kwargs)
+        except RuntimeError as e:
+            # The pool is shutting down with the application
+            logging.debug(f"Orderbook compute job not started: {e}")
+            with self._lock:
+                self._running = False
+                self._pending = None
+
+    def _run(self, fn, args, kwargs) -> None:
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.failed += 1
+            logging.error(f"Orderbook compute job failed: {e}", exc_info=True)
+        else:
+            self.completed += 1
+            if result is not None:
+                self.buffer.publish(result)
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None or self._closed:
+                self._running = False
+                return
+        self._start(*pending)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "superseded": self.superseded,
+            "dropped": self.buffer.dropped,
+            "failed": self.failed,
+        }
+
+    def close(self) -> None:
+        """Stop accepting work; a job already running finishes and is discarded."""
+        with self._lock:
+            self._closed = True
+            self._pending = None
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import QLabel, QMainWindow, QMessageBox, QSizePolicy, QTo
 from qasync import asyncClose
 
 from sentinel.app.layout_manager import LayoutManager
+from sentinel.app.render_scheduler import render_scheduler
 from sentinel.app.runtime import SentinelRuntime
 from sentinel.app.widget_registry import WidgetRegistry
 from sentinel.widgets.chart_orderflow_widget import ChartOrderflowDockWidget
@@ -132,6 +133,10 @@ class SentinelMainWindow(QMainWindow):
         reset_layout_action.triggered.connect(self._reset_layout)
         file_menu.addAction(reset_layout_action)
 
+        render_stats_action = QAction("Log Render Stats", self)
+        render_stats_action.triggered.connect(self._log_render_stats)
+        file_menu.addAction(render_stats_action)
+
         file_menu.addSeparator()
         exit_action = QAction("Exit", self)
         exit_action.triggered.connect(self.close)
@@ -234,6 +239,9 @@ class SentinelMainWindow(QMainWindow):
         self.widget_registry.save_user_definitions()
         self.layout_manager.save_layout(self)
 
+    def _log_render_stats(self) -> None:
+        LOGGER.info("Render stats: %s", render_scheduler().format_stats())
+
     def _setup_status(self) -> None:
         sb = self.statusBar()
 
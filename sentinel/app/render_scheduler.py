@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+import numpy as np
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtWidgets import QWidget
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper edges (ms) of the render-time histogram buckets; the last bucket is open.
+RENDER_TIME_BUCKETS_MS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 33.0)
+
+
+class RenderTarget:
+    """One widget's registration with the `RenderScheduler`."""
+
+    def __init__(
+        self,
+        widget: QWidget,
+        callback: Callable[[], None],
+        *,
+        name: str,
+        min_interval: float,
+        priority: int,
+        is_dirty: Callable[[], bool] | None,
+    ) -> None:
+        self.widget = widget
+        self.callback = callback
+        self.name = name
+        self.min_interval = min_interval
+        self.priority = priority
+        self.is_dirty = is_dirty
+        self.last_run = 0.0
+        self.renders = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = np.zeros(len(RENDER_TIME_BUCKETS_MS) + 1, dtype=np.int64)
+        self.skipped_hidden = 0
+        self.deferred = 0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.renders += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.histogram[np.searchsorted(RENDER_TIME_BUCKETS_MS, elapsed_ms)] += 1
+
+    def stats(self) -> dict:
+        return {
+            "renders": self.renders,
+            "mean_ms": self.total_ms / self.renders if self.renders else 0.0,
+            "max_ms": self.max_ms,
+            "histogram": dict(
+                zip([f"<{edge:g}ms" for edge in RENDER_TIME_BUCKETS_MS] + [f">={RENDER_TIME_BUCKETS_MS[-1]:g}ms"], self.histogram.tolist())
+            ),
+            "skipped_hidden": self.skipped_hidden,
+            "deferred": self.deferred,
+        }
+
+
+class RenderScheduler(QObject):
+    """Drives every widget's dirty-render callback from one shared frame tick.
+
+    Widgets register a callback (usually their ``_render_if_dirty``), an
+    optional dirty predicate and the fps they want at most. On each tick the
+    scheduler skips hidden, tabbed-away and minimized widgets, orders the due
+    ones by staleness (time since their last render, scaled by ``1 +
+    priority``) and runs them until the frame budget is spent; whatever is
+    left is staler on the next tick and so goes first. At least one widget
+    renders per tick, and a high priority only makes a widget age faster, so
+    neither a slow nor an urgent widget can starve the rest. Each callback is
+    timed into a per-widget histogram exposed by `stats`.
+    """
+
+    def __init__(self, fps: int = 60, budget_ms: float = 10.0, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.budget_ms = float(budget_ms)
+        self._targets: list[RenderTarget] = []
+        self.frames = 0
+        self.over_budget_frames = 0
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(max(int(1000 / max(fps, 1)), 1))
+        self._timer.timeout.connect(self.tick)
+
+    def register(
+        self,
+        widget: QWidget,
+        callback: Callable[[], None],
+        *,
+        name: str | None = None,
+        fps: int | None = None,
+        priority: int = 0,
+        is_dirty: Callable[[], bool] | None = None,
+    ) -> RenderTarget:
+        """Schedule *callback* for *widget*; returns the registration handle."""
+        self.unregister(widget)
+        name = name or widget.objectName() or type(widget).__name__
+        taken = {target.name for target in self._targets}
+        unique, suffix = name, 2
+        while unique in taken:
+            unique, suffix = f"{name}#{suffix}", suffix + 1
+        target = RenderTarget(
+            widget,
+            callback,
+            name=unique,
+            min_interval=1.0 / fps if fps else 0.0,
+            priority=priority,
+            is_dirty=is_dirty,
+        )
+        self._targets.append(target)
+        widget.destroyed.connect(lambda *_: self._drop(target))
+        if not self._timer.isActive():
+            self._timer.start()
+        return target
+
+    def unregister(self, widget: QWidget) -> None:
+        self._targets = [target for target in self._targets if target.widget is not widget]
+        self._stop_if_idle()
+
+    def _drop(self, target: RenderTarget) -> None:
+        if target in self._targets:
+            self._targets.remove(target)
+            self._stop_if_idle()
+
+    def _stop_if_idle(self) -> None:
+        try:
+            if not self._targets and self._timer.isActive():
+                self._timer.stop()
+        except RuntimeError:
+            pass  # the timer is already gone during interpreter shutdown
+
+    def targets(self) -> list[RenderTarget]:
+        return list(self._targets)
+
+    def tick(self) -> int:
+        """Run one frame; returns how many widgets rendered."""
+        self.frames += 1
+        now = time.perf_counter()
+        due = []
+        for target in list(self._targets):
+            if now - target.last_run < target.min_interval:
+                continue
+            try:
+                if target.is_dirty is not None and not target.is_dirty():
+                    continue
+                if not target.widget.isVisible() or target.widget.window().isMinimized():
+                    target.skipped_hidden += 1
+                    continue
+            except RuntimeError:
+                # The C++ widget is gone without having unregistered.
+                self._drop(target)
+                continue
+            due.append(target)
+
+        due.sort(key=lambda target: -(now - target.last_run) * (1 + target.priority))
+        deadline = now + self.budget_ms / 1000.0
+        rendered = 0
+        for index, target in enumerate(due):
+            start = time.perf_counter()
+            if rendered and start >= deadline:
+                for deferred in due[index:]:
+                    deferred.deferred += 1
+                self.over_budget_frames += 1
+                break
+            try:
+                target.callback()
+            except Exception:
+                LOGGER.exception("Render callback for %s failed", target.name)
+            end = time.perf_counter()
+            target.last_run = end
+            target.record((end - start) * 1000.0)
+            rendered += 1
+        return rendered
+
+    def stats(self) -> dict[str, dict]:
+        """Per-widget render counts, mean/max time and time histogram."""
+        return {target.name: target.stats() for target in self._targets}
+
+    def format_stats(self) -> str:
+        lines = [f"{self.frames} frames, {self.over_budget_frames} over the {self.budget_ms:g}ms budget"]
+        for name, stats in sorted(self.stats().items(), key=lambda item: -item[1]["mean_ms"] * item[1]["renders"]):
+            buckets = " ".join(f"{label}:{count}" for label, count in stats["histogram"].items() if count)
+            lines.append(
+                f"  {name}: {stats['renders']} renders, mean {stats['mean_ms']:.2f}ms, max {stats['max_ms']:.2f}ms, "
+                f"hidden {stats['skipped_hidden']}, deferred {stats['deferred']} [{buckets}]"
+            )
+        return "\n".join(lines)
+
+
+_SCHEDULER: RenderScheduler | None = None
+
+
+def render_scheduler() -> RenderScheduler:
+    """The application-wide scheduler, created on first use."""
+    global _SCHEDULER
+    if _SCHEDULER is None:
+        _SCHEDULER = RenderScheduler()
+    return _SCHEDULER
@@ -159,6 +159,8 @@ class WidgetRegistry:
         instance_id: str | None = None,
         exchange: str = "coinbase",
         symbol: str = "BTC/USD",
+        step_depth: bool = False,
+        offload: bool = False,
         area: Qt.DockWidgetArea = Qt.DockWidgetArea.RightDockWidgetArea,
     ) -> str:
         if instance_id is None:
@@ -171,6 +173,8 @@ class WidgetRegistry:
             runtime=self.runtime,
             exchange=exchange,
             symbol=symbol,
+            step_depth=step_depth,
+            offload=offload,
         )
         self.window.addDockWidget(area, dock)
         self.docks[instance_id] = dock
@@ -183,6 +187,7 @@ class WidgetRegistry:
         exchange: str = "coinbase",
         symbol: str = "BTC/USD",
         levels: int = 16,
+        offload: bool = False,
         area: Qt.DockWidgetArea = Qt.DockWidgetArea.RightDockWidgetArea,
     ) -> str:
         if instance_id is None:
@@ -196,6 +201,7 @@ class WidgetRegistry:
             exchange=exchange,
             symbol=symbol,
             levels=levels,
+            offload=offload,
         )
         self.window.addDockWidget(area, dock)
         self.docks[instance_id] = dock
@@ -247,6 +253,8 @@ class WidgetRegistry:
                     instance_id=instance_id,
                     exchange=str(config.get("exchange", "coinbase")),
                     symbol=str(config.get("symbol", "BTC/USD")),
+                    step_depth=bool(config.get("step_depth", False)),
+                    offload=bool(config.get("offload", False)),
                 )
                 continue
             if widget_type == "dom":
@@ -255,6 +263,7 @@ class WidgetRegistry:
                     exchange=str(config.get("exchange", "coinbase")),
                     symbol=str(config.get("symbol", "BTC/USD")),
                     levels=int(config.get("levels", 16)),
+                    offload=bool(config.get("offload", False)),
                 )
                 continue
 
@@ -1,70 +1,271 @@
 import asyncio
+import glob
+import json
 import os
 import logging
+import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Dict, Set, Tuple
+
+OHLCV_CACHE_COLUMNS = ["dates", "opens", "highs", "lows", "closes", "volumes"]
+
+# One fixed-size little-endian record per candle; dates are epoch milliseconds.
+OHLCV_RECORD = np.dtype(
+    [("dates", "<i8")] + [(name, "<f8") for name in OHLCV_CACHE_COLUMNS[1:]]
+)
+
+CACHE_SUFFIX = ".ohlcv"
+LEGACY_CSV_SUFFIX = ".csv"
+FORMAT_VERSION = 1
 
 
 class CacheStore:
-    """Simple helper for loading and saving OHLCV CSV caches."""
+    """Loads and saves OHLCV caches as flat binary record files.
+
+    Each series lives in ``<key>.ohlcv``: a headerless array of
+    `OHLCV_RECORD` rows, so the row count is the file size divided by the
+    record size. Reads memory-map the file, and new candles are appended to
+    the end without rewriting history: the store remembers the last persisted
+    timestamp per file, so a refresh costs I/O proportional to the new rows
+    only. Backfilled (older) rows are appended too, which leaves the file out
+    of order until `compact` rewrites it sorted, either on the next load or
+    via `compact_pending`, which the TaskManager runs periodically and at
+    shutdown. Exchange, symbol and timeframe are kept once in a
+    ``<key>.json`` sidecar instead of on every row. Legacy ``<key>.csv``
+    caches are converted all at once by `migrate_csv_caches`, which the core
+    facade runs at startup, and renamed to ``<key>.csv.migrated``; a CSV that
+    appears later is converted the first time it is loaded.
+    """
 
     def __init__(self, cache_dir: str = "data/cache") -> None:
         self.cache_dir = cache_dir
         os.makedirs(self.cache_dir, exist_ok=True)
+        self._last_persisted: Dict[str, int] = {}
+        self._needs_compaction: Set[str] = set()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{CACHE_SUFFIX}")
+
+    @staticmethod
+    def _binary_path(path: str) -> str:
+        root, ext = os.path.splitext(path)
+        return path if ext == CACHE_SUFFIX else root + CACHE_SUFFIX
+
+    @staticmethod
+    def _meta_path(path: str) -> str:
+        return os.path.splitext(path)[0] + ".json"
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def read_records(self, path: str) -> np.ndarray:
+        """Memory-map the records of a binary cache (read-only, possibly empty)."""
+        size = os.path.getsize(path)
+        count = size // OHLCV_RECORD.itemsize
+        if size % OHLCV_RECORD.itemsize:
+            # A crash mid-append can leave a partial record; ignore it.
+            logging.warning(f"Cache {path} has a truncated trailing record; ignoring {size % OHLCV_RECORD.itemsize} bytes.")
+        if count == 0:
+            return np.empty(0, dtype=OHLCV_RECORD)
+        return np.memmap(path, dtype=OHLCV_RECORD, mode="r", shape=(count,))
+
+    @staticmethod
+    def _sorted_unique(records: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """Return records ordered by date with the last write per date kept, and whether that changed anything."""
+        dates = records["dates"]
+        if dates.size < 2 or np.all(dates[1:] > dates[:-1]):
+            return records, False
+        order = np.argsort(dates, kind="stable")
+        records = records[order]
+        keep = np.append(records["dates"][1:] != records["dates"][:-1], True)
+        return records[keep], True
+
+    def _load_binary(self, path: str) -> pd.DataFrame:
+        records, reordered = self._sorted_unique(self.read_records(path))
+        if reordered:
+            # Backfilled rows were appended out of order: compact while the
+            # sorted rows are in hand anyway.
+            records = np.array(records)
+            self._write_records(records, path)
+            logging.debug(f"Compacted cache {path} on load ({len(records)} rows).")
+        self._needs_compaction.discard(path)
+        if records.size:
+            self._last_persisted[path] = int(records["dates"][-1])
+        return pd.DataFrame({name: np.array(records[name]) for name in OHLCV_CACHE_COLUMNS})
+
+    def last_persisted_timestamp(self, path: str) -> int | None:
+        """Newest candle date stored in the cache at *path*, or None if it is empty."""
+        binary_path = self._binary_path(path)
+        if binary_path in self._last_persisted:
+            return self._last_persisted[binary_path]
+        if not os.path.exists(binary_path):
+            return None
+        dates = self.read_records(binary_path)["dates"]
+        if dates.size == 0:
+            return None
+        self._last_persisted[binary_path] = int(dates.max())
+        return self._last_persisted[binary_path]
 
     async def load_cache(self, path: str, key: str) -> Tuple[pd.DataFrame, int | None, int | None, bool]:
-        existing_df = pd.DataFrame(columns=["dates", "opens", "highs", "lows", "closes", "volumes"])
+        existing_df = pd.DataFrame(columns=OHLCV_CACHE_COLUMNS)
         first_cached_timestamp = None
         last_cached_timestamp = None
         data_loaded_from_cache = False
 
-        if os.path.exists(path):
-            logging.debug(f"Cache found: {path}")
+        binary_path = self._binary_path(path)
+        if not os.path.exists(binary_path):
+            await self._migrate_csv(os.path.splitext(binary_path)[0] + LEGACY_CSV_SUFFIX, key)
+
+        if os.path.exists(binary_path):
+            logging.debug(f"Cache found: {binary_path}")
             try:
-                cached_df = await asyncio.to_thread(pd.read_csv, path, dtype={"dates": "Int64"})
-                if not cached_df.empty and "dates" in cached_df.columns and not cached_df["dates"].isnull().all():
-                    cached_df = cached_df.sort_values(by="dates").reset_index(drop=True)
+                cached_df = await asyncio.to_thread(self._load_binary, binary_path)
+                if not cached_df.empty:
                     existing_df = cached_df
                     data_loaded_from_cache = True
-                    first_cached_timestamp = existing_df["dates"].iloc[0]
-                    last_cached_timestamp = existing_df["dates"].iloc[-1]
+                    first_cached_timestamp = int(existing_df["dates"].iloc[0])
+                    last_cached_timestamp = int(existing_df["dates"].iloc[-1])
                     logging.debug(
                         f"Cache for {key}: First ts: {first_cached_timestamp}, Last ts: {last_cached_timestamp}, Rows: {len(existing_df)}"
                     )
                 else:
-                    logging.debug(
-                        f"Cache file {path} is empty, malformed, or 'dates' column is missing/empty. Will fetch fresh data."
-                    )
-            except pd.errors.EmptyDataError:
-                logging.debug(f"Cache file {path} is empty. Will fetch fresh data.")
+                    logging.debug(f"Cache file {binary_path} is empty. Will fetch fresh data.")
             except Exception as e:
-                logging.error(f"Error loading cache {path}: {e}. Will attempt to fetch fresh data.")
+                logging.error(f"Error loading cache {binary_path}: {e}. Will attempt to fetch fresh data.")
         return existing_df, first_cached_timestamp, last_cached_timestamp, data_loaded_from_cache
 
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_records(df: pd.DataFrame) -> np.ndarray:
+        records = np.empty(len(df), dtype=OHLCV_RECORD)
+        for name in OHLCV_CACHE_COLUMNS:
+            records[name] = df[name].to_numpy()
+        return records
+
+    def _write_meta(self, path: str, exchange_id: str, symbol: str, timeframe: str) -> None:
+        meta = {"exchange": exchange_id, "symbol": symbol, "timeframe": timeframe, "format": FORMAT_VERSION}
+        with open(self._meta_path(path), "w") as f:
+            json.dump(meta, f)
+
+    def _write_records(self, records: np.ndarray, path: str) -> None:
+        """Replace *path* atomically so readers never see a half-written file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            records.tofile(f)
+        os.replace(tmp_path, path)
+
+    def _append_records(self, records: np.ndarray, path: str) -> None:
+        with open(path, "r+b") as f:
+            # Drop a partial record left by an interrupted append so rows stay aligned
+            size = f.seek(0, os.SEEK_END)
+            if size % OHLCV_RECORD.itemsize:
+                f.truncate(size - size % OHLCV_RECORD.itemsize)
+                f.seek(0, os.SEEK_END)
+            records.tofile(f)
+
     async def save_cache(self, df: pd.DataFrame, path: str, key: str, exchange_id: str, symbol: str, timeframe: str) -> None:
+        """Rewrite the whole cache for *key* from *df*."""
         if not df.empty:
-            directory = os.path.dirname(path)
-            os.makedirs(directory, exist_ok=True)
-
-            df_to_save = df.copy()
-            df_to_save["exchange"] = exchange_id
-            df_to_save["symbol"] = symbol
-            df_to_save["timeframe"] = timeframe
-
-            desired_columns = [
-                "dates",
-                "opens",
-                "highs",
-                "lows",
-                "closes",
-                "volumes",
-                "exchange",
-                "symbol",
-                "timeframe",
-            ]
-            columns_to_save = [col for col in desired_columns if col in df_to_save.columns]
-
-            await asyncio.to_thread(df_to_save[columns_to_save].to_csv, path, index=False)
-            logging.debug(f"Saved data for {key} to {path} with metadata columns. Rows: {len(df_to_save)}")
+            binary_path = self._binary_path(path)
+            os.makedirs(os.path.dirname(binary_path) or ".", exist_ok=True)
+            records, _ = self._sorted_unique(self._to_records(df))
+            await asyncio.to_thread(self._write_records, records, binary_path)
+            self._write_meta(binary_path, exchange_id, symbol, timeframe)
+            self._last_persisted[binary_path] = int(records["dates"][-1])
+            self._needs_compaction.discard(binary_path)
+            logging.debug(f"Saved data for {key} to {binary_path}. Rows: {len(records)}")
+        else:
+            logging.info(f"No data to save for {key} (DataFrame is empty). Cache not created/updated at {path}.")
+
+    async def append_cache(self, df: pd.DataFrame, path: str, key: str, exchange_id: str, symbol: str, timeframe: str) -> int:
+        """Append *df*'s rows to the cache without rewriting it; returns the number written.
+
+        Rows newer than the last persisted timestamp extend the file in order.
+        Older rows (backfill, corrections) are appended as well and mark the
+        file for compaction. Falls back to a full `save_cache` when no cache
+        exists yet.
+        """
+        binary_path = self._binary_path(path)
+        if df.empty:
+            return 0
+        if not os.path.exists(binary_path):
+            await self.save_cache(df, binary_path, key, exchange_id, symbol, timeframe)
+            return len(df)
+
+        last_persisted = self.last_persisted_timestamp(binary_path)
+        records, _ = self._sorted_unique(self._to_records(df))
+        if last_persisted is not None:
+            backfill = int(np.count_nonzero(records["dates"] <= last_persisted))
         else:
-            logging.info(f"No data to save for {key} (DataFrame is empty). CSV not created/updated at {path}.")
+            backfill = 0
+        await asyncio.to_thread(self._append_records, records, binary_path)
+        self._last_persisted[binary_path] = max(int(records["dates"][-1]), last_persisted or int(records["dates"][-1]))
+        if backfill:
+            self._needs_compaction.add(binary_path)
+        logging.debug(f"Appended {len(records)} rows for {key} to {binary_path} ({backfill} out of order).")
+        return len(records)
+
+    def compact(self, path: str) -> int:
+        """Rewrite a cache file in date order without duplicates; returns the row count."""
+        binary_path = self._binary_path(path)
+        records, reordered = self._sorted_unique(self.read_records(binary_path))
+        if reordered:
+            self._write_records(np.array(records), binary_path)
+        self._needs_compaction.discard(binary_path)
+        if records.size:
+            self._last_persisted[binary_path] = int(records["dates"][-1])
+        return len(records)
+
+    async def compact_pending(self) -> int:
+        """Compact every file that received out-of-order rows; returns how many were rewritten."""
+        pending = sorted(self._needs_compaction)
+        for binary_path in pending:
+            try:
+                await asyncio.to_thread(self.compact, binary_path)
+            except Exception as e:
+                logging.error(f"Error compacting cache {binary_path}: {e}")
+        return len(pending)
+
+    # ------------------------------------------------------------------
+    # Legacy CSV migration
+    # ------------------------------------------------------------------
+    def _convert_csv(self, csv_path: str) -> int:
+        df = pd.read_csv(csv_path, dtype={"dates": "Int64"})
+        missing = [col for col in OHLCV_CACHE_COLUMNS if col not in df.columns]
+        if missing:
+            logging.error(f"Cannot migrate {csv_path}: missing columns {missing}")
+            return 0
+        meta = {col: str(df[col].iloc[0]) for col in ("exchange", "symbol", "timeframe") if col in df.columns and not df.empty}
+        df = df.dropna(subset=["dates"]).drop_duplicates(subset=["dates"], keep="last").sort_values(by="dates")
+        df["dates"] = df["dates"].astype("int64")
+        binary_path = self._binary_path(csv_path)
+        self._write_records(self._to_records(df), binary_path)
+        if meta:
+            self._write_meta(binary_path, meta.get("exchange"), meta.get("symbol"), meta.get("timeframe"))
+        os.replace(csv_path, csv_path + ".migrated")
+        return len(df)
+
+    async def _migrate_csv(self, csv_path: str, key: str) -> bool:
+        if not os.path.exists(csv_path):
+            return False
+        try:
+            rows = await asyncio.to_thread(self._convert_csv, csv_path)
+            logging.info(f"Migrated CSV cache for {key} to binary format ({rows} rows).")
+            return True
+        except pd.errors.EmptyDataError:
+            logging.debug(f"Legacy cache {csv_path} is empty; skipping migration.")
+        except Exception as e:
+            logging.error(f"Error migrating cache {csv_path}: {e}")
+        return False
+
+    async def migrate_csv_caches(self) -> int:
+        """Convert every legacy CSV cache in the cache directory; returns how many were migrated."""
+        migrated = 0
+        for csv_path in sorted(glob.glob(os.path.join(self.cache_dir, f"*{LEGACY_CSV_SUFFIX}"))):
+            key = os.path.splitext(os.path.basename(csv_path))[0]
+            if os.path.exists(self._binary_path(csv_path)):
+                continue
+            migrated += await self._migrate_csv(csv_path, key)
+        return migrated
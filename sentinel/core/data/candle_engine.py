@@ -0,0 +1,118 @@
+from collections import deque
+import logging
+import math
+import time
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from ..signals import SignalEmitter, Signals
+from .ohlcv_buffer import reduce_to_buckets, trades_to_arrays
+
+if TYPE_CHECKING:
+    from .candle_factory import CandleFactory
+
+
+class CandleEngine:
+    """Folds one market's trade stream once and fans it out to every timeframe.
+
+    A single keyed, batched NEW_TRADE listener queues trades for ``(exchange, symbol)``.
+    On flush the batch is converted to arrays and reduced once into buckets of
+    the finest common timeframe (the GCD of all attached timeframes). Each
+    attached `CandleFactory` then rolls those few bars up into its own
+    timeframe with the same first/max/min/last/sum rules as
+    `CandleFactory.try_resample`, so adding a 5m or 1h chart next to a 1m chart
+    no longer re-processes every trade.
+    """
+
+    def __init__(self, exchange: str, symbol: str, emitter: "SignalEmitter"):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.emitter = emitter
+        self.factories: Dict[str, "CandleFactory"] = {}
+        self.precision_digits = 0
+
+        # Same batching policy the per-factory path uses
+        self._trade_queue = deque()
+        self.max_trades_per_candle_update = 5
+        self.flush_interval = 0.25  # seconds
+        self.last_update_time = time.time()
+
+        self.emitter.register_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trades, batched=True)
+
+    def attach(self, factory: "CandleFactory") -> None:
+        """Start feeding *factory*; it must be created with ``subscribe_trades=False``."""
+        if factory.exchange != self.exchange or factory.symbol != self.symbol:
+            raise ValueError(
+                f"CandleEngine for {self.exchange}/{self.symbol} cannot drive factory for {factory.exchange}/{factory.symbol}"
+            )
+        if not self.factories:
+            self.precision_digits = factory.precision_digits
+        self.factories[factory.timeframe_str] = factory
+        factory.engine = self
+        logging.debug("CandleEngine %s/%s attached %s", self.exchange, self.symbol, factory.timeframe_str)
+
+    def detach(self, factory: "CandleFactory") -> None:
+        """Stop feeding *factory*; the engine unregisters itself once empty."""
+        for timeframe, attached in list(self.factories.items()):
+            if attached is factory:
+                del self.factories[timeframe]
+        factory.engine = None
+        logging.debug("CandleEngine %s/%s detached %s", self.exchange, self.symbol, factory.timeframe_str)
+        if not self.factories:
+            self.cleanup()
+
+    @property
+    def base_timeframe_ms(self) -> Optional[int]:
+        """Finest bucket width that every attached timeframe is a whole multiple of."""
+        base = 0
+        for factory in self.factories.values():
+            base = math.gcd(base, factory.timeframe_ms)
+        return base or None
+
+    def _on_new_trades(self, events: List[dict]):
+        """Queues a delivered batch of NEW_TRADE payloads and flushes by count or interval."""
+        for event in events:
+            trade_data = event.get("trade_data")
+            if event.get("exchange") == self.exchange and trade_data and trade_data.get("symbol") == self.symbol:
+                self._trade_queue.append(trade_data)
+        if (
+            len(self._trade_queue) >= self.max_trades_per_candle_update
+            or (time.time() - self.last_update_time) >= self.flush_interval
+        ):
+            self._process_trade_batch()
+
+    def _process_trade_batch(self):
+        """Reduces queued trades once to base buckets and rolls them into every factory."""
+        if not self._trade_queue:
+            return
+        batch_trades: List[dict] = list(self._trade_queue)
+        self._trade_queue.clear()
+        self.last_update_time = time.time()
+
+        base_ms = self.base_timeframe_ms
+        if base_ms is None:
+            return
+
+        timestamps_ms, prices, amounts = trades_to_arrays(batch_trades, self.precision_digits)
+        base = reduce_to_buckets(timestamps_ms, prices, prices, prices, prices, amounts, base_ms)
+        base_starts_ms = (base[:, 0] * 1000).round().astype("int64")
+        opens, highs, lows, closes, volumes = (base[:, i] for i in range(1, 6))
+
+        logging.debug(
+            "CandleEngine %s/%s folded %d trades into %d base bars for %d timeframes",
+            self.exchange, self.symbol, len(batch_trades), len(base), len(self.factories),
+        )
+        for factory in list(self.factories.values()):
+            try:
+                factory.ingest_bars(base_starts_ms, opens, highs, lows, closes, volumes)
+            except Exception as e:
+                logging.error(
+                    f"CandleEngine ({self.exchange}/{self.symbol}) failed to update {factory.timeframe_str}: {e}",
+                    exc_info=True,
+                )
+
+    def cleanup(self):
+        """Unregister the shared trade listener."""
+        try:
+            self.emitter.unregister_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trades)
+        except Exception as e:
+            logging.error(f"Error during CandleEngine cleanup for {self.exchange}/{self.symbol}: {e}", exc_info=True)
@@ -8,11 +8,13 @@ from datetime import datetime
 import numpy as np
 
 from ..signals import SignalEmitter, Signals
+from .ohlcv_buffer import OHLCVBuffer, reduce_to_buckets, trades_to_arrays
 from sentinel.core.runtime_utils import timeframe_to_seconds
 
 if TYPE_CHECKING:
     from .data_source import Data
     from ..task_manager import TaskManager
+    from .candle_engine import CandleEngine
 
 
 class CandleFactory:
@@ -25,6 +27,8 @@ class CandleFactory:
         task_manager: "TaskManager",
         data: "Data",
         initial_candles: Optional[pd.DataFrame] = None,
+        max_history: int = 10_000,
+        subscribe_trades: bool = True,
     ):
         self.exchange = exchange
         self.symbol = symbol
@@ -45,10 +49,8 @@ class CandleFactory:
         except Exception as e:
             logging.warning(f"Could not get price precision for {self.symbol}: {e}")
             
-        # Initialize empty OHLCV dataframe
-        self.ohlcv = pd.DataFrame(
-            columns=["dates", "opens", "highs", "lows", "closes", "volumes"]
-        )
+        # Preallocated OHLCV store; `ohlcv` exposes it as a zero-copy DataFrame
+        self._candles = OHLCVBuffer(max_history=max_history)
         self.last_candle_timestamp = None
         self.price_precision = price_precision # Store precision if needed later
         # Convert precision to number of decimal digits for rounding
@@ -65,14 +67,24 @@ class CandleFactory:
         self.flush_interval = 0.25  # seconds
         self.last_update_time = time.time()
 
-        self._register_event_listeners()
+        # Set by CandleEngine.attach() when trades are folded once per symbol
+        # and fed to this factory via ingest_bars() instead of NEW_TRADE.
+        self.engine: Optional["CandleEngine"] = None
+        if subscribe_trades:
+            self._register_event_listeners()
+
+    @property
+    def ohlcv(self) -> pd.DataFrame:
+        """Read-only DataFrame view over the candle buffer."""
+        return self._candles.to_frame()
+
+    @ohlcv.setter
+    def ohlcv(self, frame: Optional[pd.DataFrame]) -> None:
+        self._candles.replace(frame)
 
     def _register_event_listeners(self):
-        event_mappings = {
-            Signals.NEW_TRADE: self._on_new_trade,
-        }
-        for signal, handler in event_mappings.items():
-            self.emitter.register(signal, handler)
+        # Keyed on (exchange, symbol) so trades for other markets never reach this factory
+        self.emitter.register_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trade)
 
     def _on_new_trade(self, exchange: str, trade_data: dict):
         """Handles incoming trade data, queues it, and triggers batch processing."""
@@ -120,41 +132,99 @@ class CandleFactory:
             # logging.warning(f"CandleFactory received empty trade batch for {self.symbol}") # Already logged upstream
             return
 
-        # Sort trades by timestamp to ensure proper processing
-        batch_trades.sort(key=lambda x: x["timestamp"])
+        # Fold the whole batch into candles in one vectorized pass
+        timestamps_ms, prices, amounts = trades_to_arrays(batch_trades, self.precision_digits)
+        updated = self._fold_bars(timestamps_ms, prices, prices, prices, prices, amounts)
 
-        # Process each trade and track if any update occurred
-        updated = False
-        for trade in batch_trades:
-            if self._process_trade(trade): # Call the internal processing method
-                 updated = True
-
-        updated_candles = self.ohlcv if updated else None # Return the internal df if updated
         # --- End: Migrated Logic ---
 
         # If candles were updated, emit the update with full market identifiers
-        if updated_candles is not None and not updated_candles.empty:
-            # Get the last row, which is the updated candle
-            last_candle_series = self.ohlcv.iloc[-1]
-            
-            # Create a new DataFrame from this series.
-            last_candle_df = pd.DataFrame([last_candle_series])
-            
-            # Set the index to be a DatetimeIndex, but KEEP the original 'dates' column.
-            # This makes the format consistent with the initial historical data load.
-            last_candle_df.set_index(pd.to_datetime(last_candle_df['dates'], unit='s'), inplace=True, drop=False)
-            
-            logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) emitting UPDATED_CANDLES signal")
-            self.emitter.emit(
-                Signals.UPDATED_CANDLES,
-                exchange=self.exchange,
-                symbol=self.symbol,
-                timeframe=self.timeframe_str,
-                candles=last_candle_df,
-            )
+        if updated:
+            self._emit_last_candle()
             
         self.last_update_time = time.time()
 
+    def ingest_bars(self, timestamps_ms, opens, highs, lows, closes, volumes) -> bool:
+        """
+        Fold pre-aggregated bars (or trades) from a shared `CandleEngine` and emit the live candle.
+
+        The rows must be sorted by time and come from a timeframe that evenly
+        divides this factory's timeframe.
+
+        Returns:
+            True if the candle data changed, False otherwise
+        """
+        updated = self._fold_bars(timestamps_ms, opens, highs, lows, closes, volumes)
+        if updated:
+            self._emit_last_candle()
+        self.last_update_time = time.time()
+        return updated
+
+    def _emit_last_candle(self):
+        if self._candles.empty:
+            return
+        # Wrap the last row (the updated candle) without copying it out of the buffer.
+        last_candle_df = self._candles.to_frame(last_n=1)
+        
+        # Set the index to be a DatetimeIndex, but KEEP the original 'dates' column.
+        # This makes the format consistent with the initial historical data load.
+        last_candle_df.set_index(pd.to_datetime(last_candle_df['dates'], unit='s'), inplace=True, drop=False)
+        
+        logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) emitting UPDATED_CANDLES signal")
+        self.emitter.emit(
+            Signals.UPDATED_CANDLES,
+            exchange=self.exchange,
+            symbol=self.symbol,
+            timeframe=self.timeframe_str,
+            candles=last_candle_df,
+        )
+
+    @property
+    def timeframe_ms(self) -> int:
+        return int(round(self.timeframe_in_seconds * 1000))
+
+    def _fold_bars(self, timestamps_ms, opens, highs, lows, closes, volumes) -> bool:
+        """
+        Fold time-sorted rows into the candle buffer with NumPy reductions.
+
+        Rows are bucketed by integer division of their millisecond timestamps
+        and each bucket's OHLCV is reduced with ``reduceat``. The first bucket is
+        merged into the live candle when it shares its boundary; later buckets
+        are appended as new candles. Buckets older than the live candle are
+        dropped, matching `_process_trade`.
+
+        Returns:
+            True if the candle data changed, False otherwise
+        """
+        if len(timestamps_ms) == 0:
+            return False
+        bucket_rows = reduce_to_buckets(timestamps_ms, opens, highs, lows, closes, volumes, self.timeframe_ms)
+
+        candles = self._candles
+        if self.last_candle_timestamp is None and not candles.empty:
+            self.last_candle_timestamp = candles.last_timestamp
+
+        if self.last_candle_timestamp is not None:
+            stale = bucket_rows[:, 0] < self.last_candle_timestamp
+            if stale.any():
+                logging.warning(
+                    "CandleFactory (%s/%s/%s) ignoring %d bucket(s) older than last candle %s",
+                    self.exchange, self.symbol, self.timeframe_str, int(stale.sum()), self.last_candle_timestamp,
+                )
+                bucket_rows = bucket_rows[~stale]
+                if len(bucket_rows) == 0:
+                    return False
+
+        if not candles.empty and bucket_rows[0, 0] == self.last_candle_timestamp:
+            _, _, high, low, close, volume = bucket_rows[0]
+            candles.fold_into_last(high, low, close, volume)
+            bucket_rows = bucket_rows[1:]
+
+        if len(bucket_rows):
+            candles.extend(bucket_rows)
+            self.last_candle_timestamp = float(bucket_rows[-1, 0])
+        return True
+
     def _process_trade(self, trade_data: Dict) -> bool:
         """
         Process a single trade and update the internal OHLCV data if needed.
@@ -174,12 +244,14 @@ class CandleFactory:
 
         # --- Debug Logging Start ---
         log_prefix = f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) _process_trade:"
-        logging.debug(f"{log_prefix} Trade(ts={timestamp}, adj_ts={adjusted_timestamp}), LastCandle(ts={self.last_candle_timestamp}), TF(s)={self.timeframe_in_seconds}, OHLCV_Empty={self.ohlcv.empty}")
+        logging.debug(f"{log_prefix} Trade(ts={timestamp}, adj_ts={adjusted_timestamp}), LastCandle(ts={self.last_candle_timestamp}), TF(s)={self.timeframe_in_seconds}, OHLCV_Empty={self._candles.empty}")
         # --- Debug Logging End ---
 
+        candles = self._candles
+
         # Initialize last candle timestamp if not set
-        if self.last_candle_timestamp is None and not self.ohlcv.empty:
-            self.last_candle_timestamp = self.ohlcv["dates"].iloc[-1]
+        if self.last_candle_timestamp is None and not candles.empty:
+            self.last_candle_timestamp = candles.last_timestamp
         elif self.last_candle_timestamp is None:
             # If OHLCV is empty and no last timestamp, this is the very first trade
             logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) processing first trade.")
@@ -190,51 +262,25 @@ class CandleFactory:
         if adjusted_timestamp >= self.last_candle_timestamp + self.timeframe_in_seconds:
             logging.debug(f"{log_prefix} Branch 1: New Candle") # Debug
             # Start a new candle
-            logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) starting new candle at {datetime.fromtimestamp(self.last_candle_timestamp + self.timeframe_in_seconds)}")
-            new_candle = {
-                "dates": self.last_candle_timestamp + self.timeframe_in_seconds,
-                "opens": price,
-                "highs": price,
-                "lows": price,
-                "closes": price,
-                "volumes": volume,
-            }
-            # Add new candle to the dataframe
-            new_candle_df = pd.DataFrame([new_candle])
-            self.ohlcv = pd.concat([self.ohlcv, new_candle_df], ignore_index=True)
-            self.last_candle_timestamp += self.timeframe_in_seconds
+            logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) starting new candle at {datetime.fromtimestamp(adjusted_timestamp)}")
+            # Append the new candle in place (amortized O(1), no DataFrame rebuild).
+            # Open it at the trade's own boundary so quiet gaps don't shift later bars.
+            candles.append(adjusted_timestamp, price, price, price, price, volume)
+            self.last_candle_timestamp = adjusted_timestamp
             return True # Candle data changed
 
-        elif not self.ohlcv.empty and adjusted_timestamp == self.last_candle_timestamp:
+        elif not candles.empty and adjusted_timestamp == self.last_candle_timestamp:
             logging.debug(f"{log_prefix} Branch 2: Update Current Candle") # Debug
             # Update the current (last) candle if the trade falls within its boundary
             logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) updating current candle.")
-            last_idx = self.ohlcv.index[-1]
-            self.ohlcv.at[last_idx, "highs"] = max(
-                self.ohlcv.at[last_idx, "highs"], price
-            )
-            self.ohlcv.at[last_idx, "lows"] = min(
-                self.ohlcv.at[last_idx, "lows"], price
-            )
-            self.ohlcv.at[last_idx, "closes"] = price
-            self.ohlcv.at[last_idx, "volumes"] += volume
+            candles.apply_trade_to_last(price, volume)
             return True # Candle data changed
 
-        elif self.ohlcv.empty:
+        elif candles.empty:
             logging.debug(f"{log_prefix} Branch 3: Initialize First Candle") # Debug
             # Initialize the first candle if ohlcv is empty
             logging.debug(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) initializing first candle.")
-            new_candle = {
-                "dates": adjusted_timestamp,
-                "opens": price,
-                "highs": price,
-                "lows": price,
-                "closes": price,
-                "volumes": volume,
-            }
-            # Convert to DataFrame
-            new_candle_df = pd.DataFrame([new_candle])
-            self.ohlcv = new_candle_df
+            candles.append(adjusted_timestamp, price, price, price, price, volume)
             self.last_candle_timestamp = adjusted_timestamp
             return True # Candle data changed
 
@@ -285,7 +331,7 @@ class CandleFactory:
 
                     if not resampled.empty:
                         # Convert timestamps back to seconds
-                        resampled["dates"] = resampled.index.astype('int64') // 10**9
+                        resampled["dates"] = resampled.index.as_unit('s').astype('int64')
 
                         # Reset index to get dates as a column
                         resampled_data = resampled.reset_index(drop=True)[["dates", "opens", "highs", "lows", "closes", "volumes"]] # Ensure column order
@@ -294,7 +340,7 @@ class CandleFactory:
                         self.ohlcv = resampled_data.copy() # Store the resampled data
                         self.timeframe_str = new_timeframe
                         self.timeframe_in_seconds = new_timeframe_seconds
-                        self.last_candle_timestamp = self.ohlcv["dates"].iloc[-1] # Update last timestamp
+                        self.last_candle_timestamp = self._candles.last_timestamp # Update last timestamp
                         success = True
                         logging.info(f"CandleFactory ({self.exchange}/{self.symbol}) successfully resampled {len(self.ohlcv)} candles to {new_timeframe}")
                     else:
@@ -346,8 +392,8 @@ class CandleFactory:
             return 'min'
 
     def get_candle_data(self) -> pd.DataFrame:
-        """Returns the current internal OHLCV DataFrame."""
-        return self.ohlcv.copy() # Return a copy to prevent external modification
+        """Returns the current OHLCV data as a read-only, zero-copy DataFrame view."""
+        return self._candles.to_frame()
 
     def set_trade_batch(self, sender, app_data, user_data):
         self.max_trades_per_candle_update = app_data
@@ -398,10 +444,10 @@ class CandleFactory:
                 if not df_copy.empty:
                      self.ohlcv = df_copy.reset_index(drop=True) # Ensure clean index
                      # Ensure we take the last timestamp *after* potential ms -> s conversion
-                     self.last_candle_timestamp = self.ohlcv["dates"].iloc[-1] # This should now be in seconds
+                     self.last_candle_timestamp = self._candles.last_timestamp # This should now be in seconds
                      logging.debug(
                          "CandleFactory %s/%s/%s initialized with %d historical candles.",
-                         self.exchange, self.symbol, self.timeframe_str, len(self.ohlcv),
+                         self.exchange, self.symbol, self.timeframe_str, len(self._candles),
                      )
                 else:
                      logging.warning(f"CandleFactory ({self.exchange}/{self.symbol}/{self.timeframe_str}) initial data was empty after date processing.")
@@ -415,8 +461,12 @@ class CandleFactory:
         """Unregister listeners to prevent potential memory leaks."""
         try:
             logging.debug("Cleaning up CandleFactory for %s/%s/%s", self.exchange, self.symbol, self.timeframe_str)
+            if self.engine is not None:
+                # Trades arrive through the shared engine; just detach from it
+                self.engine.detach(self)
+                return
             # Unregister the specific listener method
-            self.emitter.unregister(Signals.NEW_TRADE, self._on_new_trade)
+            self.emitter.unregister_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trade)
             logging.debug(f"Unregistered NEW_TRADE listener for CandleFactory {self.exchange}/{self.symbol}/{self.timeframe_str}")
         except Exception as e:
             # Log if unregistering fails for some reason
@@ -205,7 +205,7 @@ class CandleFetcher:
             pd.to_datetime(since_timestamp, unit='ms', errors='coerce'), exchange.id,
         )
         key = self._generate_cache_key(exchange.id, symbol, timeframe)
-        path = f"{self.cache_store.cache_dir}/{key}.csv"
+        path = self.cache_store.path_for(key)
         timeframe_duration_in_seconds = exchange.parse_timeframe(timeframe)
         timeframe_duration_in_ms = timeframe_duration_in_seconds * 1000
         now = exchange.milliseconds()
@@ -256,31 +256,50 @@ class CandleFetcher:
                 columns=["dates", "opens", "highs", "lows", "closes", "volumes"],
             )
             new_data_df["dates"] = new_data_df["dates"].astype("int64")
-            if not new_data_df.empty:
-                new_data_df["exchange"] = exchange.id
-                new_data_df["symbol"] = symbol
-                new_data_df["timeframe"] = timeframe
             if existing_df.empty:
                 combined_df = new_data_df
             else:
-                combined_df = pd.concat([existing_df, new_data_df])
-            existing_df = (
-                combined_df.drop_duplicates(subset=["dates"], keep="last")
-                .sort_values(by="dates")
-                .reset_index(drop=True)
-            )
+                combined_df = pd.concat([existing_df, new_data_df], ignore_index=True)
+            new_dates = new_data_df["dates"]
+            if (
+                not existing_df.empty
+                and new_dates.is_monotonic_increasing
+                and new_dates.is_unique
+                and new_dates.iloc[0] > existing_df["dates"].iloc[-1]
+            ):
+                # Common refresh: a clean tail after the cached history
+                existing_df = combined_df
+            else:
+                existing_df = (
+                    combined_df.drop_duplicates(subset=["dates"], keep="last")
+                    .sort_values(by="dates")
+                    .reset_index(drop=True)
+                )
             logging.debug(
                 "Fetched/updated %d new rows for %s. Total rows now: %d.",
                 len(new_data_df), key, len(existing_df),
             )
 
         if not existing_df.empty:
-            await self.cache_store.save_cache(existing_df, path, key, exchange.id, symbol, timeframe)
+            if data_loaded_from_cache:
+                # History on disk is unchanged; persist only the rows fetched now.
+                # Prepended rows land out of order and are compacted later.
+                delta_frames = []
+                if n_prepended > 0:
+                    delta_frames.append(existing_df.iloc[:n_prepended])
+                if n_delta:
+                    delta_frames.append(new_data_df)
+                if delta_frames:
+                    await self.cache_store.append_cache(
+                        pd.concat(delta_frames, ignore_index=True), path, key, exchange.id, symbol, timeframe
+                    )
+            else:
+                await self.cache_store.save_cache(existing_df, path, key, exchange.id, symbol, timeframe)
             all_candles[exchange_name][key] = existing_df.copy()
             return (exchange_name, key, {"from_cache": n_cached, "delta": n_prepended + n_delta})
         else:
             logging.debug(
-                "No data fetched or found in cache for %s %s %s. CSV not created/updated at %s.",
+                "No data fetched or found in cache for %s %s %s. Cache not created/updated at %s.",
                 exchange.id, symbol, timeframe, path,
             )
             if exchange_name not in all_candles:
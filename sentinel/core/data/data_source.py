@@ -130,6 +130,25 @@ class Data(CCXTInterface):
     ) -> None:
         await self.streamer.watch_orderbook(exchange, symbol, stop_event, sink, queue, cadence_ms)
 
+    async def watch_trades_for_symbols(
+        self,
+        exchange: str,
+        symbols: List[str],
+        stop_event: asyncio.Event,
+        sink: Callable[[Dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        await self.streamer.watch_trades_for_symbols(exchange, symbols, stop_event, sink)
+
+    async def watch_orderbook_for_symbols(
+        self,
+        exchange: str,
+        symbols: List[str],
+        stop_event: asyncio.Event,
+        sink: Callable[[Dict[str, Any]], Awaitable[None]],
+        cadence_ms: int = 500,
+    ) -> None:
+        await self.streamer.watch_orderbook_for_symbols(exchange, symbols, stop_event, sink, cadence_ms)
+
     async def watch_ticker(self, exchange_id: str, symbol: str, stop_event: asyncio.Event) -> None:
         await self.streamer.watch_ticker(exchange_id, symbol, stop_event)
 
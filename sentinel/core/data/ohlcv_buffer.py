@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["dates", "opens", "highs", "lows", "closes", "volumes"]
+
+DATES, OPENS, HIGHS, LOWS, CLOSES, VOLUMES = range(len(OHLCV_COLUMNS))
+
+
+class OHLCVBuffer:
+    """Preallocated column-oriented OHLCV store with a bounded history.
+
+    Rows live in a single ``(capacity, 6)`` float64 block so the live window is
+    always one contiguous slice. Appends write into spare capacity; when the
+    block is full the retained rows are moved into a freshly allocated block,
+    which keeps appends amortized O(1) and leaves views that were already
+    handed out pointing at their original memory.
+
+    ``max_history`` bounds live growth only: history loaded with
+    :meth:`replace` is kept in full, and the window may grow by up to
+    ``max_history`` bars beyond it before the oldest bars are evicted.
+
+    Views returned by :meth:`view` and :meth:`to_frame` are read-only and share
+    memory with the buffer, so the last bar they expose keeps tracking in-place
+    updates until the next reallocation.
+    """
+
+    def __init__(self, max_history: int = 10_000, initial_capacity: int = 1024):
+        if max_history <= 0:
+            raise ValueError("max_history must be positive")
+        self.max_history = int(max_history)
+        self._limit = self.max_history # Row cap of the live window, raised by replace()
+        capacity = max(1, min(int(initial_capacity), 2 * self.max_history))
+        self._data = np.empty((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def empty(self) -> bool:
+        return self._end == self._start
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        if self.empty:
+            return None
+        return float(self._data[self._end - 1, DATES])
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def clear(self) -> None:
+        self._start = 0
+        self._end = 0
+        self._limit = self.max_history
+
+    def append(self, date: float, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Append a new bar, evicting the oldest once the history cap is reached."""
+        if self._end == self._data.shape[0]:
+            self._reserve(1)
+        self._data[self._end] = (date, open_, high, low, close, volume)
+        self._end += 1
+        if self._end - self._start > self._limit:
+            self._start = self._end - self._limit
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Append a ``(n, 6)`` block of bars in one copy."""
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != len(OHLCV_COLUMNS):
+            raise ValueError(f"expected an (n, {len(OHLCV_COLUMNS)}) array, got shape {rows.shape}")
+        if len(rows) > self._limit:
+            rows = rows[-self._limit:]
+        n = len(rows)
+        if n == 0:
+            return
+        if self._end + n > self._data.shape[0]:
+            self._reserve(n)
+        self._data[self._end:self._end + n] = rows
+        self._end += n
+        if self._end - self._start > self._limit:
+            self._start = self._end - self._limit
+
+    def update_last(self, high: float, low: float, close: float, volume: float) -> None:
+        """Overwrite H/L/C/V of the most recent bar in place."""
+        if self.empty:
+            raise IndexError("update_last on an empty OHLCVBuffer")
+        row = self._data[self._end - 1]
+        row[HIGHS] = high
+        row[LOWS] = low
+        row[CLOSES] = close
+        row[VOLUMES] = volume
+
+    def apply_trade_to_last(self, price: float, volume: float) -> None:
+        """Fold a single trade into the most recent bar in place."""
+        self.fold_into_last(price, price, price, volume)
+
+    def fold_into_last(self, high: float, low: float, close: float, volume: float) -> None:
+        """Merge an already-reduced run of trades into the most recent bar in place."""
+        if self.empty:
+            raise IndexError("fold_into_last on an empty OHLCVBuffer")
+        row = self._data[self._end - 1]
+        if high > row[HIGHS]:
+            row[HIGHS] = high
+        if low < row[LOWS]:
+            row[LOWS] = low
+        row[CLOSES] = close
+        row[VOLUMES] += volume
+
+    def replace(self, frame: Optional[pd.DataFrame]) -> None:
+        """Reset the buffer from a DataFrame carrying the standard OHLCV columns.
+
+        Every row is kept; ``max_history`` more bars may be appended before eviction starts.
+        """
+        self.clear()
+        if frame is None or frame.empty:
+            return
+        missing = [col for col in OHLCV_COLUMNS if col not in frame.columns]
+        if missing:
+            logging.error(f"OHLCVBuffer.replace missing columns: {missing}")
+            return
+        rows = frame[OHLCV_COLUMNS].to_numpy(dtype=np.float64, copy=False)
+        self._limit = len(rows) + self.max_history
+        self.extend(rows)
+
+    def _reserve(self, extra: int) -> None:
+        live = self._end - self._start
+        keep = min(live, self._limit)
+        needed = keep + extra
+        # Grow geometrically up to twice the history cap; at the cap a move
+        # frees at least max_history slots, so moves stay amortized O(1).
+        new_capacity = max(needed, min(2 * self._data.shape[0], self._limit + self.max_history))
+        # Always move into a new block so outstanding views stay valid.
+        fresh = np.empty((new_capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        fresh[:keep] = self._data[self._end - keep:self._end]
+        self._data = fresh
+        self._start = 0
+        self._end = keep
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+    def view(self, last_n: Optional[int] = None) -> np.ndarray:
+        """Return a read-only ``(n, 6)`` view of the live window (or its tail)."""
+        start = self._start
+        if last_n is not None:
+            start = max(start, self._end - int(last_n))
+        out = self._data[start:self._end]
+        out.flags.writeable = False
+        return out
+
+    def column(self, name: str) -> np.ndarray:
+        out = self._data[self._start:self._end, OHLCV_COLUMNS.index(name)]
+        out.flags.writeable = False
+        return out
+
+    def to_frame(self, last_n: Optional[int] = None) -> pd.DataFrame:
+        """Wrap the live window in a DataFrame.
+
+        The price and volume columns share memory with the buffer; ``dates`` is
+        an int64 copy, matching the epoch-second column the rest of the app expects.
+        """
+        view = self.view(last_n)
+        frame = pd.DataFrame(view[:, OPENS:], columns=OHLCV_COLUMNS[OPENS:], copy=False)
+        frame.insert(DATES, "dates", view[:, DATES].astype(np.int64))
+        return frame
+
+
+def trades_to_arrays(trades, precision_digits: int):
+    """Convert trade dicts to time-sorted ``(timestamps_ms, prices, amounts)`` arrays.
+
+    Prices are rounded to ``precision_digits``. The sort is stable so trades
+    sharing a timestamp keep their arrival order.
+    """
+    n = len(trades)
+    timestamps_ms = np.fromiter((t["timestamp"] for t in trades), dtype=np.int64, count=n)
+    prices = np.fromiter((t["price"] for t in trades), dtype=np.float64, count=n)
+    amounts = np.fromiter((t["amount"] for t in trades), dtype=np.float64, count=n)
+
+    if n > 1 and np.any(timestamps_ms[1:] < timestamps_ms[:-1]):
+        order = np.argsort(timestamps_ms, kind="stable")
+        timestamps_ms = timestamps_ms[order]
+        prices = prices[order]
+        amounts = amounts[order]
+    return timestamps_ms, np.round(prices, precision_digits), amounts
+
+
+def reduce_to_buckets(timestamps_ms, opens, highs, lows, closes, volumes, bucket_ms: int):
+    """Group time-sorted rows into ``bucket_ms`` buckets and reduce each to one OHLCV bar.
+
+    Rows may be raw trades (open == high == low == close == price) or bars of a
+    finer timeframe that divides ``bucket_ms``. Returns an ``(n, 6)`` array
+    whose dates column holds bucket starts in seconds.
+    """
+    starts_ms = timestamps_ms // bucket_ms * bucket_ms
+    # Run boundaries: index of the first row of every bucket
+    bounds = np.flatnonzero(np.diff(starts_ms)) + 1
+    bounds = np.concatenate(([0], bounds))
+    last_idx = np.append(bounds[1:], starts_ms.size) - 1
+
+    rows = np.empty((bounds.size, len(OHLCV_COLUMNS)), dtype=np.float64)
+    rows[:, DATES] = starts_ms[bounds] / 1000.0
+    rows[:, OPENS] = opens[bounds]
+    rows[:, HIGHS] = np.maximum.reduceat(highs, bounds)
+    rows[:, LOWS] = np.minimum.reduceat(lows, bounds)
+    rows[:, CLOSES] = closes[last_idx]
+    rows[:, VOLUMES] = np.add.reduceat(volumes, bounds)
+    return rows
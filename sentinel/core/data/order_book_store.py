@@ -0,0 +1,50 @@
+import logging
+from typing import Dict, Optional, Tuple
+
+from sentinel.analysis.order_book_model import OrderBookModel
+from ..signals import SignalEmitter, Signals
+
+
+class OrderBookStore:
+    """Keeps one `OrderBookModel` per (exchange, symbol) in step with ORDER_BOOK_UPDATE.
+
+    The store listens once for every market, so however many widgets show the
+    same book, each update is diffed and applied a single time. Widgets read
+    the shared model through `get` when they render.
+    """
+
+    def __init__(self, emitter: "SignalEmitter"):
+        self.emitter = emitter
+        self.books: Dict[Tuple[str, str], OrderBookModel] = {}
+        self.emitter.register(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+
+    def get(self, exchange: str, symbol: str) -> Optional[OrderBookModel]:
+        """Return the model for a market, or None if no book has arrived for it yet."""
+        return self.books.get((exchange, symbol))
+
+    def _on_order_book_update(self, exchange: str, orderbook: dict):
+        symbol = orderbook.get("symbol") if orderbook else None
+        if not symbol:
+            logging.debug(f"OrderBookStore ignoring order book without symbol from {exchange}")
+            return
+        model = self.books.get((exchange, symbol))
+        if model is None:
+            model = self.books[(exchange, symbol)] = OrderBookModel(exchange, symbol)
+        model.apply_snapshot(
+            orderbook.get("bids") or [],
+            orderbook.get("asks") or [],
+            nonce=orderbook.get("nonce"),
+            timestamp=orderbook.get("timestamp"),
+        )
+
+    def discard(self, exchange: str, symbol: str) -> None:
+        """Forget a market's book, e.g. after its stream stopped."""
+        self.books.pop((exchange, symbol), None)
+
+    def cleanup(self):
+        """Unregister the listener and drop all books."""
+        try:
+            self.emitter.unregister(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+        except Exception as e:
+            logging.error(f"Error during OrderBookStore cleanup: {e}", exc_info=True)
+        self.books.clear()
@@ -164,6 +164,106 @@ class Streamer:
                 await asyncio.sleep(5)
         logging.debug("Trade stream for %s on %s stopped.", symbol, exchange)
 
+    async def watch_trades_for_symbols(
+        self,
+        exchange: str,
+        symbols: List[str],
+        stop_event: asyncio.Event,
+        sink: Callable[[Dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """Stream trades for several symbols of one exchange into *sink*.
+
+        Uses a single ``watchTradesForSymbols`` loop where the exchange
+        supports it; otherwise runs one `watch_trades` loop per symbol on the
+        shared exchange connection. Events have the `watch_trades` shape.
+        """
+        exchange_object = self.exchange_list[exchange]
+        if len(symbols) == 1 or not exchange_object.has.get("watchTradesForSymbols"):
+            await asyncio.gather(*(self.watch_trades(symbol, exchange, stop_event, sink=sink) for symbol in symbols))
+            return
+
+        logging.debug("Starting multi-symbol trade stream for %s on %s", symbols, exchange)
+        while not stop_event.is_set():
+            try:
+                trades_list = await exchange_object.watchTradesForSymbols(symbols)
+                for trade_data in trades_list or ():
+                    await sink({"exchange": exchange, "trade_data": trade_data})
+            except asyncio.CancelledError:
+                logging.debug("Multi-symbol trade stream for %s on %s cancelled.", symbols, exchange)
+                break
+            except ccxt.NetworkError as e:
+                logging.warning(
+                    f"NetworkError in watch_trades_for_symbols for {symbols} on {exchange}: {e}. Retrying after delay..."
+                )
+                await asyncio.sleep(
+                    exchange_object.rateLimit / 1000 if exchange_object.rateLimit > 0 else 5
+                )
+            except ccxt.ExchangeError as e:
+                logging.error(f"ExchangeError in watch_trades_for_symbols for {symbols} on {exchange}: {e}.")
+                await asyncio.sleep(5)
+            except Exception as e:
+                logging.error(
+                    f"Unexpected error in watch_trades_for_symbols for {symbols} on {exchange}: {e}",
+                    exc_info=True,
+                )
+                await asyncio.sleep(5)
+        logging.debug("Multi-symbol trade stream for %s on %s stopped.", symbols, exchange)
+
+    async def watch_orderbook_for_symbols(
+        self,
+        exchange: str,
+        symbols: List[str],
+        stop_event: asyncio.Event,
+        sink: Callable[[Dict[str, Any]], Awaitable[None]],
+        cadence_ms: int = 500,
+    ) -> None:
+        """Stream order books for several symbols of one exchange into *sink*.
+
+        Like `watch_trades_for_symbols`, this uses one
+        ``watchOrderBookForSymbols`` loop where supported and falls back to a
+        `watch_orderbook` loop per symbol. *cadence_ms* throttles each symbol
+        separately, with the same semantics as `watch_orderbook`.
+        """
+        exchange_object = self.exchange_list[exchange]
+        if len(symbols) == 1 or not exchange_object.has.get("watchOrderBookForSymbols"):
+            await asyncio.gather(
+                *(self.watch_orderbook(exchange, symbol, stop_event, sink=sink, cadence_ms=cadence_ms) for symbol in symbols)
+            )
+            return
+
+        logging.debug("Starting multi-symbol orderbook stream for %s on %s with %sms cadence.", symbols, exchange, cadence_ms)
+        throttle_interval_seconds = cadence_ms / 1000.0
+        last_emit_time: Dict[str, float] = {}
+        while not stop_event.is_set():
+            try:
+                orderbook = await exchange_object.watchOrderBookForSymbols(symbols)
+                if not orderbook:
+                    continue
+                symbol = orderbook.get("symbol")
+                current_time = asyncio.get_running_loop().time()
+                if current_time - last_emit_time.get(symbol, 0) >= throttle_interval_seconds:
+                    last_emit_time[symbol] = current_time
+                    await sink({"exchange": exchange, "orderbook": orderbook})
+            except asyncio.CancelledError:
+                logging.debug("Multi-symbol orderbook stream for %s on %s cancelled.", symbols, exchange)
+                break
+            except ccxt.NetworkError as e:
+                logging.warning(
+                    f"NetworkError in watch_orderbook_for_symbols for {symbols} on {exchange}: {e}. Retrying after delay..."
+                )
+                await asyncio.sleep(
+                    exchange_object.rateLimit / 1000 if exchange_object.rateLimit > 0 else 5
+                )
+            except ccxt.ExchangeError as e:
+                logging.error(f"ExchangeError in watch_orderbook_for_symbols for {symbols} on {exchange}: {e}.")
+                await asyncio.sleep(5)
+            except Exception as e:
+                logging.error(
+                    f"Error in multi-symbol orderbook stream for {symbols} on {exchange}: {e}", exc_info=True
+                )
+                await asyncio.sleep(1)
+        logging.debug("Multi-symbol orderbook stream for %s on %s stopped.", symbols, exchange)
+
     async def watch_orderbooks(self, symbols: List[str], stop_event: asyncio.Event) -> None:
         for exchange_id in self.exchange_list.keys():
             exchange_object = self.exchange_list[exchange_id]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+
+TRADE_COLUMNS = ["timestamps", "prices", "amounts", "sides"]
+
+TIMESTAMPS, PRICES, AMOUNTS, SIDES = range(len(TRADE_COLUMNS))
+
+SIDE_BUY = 1.0
+SIDE_SELL = -1.0
+
+
+class TradeBuffer:
+    """Fixed-capacity columnar store of the most recent trades.
+
+    Trades are kept as ``(timestamp seconds, price, amount, side)`` rows in
+    one ``(2 * capacity, 4)`` float64 block, with sides encoded as
+    `SIDE_BUY` / `SIDE_SELL`. Like `OHLCVBuffer`, appends write into spare
+    room and the newest ``capacity`` rows are moved to the front once the
+    block is full, so the live window is always one contiguous slice and an
+    append is amortized O(1) with no per-trade objects retained.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._data = np.empty((2 * self.capacity, len(TRADE_COLUMNS)), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def clear(self) -> None:
+        self._start = 0
+        self._end = 0
+
+    def append(self, timestamp: float, price: float, amount: float, side: float) -> None:
+        """Add one trade, evicting the oldest once ``capacity`` is reached."""
+        if self._end == self._data.shape[0]:
+            keep = min(self._end - self._start, self.capacity - 1)
+            self._data[:keep] = self._data[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._data[self._end] = (timestamp, price, amount, side)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start = self._end - self.capacity
+
+    def append_trade(self, trade: dict) -> None:
+        """Add a CCXT-style trade dict (millisecond ``timestamp``, ``side`` of buy/sell)."""
+        self.append(
+            float(trade.get("timestamp", 0) or 0) / 1000.0,
+            float(trade.get("price", 0.0) or 0.0),
+            float(trade.get("amount", 0.0) or 0.0),
+            SIDE_BUY if trade.get("side", "") == "buy" else SIDE_SELL,
+        )
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Read-only timestamp, price, amount and side columns, oldest first."""
+        out = self._data[self._start:self._end]
+        out.flags.writeable = False
+        return out[:, TIMESTAMPS], out[:, PRICES], out[:, AMOUNTS], out[:, SIDES]
+
+
+def aggregate_trades(timestamps, prices, amounts, sides, time_bucket: float, price_bucket: float):
+    """Merge trades that share a time bucket, price bucket and side into one.
+
+    Returns ``(timestamps, prices, amounts, sides)`` with amounts summed and
+    timestamps/prices amount-weighted (plain means for all-zero groups).
+    """
+    keys = np.column_stack(
+        [
+            np.floor(timestamps / max(time_bucket, 1e-12)),
+            np.round(prices / max(price_bucket, 1e-12)),
+            sides,
+        ]
+    )
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse)
+    totals = np.bincount(inverse, weights=amounts)
+    weighted = totals > 0
+    safe_totals = np.where(weighted, totals, 1.0)
+    out_ts = np.where(
+        weighted,
+        np.bincount(inverse, weights=amounts * timestamps) / safe_totals,
+        np.bincount(inverse, weights=timestamps) / counts,
+    )
+    out_prices = np.where(
+        weighted,
+        np.bincount(inverse, weights=amounts * prices) / safe_totals,
+        np.bincount(inverse, weights=prices) / counts,
+    )
+    return out_ts, out_prices, totals, groups[:, 2]
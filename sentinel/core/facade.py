@@ -5,6 +5,7 @@ from typing import Callable
 from .signals import SignalEmitter, Signals
 from .task_manager import TaskManager
 from .data.data_source import Data
+from .data.order_book_store import OrderBookStore
 from .data.influx import InfluxDB
 from .data.sec_api import SECDataFetcher
 
@@ -52,6 +53,12 @@ class CoreServicesFacade:
         # Now that the TaskManager has a running loop, provide it to the emitter
         # and data source for thread-safe operations.
         self.emitter.set_loop(self.task_manager.loop)
+        # Stream events are drained once per loop iteration; order book and
+        # ticker snapshots collapse to the latest per market within a drain.
+        self.emitter.enable_batching()
+        # One incrementally maintained book per market, shared by all widgets
+        self.order_books = OrderBookStore(self.emitter)
+        self.task_manager.order_books = self.order_books
         self.data.task_manager = self.task_manager
         
         logger.debug("CoreServicesFacade initialized.")
@@ -66,15 +73,20 @@ class CoreServicesFacade:
         """
         if self.task_manager.mode == "external":
             raise RuntimeError("Use await start_async() when TaskManager is in external mode.")
+        # One-time conversion of legacy CSV candle caches; later starts find nothing to do
+        self.task_manager.run_task_until_complete(self.data.cache_store.migrate_csv_caches())
         # Use the task manager to run the async load_exchanges method and wait for it to complete.
         self.task_manager.run_task_until_complete(
             self.data.load_exchanges(exchanges)
         )
+        self.task_manager.start_cache_compaction()
         logger.info("Core services started for exchanges: %s", exchanges)
 
     async def start_async(self, exchanges: list[str]):
         """Starts core services asynchronously (required for external loop mode)."""
+        await self.data.cache_store.migrate_csv_caches()
         await self.data.load_exchanges(exchanges)
+        self.task_manager.start_cache_compaction()
         logger.debug("Core services started asynchronously for exchanges: %s", exchanges)
 
     def subscribe_to_candles(self, exchange: str, symbol: str, timeframe: str, widget_instance: object):
@@ -122,10 +134,12 @@ class CoreServicesFacade:
         if self.task_manager.mode == "external":
             raise RuntimeError("Use await aclose() in external mode.")
         self.task_manager.cleanup()
+        self.order_books.cleanup()
         logger.info("CoreServicesFacade cleanup complete.")
 
     async def aclose(self):
         """Async shutdown path for external loop integrations."""
         logger.debug("CoreServicesFacade async cleanup initiated.")
         await self.task_manager.aclose()
+        self.order_books.cleanup()
         logger.debug("CoreServicesFacade async cleanup complete.")
@@ -2,7 +2,7 @@ from enum import Enum, auto
 import logging
 import queue
 import threading
-from typing import Callable
+from typing import Callable, Hashable, Optional
 from collections import deque
 from functools import partial
 import asyncio
@@ -46,9 +46,61 @@ class Signals(Enum):
     TASK_ERROR = auto()   # data: {'task_name': str, 'error': Exception}
 
 
+def _market_key(args, kwargs) -> Optional[tuple]:
+    """Best-effort (exchange, symbol) routing key for market data payloads."""
+    exchange = kwargs.get("exchange", args[0] if args else None)
+    symbol = kwargs.get("symbol")
+    if symbol is None:
+        payload = kwargs.get("trade_data", kwargs.get("orderbook"))
+        if payload is None and len(args) > 1:
+            payload = args[1]
+        if isinstance(payload, dict):
+            symbol = payload.get("symbol")
+        elif isinstance(payload, str):
+            symbol = payload
+    if exchange is None or symbol is None:
+        return None
+    return (exchange, symbol)
+
+
+# Market data signals that collapse to the newest payload per (exchange, symbol)
+# when batched delivery coalesces a drain.
+DEFAULT_COALESCED_SIGNALS = frozenset({Signals.ORDER_BOOK_UPDATE, Signals.NEW_TICKER_DATA})
+
+# Queue marker for a whole drained batch handed to the main thread
+_BATCH = object()
+
+
+# Signals that support keyed subscriptions, and how to derive the routing key
+# from an emitted payload. A key of None means "unknown" and falls back to
+# delivering to every keyed listener of that signal.
+_KEY_EXTRACTORS = {
+    Signals.NEW_TRADE: _market_key,
+    Signals.ORDER_BOOK_UPDATE: _market_key,
+    Signals.NEW_TICKER_DATA: _market_key,
+}
+
+
 class SignalEmitter:
     def __init__(self) -> None:
         self._callbacks = {}
+        # signal -> {key: [callbacks]} for keyed (e.g. per exchange/symbol) listeners
+        self._keyed_callbacks = {}
+        self._keyed_totals = {}
+        # How many keyed callbacks were *not* invoked compared to a plain broadcast
+        self._skipped_callbacks = {}
+        # Batch subscribers receive a list of keyword payloads per drain
+        self._batch_callbacks = {}
+        self._keyed_batch_callbacks = {}
+
+        # --- Batched cross-thread delivery (off until enable_batching()) ---
+        # Producers only append to a deque (atomic under the GIL); one
+        # scheduled drain per loop iteration delivers everything buffered.
+        self._batching = False
+        self._coalesced_signals = frozenset()
+        self._pending: "deque[tuple]" = deque()
+        self._drain_scheduled = False
+        self.batch_stats = {"events": 0, "drains": 0, "coalesced": 0}
         self._queue = queue.Queue()
         self._main_thread_id = threading.get_ident()
         self.loop: asyncio.AbstractEventLoop = None
@@ -63,6 +115,22 @@ class SignalEmitter:
         """Set the asyncio event loop for scheduling async callbacks."""
         self.loop = loop
 
+    def enable_batching(self, coalesce=DEFAULT_COALESCED_SIGNALS):
+        """Buffer `emit_threadsafe` events and deliver them in one drain per loop iteration.
+
+        Args:
+            coalesce: Signals that keep only the newest payload per
+                (exchange, symbol) within a drain. Pass an empty set to deliver
+                every event.
+        """
+        self._coalesced_signals = frozenset(coalesce)
+        self._batching = True
+
+    def disable_batching(self):
+        """Return to per-event delivery, flushing anything still buffered."""
+        self._batching = False
+        self._drain_pending()
+
     # ------------------------------------------------------------------
     # Public helpers for borrowing & recycling small payload dicts
     # ------------------------------------------------------------------
@@ -95,8 +163,15 @@ class SignalEmitter:
 
         The *loop* argument should be the *main-thread* asyncio event loop.  If
         called from that same thread we simply fall back to the regular emit.
+        With batching enabled, events are buffered instead and the loop gets a
+        single drain callback per iteration, however many events arrive.
         """
-        if threading.get_ident() == self._main_thread_id:
+        if self._batching and loop is not None:
+            self._pending.append((signal, args, kwargs))
+            if not self._drain_scheduled:
+                self._drain_scheduled = True
+                loop.call_soon_threadsafe(self._drain_pending)
+        elif threading.get_ident() == self._main_thread_id:
             self.emit(signal, *args, **kwargs)
         else:
             # We capture *signal*, *args* and *kwargs* by value here so they are
@@ -105,13 +180,15 @@ class SignalEmitter:
             # the callback we must wrap the call to preserve keyword args.
             loop.call_soon_threadsafe(partial(self.emit, signal, *args, **kwargs))
 
-    def register(self, signal: Signals, callback: Callable):
+    def register(self, signal: Signals, callback: Callable, batched: bool = False):
         """
         Register a callback function for a given signal. The callback will be called when the signal is emitted.
 
         Args:
             signal (Signals): The signal to register the callback for.
             callback (Callable): The callback function to be called when the signal is emitted.
+            batched (bool): If True, the callback receives a single list of keyword
+                payloads per delivery instead of one call per event.
 
         Raises:
             ValueError: If the signal is not a member of the Signals enum.
@@ -119,10 +196,60 @@ class SignalEmitter:
         if not isinstance(signal, Signals):
             raise ValueError("signal must be an instance of Signals enum")
 
+        if batched:
+            self._batch_callbacks.setdefault(signal, []).append(callback)
+            return
         if signal not in self._callbacks:
             self._callbacks[signal] = []
         self._callbacks[signal].append(callback)
 
+    def register_keyed(self, signal: Signals, key: Hashable, callback: Callable, batched: bool = False):
+        """
+        Register a callback that only fires for payloads routed to *key*.
+
+        For market data signals the key is ``(exchange, symbol)``. A trade for
+        one market then reaches only the listeners for that market instead of
+        every listener of the signal. With ``batched=True`` the callback
+        receives a list of keyword payloads for its key, as with `register`.
+
+        Raises:
+            ValueError: If the signal is not a member of the Signals enum or does not support keyed routing.
+        """
+        if not isinstance(signal, Signals):
+            raise ValueError("signal must be an instance of Signals enum")
+        if signal not in _KEY_EXTRACTORS:
+            raise ValueError(f"{signal.name} does not support keyed subscriptions")
+
+        if batched:
+            self._keyed_batch_callbacks.setdefault(signal, {}).setdefault(key, []).append(callback)
+            return
+        self._keyed_callbacks.setdefault(signal, {}).setdefault(key, []).append(callback)
+        self._keyed_totals[signal] = self._keyed_totals.get(signal, 0) + 1
+
+    def unregister_keyed(self, signal: Signals, key: Hashable, callback: Callable):
+        """Unregister a callback previously added with :meth:`register_keyed`."""
+        if not isinstance(signal, Signals):
+            raise ValueError("signal must be an instance of Signals enum")
+
+        batch_by_key = self._keyed_batch_callbacks.get(signal)
+        if batch_by_key and callback in batch_by_key.get(key, []):
+            batch_by_key[key].remove(callback)
+            if not batch_by_key[key]:
+                del batch_by_key[key]
+            return
+
+        by_key = self._keyed_callbacks.get(signal)
+        if not by_key or key not in by_key:
+            return
+        by_key[key].remove(callback)
+        self._keyed_totals[signal] -= 1
+        if not by_key[key]:
+            del by_key[key]
+
+    def skipped_callback_counts(self) -> dict:
+        """Return, per signal name, how many keyed callbacks routing has skipped so far."""
+        return {signal.name: count for signal, count in self._skipped_callbacks.items()}
+
     def emit(self, signal: Signals, *args, **kwargs):
         """
         Emit a signal. If called from the main thread, execute callbacks directly.
@@ -141,12 +268,98 @@ class SignalEmitter:
 
         if threading.get_ident() == self._main_thread_id:
             self._execute_callbacks(signal, args, kwargs)
+            if signal in self._batch_callbacks or signal in self._keyed_batch_callbacks:
+                self._execute_batch_callbacks(signal, [kwargs])
+        elif self._batching:
+            # Drained together by the next process_signal_queue() call
+            self._pending.append((signal, args, kwargs))
         else:
             self._queue.put((signal, args, kwargs))
 
+    def _drain_pending(self):
+        """Deliver every buffered event, coalescing where configured."""
+        self._drain_scheduled = False
+        pending = self._pending
+        events = []
+        try:
+            while True:
+                events.append(pending.popleft())
+        except IndexError:
+            pass
+        if not events:
+            return
+        if threading.get_ident() == self._main_thread_id:
+            self._dispatch_batch(events)
+        else:
+            # One queue item per drain instead of one per event
+            self._queue.put((_BATCH, (events,), None))
+
+    def _dispatch_batch(self, events):
+        """Runs callbacks for a drained batch on the main thread."""
+        self.batch_stats["drains"] += 1
+        self.batch_stats["events"] += len(events)
+
+        if self._coalesced_signals:
+            # Latest-value-wins: drop every earlier event for the same (signal, market)
+            latest = {}
+            superseded = set()
+            for index, (signal, args, kwargs) in enumerate(events):
+                if signal not in self._coalesced_signals:
+                    continue
+                extractor = _KEY_EXTRACTORS.get(signal)
+                key = extractor(args, kwargs) if extractor else None
+                if extractor and key is None:
+                    continue  # unroutable payloads are never merged
+                previous = latest.get((signal, key))
+                if previous is not None:
+                    superseded.add(previous)
+                latest[(signal, key)] = index
+            if superseded:
+                self.batch_stats["coalesced"] += len(superseded)
+                events = [event for index, event in enumerate(events) if index not in superseded]
+
+        batched_payloads = {}
+        for signal, args, kwargs in events:
+            self._execute_callbacks(signal, args, kwargs)
+            if signal in self._batch_callbacks or signal in self._keyed_batch_callbacks:
+                batched_payloads.setdefault(signal, []).append(kwargs)
+        for signal, payloads in batched_payloads.items():
+            self._execute_batch_callbacks(signal, payloads)
+
+    def _execute_batch_callbacks(self, signal: Signals, payloads):
+        """Hands each batch subscriber the list of keyword payloads it should see."""
+        targets = [(callback, payloads) for callback in self._batch_callbacks.get(signal, [])]
+        by_key = self._keyed_batch_callbacks.get(signal)
+        if by_key:
+            grouped = {}
+            for kwargs in payloads:
+                grouped.setdefault(_KEY_EXTRACTORS[signal]((), kwargs), []).append(kwargs)
+            unkeyed = grouped.pop(None, [])
+            for key, callbacks in by_key.items():
+                routed = grouped.get(key, []) + unkeyed if unkeyed else grouped.get(key)
+                if routed:
+                    targets.extend((callback, routed) for callback in callbacks)
+        for callback, routed in targets:
+            try:
+                callback(routed)
+            except Exception as e:
+                logging.error(f"Error in batch callback {callback.__name__} for signal {signal.name}: {e}", exc_info=True)
+
     def _execute_callbacks(self, signal: Signals, args, kwargs):
         """ Safely executes callbacks for a given signal. """
         callbacks = self._callbacks.get(signal, [])
+        by_key = self._keyed_callbacks.get(signal)
+        if by_key:
+            key = _KEY_EXTRACTORS[signal](args, kwargs)
+            if key is None:
+                keyed = [cb for cbs in by_key.values() for cb in cbs]
+            else:
+                keyed = by_key.get(key, [])
+                skipped = self._keyed_totals[signal] - len(keyed)
+                if skipped:
+                    self._skipped_callbacks[signal] = self._skipped_callbacks.get(signal, 0) + skipped
+            if keyed:
+                callbacks = callbacks + keyed if callbacks else keyed
         logging.debug(f"[SignalQueue] Executing {len(callbacks)} callbacks for {signal.name}")
         for callback in callbacks:
             try:
@@ -172,9 +385,15 @@ class SignalEmitter:
         """
         
         processed_count = 0
+        if self._pending:
+            self._drain_pending()
         while not self._queue.empty():
             try:
                 signal, args, kwargs = self._queue.get_nowait()
+                if signal is _BATCH:
+                    processed_count += len(args[0])
+                    self._dispatch_batch(args[0])
+                    continue
                 logging.debug(f"[SignalQueue] Dequeued signal: {signal.name}")
                 processed_count += 1
                 self._execute_callbacks(signal, args, kwargs)
@@ -199,5 +418,7 @@ class SignalEmitter:
         if not isinstance(signal, Signals):
             raise ValueError("signal must be an instance of Signals enum")
 
-        if signal in self._callbacks:
+        if callback in self._batch_callbacks.get(signal, []):
+            self._batch_callbacks[signal].remove(callback)
+        elif signal in self._callbacks:
             self._callbacks[signal].remove(callback)
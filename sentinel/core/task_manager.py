@@ -5,6 +5,7 @@ import threading
 from typing import Any, Dict, List, Set, Tuple, TYPE_CHECKING
 from collections import defaultdict
 
+from .data.candle_engine import CandleEngine
 from .data.candle_factory import CandleFactory
 from .data.sec_api import SECDataFetcher
 from .signals import Signals
@@ -18,6 +19,10 @@ from .runtime_utils import (
 
 if TYPE_CHECKING:
     from .data.data_source import Data
+    from .data.order_book_store import OrderBookStore
+
+# How often caches that received backfilled (out-of-order) rows are rewritten sorted
+CACHE_COMPACTION_INTERVAL_S = 300
 
 
 class TaskManager:
@@ -42,6 +47,10 @@ class TaskManager:
 
         # Centralized factory storage (keyed by (exchange, symbol, timeframe))
         self.candle_factories: Dict[Tuple[str, str, str], CandleFactory] = {}
+        # One shared trade-folding engine per (exchange, symbol) drives all of its factories
+        self.candle_engines: Dict[Tuple[str, str], CandleEngine] = {}
+        # Shared order book models; set by the facade so stopped streams drop their book
+        self.order_books: "OrderBookStore | None" = None
 
         # Reference counting and subscription tracking
         self.stream_subscriptions: Dict[str, StreamSubscription] = {}
@@ -297,7 +306,13 @@ class TaskManager:
             emitter=self.data.emitter,
             task_manager=self,
             data=self.data,
+            subscribe_trades=False,
         )
+        engine = self.candle_engines.get((exchange, symbol))
+        if engine is None:
+            engine = CandleEngine(exchange, symbol, self.data.emitter)
+            self.candle_engines[(exchange, symbol)] = engine
+        engine.attach(candle_factory)
         self.candle_factories[factory_key] = candle_factory
         
         # Asynchronously fetch initial candles
@@ -370,8 +385,13 @@ class TaskManager:
                     logging.debug(f"Factory ref count for {key} decremented to {self.factory_ref_counts[key]}")
                     if self.factory_ref_counts[key] == 0:
                         logging.debug("Reference count for factory %s is zero. Removing factory.", key)
-                        del self.candle_factories[key]
+                        factory = self.candle_factories.pop(key)
+                        factory.cleanup()
                         del self.factory_ref_counts[key]
+                        engine_key = (factory.exchange, factory.symbol)
+                        engine = self.candle_engines.get(engine_key)
+                        if engine is not None and not engine.factories:
+                            del self.candle_engines[engine_key]
                 
                 elif isinstance(key, str):  # Stream key
                     # If no more widgets are listening to this resource, stop the stream
@@ -389,6 +409,12 @@ class TaskManager:
                 subscription.stop_event.set()
             # The task will be cancelled within the coroutine, but we also remove it from our tracking
             self.tasks.pop(stream_key, None)
+
+        # A stopped order book stream leaves a stale book behind; don't serve it to the next subscriber
+        if stream_key.startswith("orderbook_") and self.order_books is not None:
+            parts = stream_key.split("_", 2)
+            if len(parts) == 3:
+                self.order_books.discard(parts[1], parts[2])
             
         # Also clean up the resource_to_widgets entry
         if stream_key in self.resource_to_widgets:
@@ -635,6 +661,7 @@ class TaskManager:
                 factory = self.candle_factories.pop(key, None)
                 if factory:
                     factory.cleanup()
+            self.candle_engines.clear()
             self.factory_ref_counts.clear()
             self.widget_subscriptions.clear()  # Clear subscriptions
 
@@ -708,6 +735,30 @@ class TaskManager:
             with self.lock:
                 self.stream_subscriptions.pop(name, None)
 
+    # ------------------------------------------------------------------
+    # Cache maintenance
+    # ------------------------------------------------------------------
+    def start_cache_compaction(self, interval_seconds: float = CACHE_COMPACTION_INTERVAL_S):
+        """Starts the periodic compaction of candle caches that received backfilled rows."""
+        if "cache_compaction" in self.tasks:
+            return
+        self.start_task("cache_compaction", self._compact_caches_periodically(interval_seconds))
+
+    async def _compact_caches_periodically(self, interval_seconds: float):
+        while self.running:
+            await asyncio.sleep(interval_seconds)
+            await self.compact_caches()
+
+    async def compact_caches(self) -> int:
+        """Rewrites every cache file with out-of-order rows; returns how many were compacted."""
+        cache_store = getattr(self.data, "cache_store", None)
+        if cache_store is None:
+            return 0
+        compacted = await cache_store.compact_pending()
+        if compacted:
+            logging.info(f"Compacted {compacted} candle cache file(s).")
+        return compacted
+
     def cleanup(self):
         """
         Cleans up resources when the application is shutting down.
@@ -719,6 +770,12 @@ class TaskManager:
         self.running = False
         self.stop_all_tasks()
 
+        if self.loop and self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self.compact_caches(), self.loop).result(timeout=10)
+            except Exception as e:
+                logging.error(f"Error compacting candle caches on shutdown: {e}", exc_info=True)
+
         if self.loop and self.loop.is_running() and self.sec_fetcher:
             try:
                 logging.info("Closing SECDataFetcher resources...")
@@ -800,8 +857,14 @@ class TaskManager:
             except Exception as exc:
                 logging.warning("Factory cleanup failed for %s: %s", key, exc)
         self.candle_factories.clear()
+        self.candle_engines.clear()
         self.factory_ref_counts.clear()
 
+        try:
+            await self.compact_caches()
+        except Exception as exc:
+            logging.warning("Candle cache compaction failed: %s", exc)
+
         if self.sec_fetcher:
             try:
                 await self.sec_fetcher.close()
@@ -870,6 +933,7 @@ class TaskManager:
         
         self.tasks.clear()
         self.candle_factories.clear()
+        self.candle_engines.clear()
         self.stream_subscriptions.clear()
         self.factory_ref_counts.clear()
         self.widget_subscriptions.clear()
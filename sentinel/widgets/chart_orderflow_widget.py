@@ -4,8 +4,9 @@ import logging
 import math
 from typing import Any
 
+import numpy as np
 from PySide6.QtCore import QPoint, QPointF, QRectF, Qt, QTimer
-from PySide6.QtGui import QColor, QFont, QPainter, QPen
+from PySide6.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPen, QStaticText, QTransform
 from PySide6.QtWidgets import (
     QDockWidget,
     QFrame,
@@ -18,7 +19,14 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.analysis.orderbook_processor import (
+    KIND_ASK,
+    KIND_BID,
+    KIND_MID,
+    LadderColumns,
+    OrderBookProcessor,
+)
+from sentinel.app.render_scheduler import render_scheduler
 from sentinel.core.signals import Signals
 from sentinel.widgets.chart_pane import ChartPane
 from sentinel.widgets.chart_toolbar import ChartToolbar
@@ -43,6 +51,15 @@ _MID_FG = QColor(248, 250, 252)
 _ASK_FG = QColor(230, 92, 104)
 _BID_FG = QColor(53, 190, 130)
 _PRICE_FG = QColor(214, 220, 228)
+_CANVAS_BG = QColor("#060a11")
+_LAST_PRICE_PEN = QPen(QColor("#d6dde6"), 1)
+_ASK_ROW_BG = QColor(64, 12, 18, 90)
+_BID_ROW_BG = QColor(14, 48, 34, 80)
+_ASK_SIZE_BAR = QColor(230, 92, 104, 35)
+_ASK_TOTAL_BAR = QColor(230, 92, 104, 25)
+_BID_SIZE_BAR = QColor(53, 190, 130, 35)
+_BID_TOTAL_BAR = QColor(53, 190, 130, 25)
+_MIN_TEXT_ROW_PX = 10.0  # suppress ladder text below this row height
 _TARGET_ROW_HEIGHT_PX = 18.0
 _MIN_ROW_HEIGHT_PX = 14.0
 _MAX_ROW_HEIGHT_PX = 28.0
@@ -51,17 +68,34 @@ _TICK_SWITCH_IMPROVEMENT_PX = 2.0
 
 
 class LadderCanvas(QWidget):
+    """Price/size/total ladder painted in step with the chart's price axis.
+
+    Row geometry, bar rectangles and label positions are derived with NumPy
+    once per data, size or price-mapping change and cached as a draw list;
+    repaints that only move the last-price line reuse it as is. Labels are
+    drawn from a `QStaticText` cache keyed by text, so a refresh only lays
+    out labels whose value actually changed.
+    """
+
+    _TEXT_CACHE_LIMIT = 4096
+
     def __init__(self, chart_pane: ChartPane | None = None, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.chart_pane = chart_pane
-        self._rows: list[dict[str, float | str]] = []
+        self._rows: LadderColumns = LadderColumns.from_parts()
         self._price_range: tuple[float, float] | None = None
         self._last_price: float | None = None
         self._y_mapping: tuple[float, float] | None = None  # (offset, scale)
+        self._layout_key: tuple | None = None
+        self._layout: tuple[list, list] = ([], [])  # (fills, texts) draw lists
+        self._text_cache: dict[tuple[str, bool], tuple[QStaticText, float, float]] = {}
+        self.layouts_built = 0
         self.setMinimumWidth(260)
 
-    def set_rows(self, rows: list[dict[str, float | str]]) -> None:
-        self._rows = rows
+    def set_rows(self, rows: LadderColumns | list[dict[str, float | str]]) -> None:
+        """Show ladder rows, given as LadderColumns or as visible-ladder row dicts."""
+        self._rows = rows if isinstance(rows, LadderColumns) else LadderColumns.from_rows(rows)
+        self._layout_key = None
         self.update()
 
     def set_price_range(self, price_min: float, price_max: float) -> None:
@@ -69,12 +103,15 @@ class LadderCanvas(QWidget):
         self.update()
 
     def set_last_price(self, value: float | None) -> None:
-        self._last_price = None if value is None else float(value)
+        value = None if value is None else float(value)
+        if value == self._last_price:
+            return
+        self._last_price = value
         self.update()
 
     def paintEvent(self, event):  # noqa: N802
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor("#060a11"))
+        painter.fillRect(self.rect(), _CANVAS_BG)
         painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
 
         width = self.width()
@@ -83,12 +120,8 @@ class LadderCanvas(QWidget):
         # Precompute the float-precision price→y mapping for this frame.
         self._y_mapping = self._compute_y_mapping(height)
 
-        price_w = int(width * 0.38)
-        size_w = int(width * 0.26)
-        total_w = width - price_w - size_w
-        price_x = 0
-        size_x = price_x + price_w
-        total_x = size_x + size_w
+        size_x = int(width * 0.38)
+        total_x = size_x + int(width * 0.26)
 
         painter.setPen(_GRID_PEN)
         painter.drawLine(size_x, 0, size_x, height)
@@ -96,119 +129,138 @@ class LadderCanvas(QWidget):
 
         if self._price_range and self._last_price is not None:
             y = self._price_to_y(self._last_price, height)
-            painter.setPen(QPen(QColor("#d6dde6"), 1))
+            painter.setPen(_LAST_PRICE_PEN)
             painter.drawLine(0, int(y), width, int(y))
 
-        if not self._rows:
-            painter.end()
-            return
+        key = (width, height, self._y_mapping, None if self._y_mapping else self._price_range)
+        if key != self._layout_key:
+            self._layout = self._build_layout(width, height)
+            self._layout_key = key
+        fills, texts = self._layout
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        for color, rects in fills:
+            painter.setBrush(color)
+            painter.drawRects(rects)
+        for font, color, items in texts:
+            painter.setFont(font)
+            painter.setPen(color)
+            for point, text in items:
+                painter.drawStaticText(point, text)
 
-        # ── Build y-centers and sort top-to-bottom ──────────────────────
-        row_ys: list[tuple[float, dict]] = []
-        for row in self._rows:
-            y_c = self._price_to_y(float(row["price"]), height)
-            row_ys.append((y_c, row))
-        row_ys.sort(key=lambda item: item[0])
+        painter.end()
 
-        n = len(row_ys)
+    def _build_layout(self, width: int, height: int) -> tuple[list, list]:
+        """Group this frame's rectangles by colour and labels by font and pen."""
+        self.layouts_built += 1
+        n = len(self._rows)
         if n == 0:
-            painter.end()
-            return
+            return [], []
 
-        # ── Shared boundaries between adjacent rows (seamless tiling) ──
-        boundaries: list[float] = [
-            (row_ys[i][0] + row_ys[i + 1][0]) * 0.5 for i in range(n - 1)
-        ]
+        price_w = int(width * 0.38)
+        size_w = int(width * 0.26)
+        total_w = width - price_w - size_w
+        size_x = price_w
+        total_x = size_x + size_w
 
-        max_size = max(
-            (float(r.get("size", 0)) for r in self._rows if r.get("kind") != "mid"),
-            default=0.0,
-        )
-        max_total = max(
-            (float(r.get("total", 0)) for r in self._rows if r.get("kind") != "mid"),
-            default=0.0,
-        )
+        # ── Row centres top-to-bottom, with shared boundaries between
+        # adjacent rows (seamless tiling); edge rows extend symmetrically ──
+        ys = self._prices_to_y(self._rows.price, height)
+        order = np.argsort(ys, kind="stable")
+        ys = ys[order]
+        sizes = self._rows.size[order]
+        totals = self._rows.total[order]
+        kinds = self._rows.kind[order]
+        prices = self._rows.price[order]
+
+        if n > 1:
+            boundaries = (ys[:-1] + ys[1:]) * 0.5
+            tops = np.concatenate(([2.0 * ys[0] - boundaries[0]], boundaries))
+            bottoms = np.concatenate((boundaries, [2.0 * ys[-1] - boundaries[-1]]))
+        else:
+            tops = np.zeros(1)
+            bottoms = np.full(1, float(height))
+        heights = bottoms - tops
+        drawn = heights >= 0.5
+
+        book_rows = kinds != KIND_MID
+        max_size = float(max(sizes[book_rows].max(initial=0.0), 0.0))
+        max_total = float(max(totals[book_rows].max(initial=0.0), 0.0))
+        size_bars = sizes / max_size * size_w if max_size > 0 else np.zeros(n)
+        total_bars = totals / max_total * total_w if max_total > 0 else np.zeros(n)
 
         w_f = float(width)
-        _MIN_TEXT_ROW_PX = 10.0  # suppress text below this height
-
-        for i in range(n):
-            y_center, row = row_ys[i]
-
-            # Edge rows extend symmetrically from their center.
-            if i == 0:
-                top = (2.0 * y_center - boundaries[0]) if boundaries else 0.0
-            else:
-                top = boundaries[i - 1]
-
-            if i == n - 1:
-                bottom = (2.0 * y_center - boundaries[-1]) if boundaries else float(height)
-            else:
-                bottom = boundaries[i]
-
-            row_h = bottom - top
-            if row_h < 0.5:
+        fills = []
+        for kind, background, size_color, total_color in (
+            (KIND_MID, _MID_BG, None, None),
+            (KIND_ASK, _ASK_ROW_BG, _ASK_SIZE_BAR, _ASK_TOTAL_BAR),
+            (KIND_BID, _BID_ROW_BG, _BID_SIZE_BAR, _BID_TOTAL_BAR),
+        ):
+            rows = np.flatnonzero(drawn & (kinds == kind))
+            if rows.size == 0:
                 continue
-
-            rect = QRectF(0.0, top, w_f, row_h)
-            kind = str(row["kind"])
-
-            if kind == "mid":
-                painter.fillRect(rect, _MID_BG)
-                price_fg = _MID_FG
-                value_fg = _MID_FG
-                font = _MID_FONT
-            elif kind == "ask":
-                painter.fillRect(rect, QColor(64, 12, 18, 90))
-                if max_size > 0:
-                    bar_w = (float(row.get("size", 0)) / max_size) * size_w
-                    painter.fillRect(QRectF(size_x + size_w - bar_w, top, bar_w, row_h), QColor(230, 92, 104, 35))
-                if max_total > 0:
-                    bar_w = (float(row.get("total", 0)) / max_total) * total_w
-                    painter.fillRect(QRectF(total_x + total_w - bar_w, top, bar_w, row_h), QColor(230, 92, 104, 25))
-                price_fg = _PRICE_FG
-                value_fg = _ASK_FG
-                font = _MONO_FONT
-            else:
-                painter.fillRect(rect, QColor(14, 48, 34, 80))
-                if max_size > 0:
-                    bar_w = (float(row.get("size", 0)) / max_size) * size_w
-                    painter.fillRect(QRectF(size_x + size_w - bar_w, top, bar_w, row_h), QColor(53, 190, 130, 35))
-                if max_total > 0:
-                    bar_w = (float(row.get("total", 0)) / max_total) * total_w
-                    painter.fillRect(QRectF(total_x + total_w - bar_w, top, bar_w, row_h), QColor(53, 190, 130, 25))
-                price_fg = _PRICE_FG
-                value_fg = _BID_FG
-                font = _MONO_FONT
-
-            # Skip text when the row is too small for legibility.
-            if row_h < _MIN_TEXT_ROW_PX:
+            fills.append((background, [QRectF(0.0, t, w_f, h) for t, h in zip(tops[rows].tolist(), heights[rows].tolist())]))
+            if size_color is None:
                 continue
+            for color, right, bars in ((size_color, size_x + size_w, size_bars), (total_color, total_x + total_w, total_bars)):
+                with_bar = rows[bars[rows] > 0]
+                if with_bar.size == 0:
+                    continue
+                fills.append(
+                    (
+                        color,
+                        [
+                            QRectF(right - bar_w, t, bar_w, h)
+                            for bar_w, t, h in zip(bars[with_bar].tolist(), tops[with_bar].tolist(), heights[with_bar].tolist())
+                        ],
+                    )
+                )
 
-            painter.setFont(font)
-            price_text = f"{float(row['price']):.2f}"
-            size_text = "" if float(row["size"]) <= 0 else _format_size(float(row["size"]))
-            total_text = "" if float(row["total"]) <= 0 else _format_size(float(row["total"]))
-
-            painter.setPen(price_fg)
-            painter.drawText(
-                QRectF(price_x + 8, top, price_w - 16, row_h),
-                Qt.AlignVCenter | Qt.AlignCenter,
-                price_text,
-            )
-            painter.setPen(value_fg)
-            painter.drawText(
-                QRectF(size_x + 8, top, size_w - 16, row_h),
-                Qt.AlignVCenter | Qt.AlignRight,
-                size_text,
-            )
-            painter.drawText(
-                QRectF(total_x + 8, top, total_w - 16, row_h),
-                Qt.AlignVCenter | Qt.AlignRight,
-                total_text,
-            )
+        # Skip text when the row is too small for legibility.
+        labelled = np.flatnonzero(drawn & (heights >= _MIN_TEXT_ROW_PX))
+        centres = ((tops + bottoms) * 0.5)[labelled].tolist()
+        price_texts = {KIND_MID: [], KIND_ASK: [], KIND_BID: []}
+        value_texts = {KIND_MID: [], KIND_ASK: [], KIND_BID: []}
+        price_centre = price_w * 0.5
+        for y, kind, price, size, total in zip(
+            centres, kinds[labelled].tolist(), prices[labelled].tolist(), sizes[labelled].tolist(), totals[labelled].tolist()
+        ):
+            bold = kind == KIND_MID
+            text, text_w, text_h = self._static_text(f"{price:.2f}", bold)
+            price_texts[kind].append((QPointF(price_centre - text_w * 0.5, y - text_h * 0.5), text))
+            for value, right in ((size, total_x - 8), (total, width - 8)):
+                if value <= 0:
+                    continue
+                text, text_w, text_h = self._static_text(_format_size(value), bold)
+                value_texts[kind].append((QPointF(right - text_w, y - text_h * 0.5), text))
+
+        texts = [
+            (_MONO_FONT, _PRICE_FG, price_texts[KIND_ASK] + price_texts[KIND_BID]),
+            (_MONO_FONT, _ASK_FG, value_texts[KIND_ASK]),
+            (_MONO_FONT, _BID_FG, value_texts[KIND_BID]),
+            (_MID_FONT, _MID_FG, price_texts[KIND_MID] + value_texts[KIND_MID]),
+        ]
+        return fills, [entry for entry in texts if entry[2]]
 
-        painter.end()
+    def _static_text(self, text: str, bold: bool) -> tuple[QStaticText, float, float]:
+        """Cached, pre-laid-out label with its advance width and line height.
+
+        The line height comes from the font metrics rather than
+        ``QStaticText.size()`` (which rounds up), so labels centre exactly
+        where ``drawText`` with ``AlignVCenter`` would put them.
+        """
+        key = (text, bold)
+        cached = self._text_cache.get(key)
+        if cached is None:
+            if len(self._text_cache) >= self._TEXT_CACHE_LIMIT:
+                self._text_cache.clear()
+            static = QStaticText(text)
+            static.setTextFormat(Qt.TextFormat.PlainText)
+            font = _MID_FONT if bold else _MONO_FONT
+            static.prepare(QTransform(), font)
+            cached = (static, static.size().width(), QFontMetricsF(font).height())
+            self._text_cache[key] = cached
+        return cached
 
     def _compute_y_mapping(self, height: int) -> tuple[float, float] | None:
         """Return ``(offset, scale)`` so that ``y = offset - price * scale``.
@@ -269,29 +321,37 @@ class LadderCanvas(QWidget):
         norm = (high - price) / span
         return max(0.0, min(height - 1.0, norm * height))
 
+    def _prices_to_y(self, prices: np.ndarray, height: int) -> np.ndarray:
+        """Vectorized `_price_to_y` for a column of prices."""
+        mapping = self._y_mapping
+        if mapping is not None:
+            offset, scale = mapping
+            return offset - prices * scale
+
+        if not self._price_range:
+            return np.full(prices.shape, height / 2, dtype=np.float64)
+        low, high = self._price_range
+        span = max(high - low, 1e-9)
+        return np.clip((high - prices) / span * height, 0.0, height - 1.0)
+
     def _row_height(self, height: int) -> float:
-        if not self._rows or not self._price_range:
+        if not len(self._rows) or not self._price_range:
             return _TARGET_ROW_HEIGHT_PX
         low, high = self._price_range
         span = max(high - low, 1e-9)
-        prices = sorted({float(row["price"]) for row in self._rows}, reverse=True)
-        if len(prices) < 2:
-            return _TARGET_ROW_HEIGHT_PX
-        tick = min(
-            prices[index] - prices[index + 1]
-            for index in range(len(prices) - 1)
-            if prices[index] > prices[index + 1]
-        )
-        if tick <= 0:
+        prices = np.unique(self._rows.price)
+        steps = np.diff(prices)
+        steps = steps[steps > 0]
+        if steps.size == 0:
             return _TARGET_ROW_HEIGHT_PX
-            
+        tick = float(steps.min())
+
         if self.chart_pane is not None:
-            y1 = self._price_to_y(prices[0], height)
-            y2 = self._price_to_y(prices[0] - tick, height)
-            calc_height = float(abs(y2 - y1))
+            top = float(prices[-1])
+            calc_height = float(abs(self._price_to_y(top - tick, height) - self._price_to_y(top, height)))
             if calc_height > 0:
                 return max(calc_height, 1.0)
-                
+
         return max((tick * height) / span, 1.0)
 
 
@@ -317,6 +377,7 @@ class OrderflowLadderPane(QWidget):
         self.processor.aggregation_enabled = True
         self._price_precision = float(price_precision)
         self.last_orderbook: dict[str, Any] | None = None
+        self._book = None  # shared OrderBookModel for this market, when the core keeps one
         self._price_range: tuple[float, float] | None = None
         self._last_price: float | None = None
         self._dirty = False
@@ -377,10 +438,13 @@ class OrderflowLadderPane(QWidget):
         self.canvas = LadderCanvas(chart_pane=chart_pane)
         root.addWidget(self.canvas, 1)
 
-        self._render_timer = QTimer(self)
-        self._render_timer.setInterval(max(int(1000 / max(fps, 1)), 16))
-        self._render_timer.timeout.connect(self._render_if_dirty)
-        self._render_timer.start()
+        self._render_target = render_scheduler().register(
+            self,
+            self._render_if_dirty,
+            name=f"ladder {exchange} {symbol}",
+            fps=fps,
+            is_dirty=lambda: self._dirty,
+        )
 
         self._auto_tick_timer = QTimer(self)
         self._auto_tick_timer.setSingleShot(True)
@@ -399,10 +463,12 @@ class OrderflowLadderPane(QWidget):
         self.exchange = exchange
         self.symbol = symbol
         self.last_orderbook = None
+        self._book = None
         self._dirty = True
 
-    def set_orderbook(self, orderbook: dict[str, Any] | None) -> None:
+    def set_orderbook(self, orderbook: dict[str, Any] | None, book=None) -> None:
         self.last_orderbook = orderbook
+        self._book = book
         self._dirty = True
 
     def set_visible_price_range(self, price_min: float, price_max: float) -> None:
@@ -493,17 +559,26 @@ class OrderflowLadderPane(QWidget):
             price_min=price_min,
             price_max=price_max,
             current_price=self._last_price,
+            book=self._book,
+            columnar=True,
         )
         if not ladder:
             self.canvas.set_rows([])
             return
 
         self.spread_label.setText(f"Spread: {ladder['best_ask'] - ladder['best_bid']:.2f}")
-        self.canvas.set_rows(self._build_visible_tick_rows(ladder))
+        self.canvas.set_rows(self._build_visible_tick_columns(ladder))
 
     def _build_visible_tick_rows(self, ladder: dict[str, Any]) -> list[dict[str, float | str]]:
+        return self._build_visible_tick_columns(ladder).to_visible_rows()
+
+    def _build_visible_tick_columns(self, ladder: dict[str, Any]) -> LadderColumns:
+        """Expand a visible ladder onto every tick of the visible range, top first."""
+        columns = ladder.get("columns")
+        if columns is None:
+            columns = LadderColumns.from_rows(ladder["rows"])
         if self._price_range is None:
-            return ladder["rows"]
+            return columns
 
         price_min, price_max = self._price_range
         lower = min(price_min, price_max)
@@ -512,53 +587,41 @@ class OrderflowLadderPane(QWidget):
         anchor_price = self._last_price if self._last_price is not None else float(ladder["midpoint"])
         center_price = round(round(anchor_price / tick) * tick, 10)
 
-        asks_by_price = {
-            round(float(row["price"]), 10): row
-            for row in ladder["rows"]
-            if row["kind"] == "ask"
-        }
-        bids_by_price = {
-            round(float(row["price"]), 10): row
-            for row in ladder["rows"]
-            if row["kind"] == "bid"
-        }
-
-        top_price = round(math.floor(upper / tick) * tick, 10)
-        bottom_price = round(math.ceil(lower / tick) * tick, 10)
         top_price = round(math.floor((upper + (tick * 0.5)) / tick) * tick, 10)
         bottom_price = round(math.ceil((lower - (tick * 0.5)) / tick) * tick, 10)
         if top_price < bottom_price:
-            return [{"kind": "mid", "price": center_price, "size": 0.0, "total": 0.0}]
-
-        rows: list[dict[str, float | str]] = []
-        price = top_price
-        while price >= bottom_price - 1e-9:
-            normalized_price = round(price, 10)
-            if normalized_price > center_price:
-                rows.append(
-                    asks_by_price.get(
-                        normalized_price,
-                        {"kind": "ask", "price": normalized_price, "size": 0.0, "total": 0.0},
-                    )
-                )
-            elif normalized_price < center_price:
-                rows.append(
-                    bids_by_price.get(
-                        normalized_price,
-                        {"kind": "bid", "price": normalized_price, "size": 0.0, "total": 0.0},
-                    )
-                )
-            else:
-                rows.append({"kind": "mid", "price": center_price, "size": 0.0, "total": 0.0})
-            price = round(price - tick, 10)
-
-        if not any(str(row["kind"]) == "mid" for row in rows):
-            rows.append({"kind": "mid", "price": center_price, "size": 0.0, "total": 0.0})
-            rows.sort(key=lambda row: float(row["price"]), reverse=True)
-        return rows
+            return LadderColumns.from_parts(mid_price=center_price)
+
+        count = int(math.floor((top_price - bottom_price + 1e-9) / tick)) + 1
+        grid = np.round(top_price - tick * np.arange(count), 10)
+        kind = np.where(grid > center_price, KIND_ASK, np.where(grid < center_price, KIND_BID, KIND_MID)).astype(np.int8)
+        bid_qty = np.zeros(count)
+        bid_cum = np.zeros(count)
+        ask_qty = np.zeros(count)
+        ask_cum = np.zeros(count)
+
+        # Place populated levels on the grid (descending, so search on negated prices)
+        neg_grid = -grid
+        for side, qty_out, cum_out, qty_in, cum_in in (
+            (KIND_ASK, ask_qty, ask_cum, columns.ask_qty, columns.ask_cum),
+            (KIND_BID, bid_qty, bid_cum, columns.bid_qty, columns.bid_cum),
+        ):
+            rows = np.flatnonzero(columns.kind == side)
+            prices = np.round(columns.price[rows], 10)
+            slots = np.minimum(np.searchsorted(neg_grid, -prices), count - 1)
+            hit = (grid[slots] == prices) & (kind[slots] == side)
+            qty_out[slots[hit]] = qty_in[rows[hit]]
+            cum_out[slots[hit]] = cum_in[rows[hit]]
+
+        expanded = LadderColumns(grid, bid_qty, bid_cum, ask_qty, ask_cum, kind)
+        if not np.any(kind == KIND_MID):
+            mid = LadderColumns.from_parts(mid_price=center_price)
+            merged = LadderColumns.concat(expanded, mid)
+            expanded = merged.take(np.argsort(-merged.price, kind="stable"))
+        return expanded
 
     def shutdown(self) -> None:
-        self._render_timer.stop()
+        render_scheduler().unregister(self)
         self._auto_tick_timer.stop()
 
     def resizeEvent(self, event):  # noqa: N802
@@ -744,9 +807,11 @@ class ChartOrderflowDockWidget(QDockWidget):
         if exchange == self.exchange and symbol == self.symbol and timeframe == self.timeframe:
             return
         self._unsubscribe()
+        self._unregister_handlers()
         self.exchange = exchange
         self.symbol = symbol
         self.timeframe = timeframe
+        self._register_handlers()
         self.chart_pane.change_subscription(exchange, symbol, timeframe)
         self.ladder_pane.set_market(exchange, symbol)
         self.toolbar.set_symbol(symbol)
@@ -769,14 +834,18 @@ class ChartOrderflowDockWidget(QDockWidget):
     def _register_handlers(self) -> None:
         if self._handlers_registered or self.runtime is None or self.runtime.core is None:
             return
-        self.runtime.core.emitter.register(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+        self.runtime.core.emitter.register_keyed(
+            Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update
+        )
         self._handlers_registered = True
 
     def _unregister_handlers(self) -> None:
         if not self._handlers_registered or self.runtime is None or self.runtime.core is None:
             return
         try:
-            self.runtime.core.emitter.unregister(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+            self.runtime.core.emitter.unregister_keyed(
+                Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update
+            )
         except Exception:
             pass
         self._handlers_registered = False
@@ -807,7 +876,9 @@ class ChartOrderflowDockWidget(QDockWidget):
         ob_symbol = orderbook.get("symbol")
         if ob_symbol is not None and ob_symbol != self.symbol:
             return
-        self.ladder_pane.set_orderbook(orderbook)
+        store = getattr(self.runtime.core, "order_books", None) if self.runtime and self.runtime.core else None
+        book = store.get(exchange, self.symbol) if store is not None else None
+        self.ladder_pane.set_orderbook(orderbook, book=book)
 
     def closeEvent(self, event):  # noqa: N802
         self.ladder_pane.shutdown()
@@ -3,15 +3,18 @@ from __future__ import annotations
 import bisect
 import logging
 import math
-from collections import deque
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import pyqtgraph as pg
-from PySide6.QtCore import QPointF, QRectF, QTimer, Qt, Signal
+from PySide6.QtCore import QLineF, QPointF, QRectF, QTimer, Qt, Signal
 from PySide6.QtGui import QBrush, QColor, QFont, QPainter, QPen, QPicture
 from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
 
+from sentinel.analysis.candle_indicators import CandleIndicators
+from sentinel.app.render_scheduler import render_scheduler
+from sentinel.core.data.trade_buffer import SIDE_BUY, TradeBuffer, aggregate_trades
 from sentinel.core.signals import Signals
 
 
@@ -29,7 +32,49 @@ _CROSSHAIR_PEN = pg.mkPen(color="#2a4060", width=1, style=Qt.PenStyle.DashLine)
 _UP_COLOR = QColor(38, 166, 154)
 _DN_COLOR = QColor(239, 83, 80)
 _UP_HEX = "#26a69a"
+_NO_PEN = QPen(Qt.PenStyle.NoPen)
+_NO_BRUSH = QBrush(Qt.BrushStyle.NoBrush)
 _DN_HEX = "#ef5350"
+_VOL_UP_BRUSH = QBrush(QColor(38, 166, 154, 140))
+_VOL_DN_BRUSH = QBrush(QColor(239, 83, 80, 140))
+_BUBBLE_BUY_BRUSH = pg.mkBrush(38, 166, 154, 180)
+_BUBBLE_SELL_BRUSH = pg.mkBrush(239, 83, 80, 180)
+_BUBBLE_BUY_PEN = pg.mkPen(26, 115, 106, 200)
+_BUBBLE_SELL_PEN = pg.mkPen(182, 60, 58, 200)
+# Above this many visible trades, bubbles are merged per candle, price bucket and side
+_BUBBLE_AGGREGATE_ABOVE = 1500
+_BUBBLE_PRICE_BUCKETS = 200
+
+
+def _bucket_bounds(count: int, step: int) -> tuple[np.ndarray, np.ndarray]:
+    """First and last index of each run of *step* consecutive bars out of *count*."""
+    starts = np.arange(0, count, max(step, 1))
+    ends = np.append(starts[1:], count) - 1
+    return starts, ends
+
+
+def _decimate_ohlcv(series: np.ndarray, step: int) -> np.ndarray:
+    """Collapse every *step* bars of a (6, n) x/o/h/l/c/v array into one bar.
+
+    Each bucket keeps the first open, the last close, the highest high and
+    the lowest low, so wicks survive decimation; volumes are summed and the
+    bar is centred on the span it covers.
+    """
+    count = series.shape[1]
+    if step <= 1 or count == 0:
+        return series
+    starts, ends = _bucket_bounds(count, step)
+    x, opens, highs, lows, closes, volumes = series
+    return np.vstack(
+        [
+            (x[starts] + x[ends]) * 0.5,
+            opens[starts],
+            np.maximum.reduceat(highs, starts),
+            np.minimum.reduceat(lows, starts),
+            closes[ends],
+            np.add.reduceat(volumes, starts),
+        ]
+    )
 
 
 def _style_pg_plot(plot: pg.PlotWidget) -> None:
@@ -42,16 +87,37 @@ def _style_pg_plot(plot: pg.PlotWidget) -> None:
     plot.getViewBox().setBorder(pg.mkPen("#1a2535", width=1))
 
 
+class _CandleSegment:
+    """A run of finished bars recorded once into its own picture."""
+
+    __slots__ = ("bars", "picture")
+
+    def __init__(self, bars: np.ndarray, picture: QPicture) -> None:
+        self.bars = bars  # (n, 5) x, open, high, low, close
+        self.picture = picture
+
+
 class CandlestickItem(pg.GraphicsObject):
+    """Candles drawn from cached per-segment pictures plus a live last bar.
+
+    Finished bars are grouped into segments of up to ``segment_bars`` bars,
+    each recorded into its own QPicture. On `set_data` a segment is reused as
+    long as its bars are unchanged, so a tick that only moves the last candle
+    re-records that one bar, and a new candle re-records at most one partial
+    segment. Bars are drawn in batches per colour with ``drawLines`` and
+    ``drawRects`` rather than one painter call per primitive.
+    """
+
+    segment_bars = 256
+
     def __init__(self) -> None:
         super().__init__()
-        self._picture = QPicture()
-        self._x: list[float] = []
-        self._o: list[float] = []
-        self._h: list[float] = []
-        self._l: list[float] = []
-        self._c: list[float] = []
+        self._bars = np.empty((0, 5), dtype=np.float64)
+        self._segments: list[_CandleSegment] = []
+        self._live_picture = QPicture()
         self._body_width = 1.0
+        self._bounds = QRectF()
+        self.bars_drawn_last_update = 0
 
     def set_data(
         self,
@@ -63,49 +129,114 @@ class CandlestickItem(pg.GraphicsObject):
         *,
         body_width: float,
     ) -> None:
-        self._x = x
-        self._o = opens
-        self._h = highs
-        self._l = lows
-        self._c = closes
-        self._body_width = max(float(body_width), 1.0)
-        self._generate_picture()
+        bars = np.column_stack(
+            [np.asarray(values, dtype=np.float64) for values in (x, opens, highs, lows, closes)]
+        ).reshape(-1, 5)
+        body_width = max(float(body_width), 1.0)
+        if body_width != self._body_width:
+            self._segments = []
+        self._body_width = body_width
+        self._bars = bars
+
+        drawn = self._update_segments(bars)
+        self._live_picture = self._record(bars[-1:]) if len(bars) else QPicture()
+        self.bars_drawn_last_update = drawn + min(len(bars), 1)
+
+        self.prepareGeometryChange()
+        self._bounds = self._compute_bounds(bars)
         self.update()
 
-    def _generate_picture(self) -> None:
-        self._picture = QPicture()
-        painter = QPainter(self._picture)
-        up_pen = QPen(_UP_COLOR)
-        dn_pen = QPen(_DN_COLOR)
-        up_pen.setWidthF(1.0)
-        dn_pen.setWidthF(1.0)
-        up_brush = QBrush(_UP_COLOR)
-        dn_brush = QBrush(_DN_COLOR)
-        no_pen = QPen(Qt.PenStyle.NoPen)
-
+    def _update_segments(self, bars: np.ndarray) -> int:
+        """Reuse unchanged segments of the finished bars, record the rest; returns bars recorded."""
+        finished = len(bars) - 1
+        if finished <= 0:
+            self._segments = []
+            return 0
+
+        x = bars[:finished, 0]
+        covered = np.zeros(finished, dtype=bool)
+        kept: list[tuple[int, _CandleSegment]] = []
+        for segment in self._segments:
+            count = len(segment.bars)
+            start = int(np.searchsorted(x, segment.bars[0, 0]))
+            if start + count <= finished and np.array_equal(bars[start:start + count], segment.bars):
+                kept.append((start, segment))
+                covered[start:start + count] = True
+
+        # A short segment directly followed by new bars is re-recorded with them,
+        # so appends do not leave a trail of one-bar segments.
+        for index, (start, segment) in enumerate(kept):
+            end = start + len(segment.bars)
+            if len(segment.bars) < self.segment_bars and end < finished and not covered[end]:
+                covered[start:end] = False
+                kept[index] = (start, None)
+        segments = {start: segment for start, segment in kept if segment is not None}
+
+        drawn = 0
+        uncovered = np.flatnonzero(~covered)
+        if uncovered.size:
+            run_starts = uncovered[np.flatnonzero(np.diff(uncovered, prepend=-2) != 1)]
+            run_ends = uncovered[np.append(np.flatnonzero(np.diff(uncovered) != 1), uncovered.size - 1)] + 1
+            for run_start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+                for chunk_start in range(run_start, run_end, self.segment_bars):
+                    chunk = bars[chunk_start:min(chunk_start + self.segment_bars, run_end)].copy()
+                    segments[chunk_start] = _CandleSegment(chunk, self._record(chunk))
+                    drawn += len(chunk)
+        self._segments = [segments[start] for start in sorted(segments)]
+        return drawn
+
+    def _record(self, bars: np.ndarray) -> QPicture:
+        picture = QPicture()
+        if len(bars) == 0:
+            return picture
+        painter = QPainter(picture)
         width = self._body_width
         half = width * 0.5
-        for i, open_, high, low, close in zip(self._x, self._o, self._h, self._l, self._c):
-            rising = close >= open_
-            top = max(open_, close)
-            bottom = min(open_, close)
-            painter.setPen(up_pen if rising else dn_pen)
-            painter.setBrush(Qt.BrushStyle.NoBrush)
-            painter.drawLine(QPointF(i, low), QPointF(i, high))
-            painter.setPen(no_pen)
-            painter.setBrush(up_brush if rising else dn_brush)
-            height = top - bottom
-            if height > 0:
-                painter.drawRect(QRectF(i - half, bottom, width, height))
-            else:
-                painter.drawRect(QRectF(i - half, bottom, width, 1.0))
+        x, opens, highs, lows, closes = (bars[:, i] for i in range(5))
+        rising = closes >= opens
+        tops = np.maximum(opens, closes)
+        bottoms = np.minimum(opens, closes)
+        heights = tops - bottoms
+        heights = np.where(heights > 0, heights, 1.0)
+
+        for mask, color in ((rising, _UP_COLOR), (~rising, _DN_COLOR)):
+            if not mask.any():
+                continue
+            pen = QPen(color)
+            pen.setWidthF(1.0)
+            painter.setPen(pen)
+            painter.setBrush(_NO_BRUSH)
+            painter.drawLines(
+                [QLineF(xi, lo, xi, hi) for xi, lo, hi in zip(x[mask].tolist(), lows[mask].tolist(), highs[mask].tolist())]
+            )
+            painter.setPen(_NO_PEN)
+            painter.setBrush(QBrush(color))
+            painter.drawRects(
+                [
+                    QRectF(xi - half, bottom, width, height)
+                    for xi, bottom, height in zip(x[mask].tolist(), bottoms[mask].tolist(), heights[mask].tolist())
+                ]
+            )
         painter.end()
+        return picture
+
+    def _compute_bounds(self, bars: np.ndarray) -> QRectF:
+        if len(bars) == 0:
+            return QRectF()
+        half = self._body_width * 0.5
+        x_min = float(bars[:, 0].min()) - half
+        x_max = float(bars[:, 0].max()) + half
+        y_min = float(bars[:, 3].min())
+        y_max = float(max(bars[:, 2].max(), np.minimum(bars[:, 1], bars[:, 4]).max() + 1.0))
+        return QRectF(x_min, y_min, x_max - x_min, y_max - y_min)
 
     def paint(self, painter, *args):
-        painter.drawPicture(0, 0, self._picture)
+        for segment in self._segments:
+            painter.drawPicture(0, 0, segment.picture)
+        painter.drawPicture(0, 0, self._live_picture)
 
     def boundingRect(self):
-        return self._picture.boundingRect()
+        return QRectF(self._bounds)
 
 
 class ChartPane(QWidget):
@@ -143,10 +274,17 @@ class ChartPane(QWidget):
         self.volumes: list[float] = []
         self._dirty = False
         self._did_initial_fit = False
-        
+        # (6, n) float view of the lists above, rebuilt lazily after structural changes
+        self._series_cache: np.ndarray | None = None
+        # Bars [lo, hi) last pushed to the plot items, decimated by step
+        self._rendered_window: tuple[int, int, int] | None = None
+        self._view_dirty = False
+        # Heikin-Ashi and EMA state; recomputed when out of step with the candles
+        self._indicators = CandleIndicators(ema_span=20)
+
         self._chart_mode = "candles"
         self._show_bubbles = False
-        self._trades_cache = deque(maxlen=1000)
+        self._trades_cache = TradeBuffer(capacity=1000)
 
         self.price_x_axis = pg.DateAxisItem(orientation="bottom")
         self.price_plot = pg.PlotWidget(axisItems={"bottom": self.price_x_axis})
@@ -157,6 +295,8 @@ class ChartPane(QWidget):
         self.price_plot.getViewBox().enableAutoRange(x=False, y=False)
         self.price_plot.getViewBox().sigResized.connect(self._update_vol_geometry)
         self.price_plot.getViewBox().sigYRangeChanged.connect(self._on_y_range_changed)
+        self.price_plot.getViewBox().sigXRangeChanged.connect(self._on_x_range_changed)
+        self.price_plot.getViewBox().sigResized.connect(self._on_x_range_changed)
 
         if self.show_price_axis:
             self.price_plot.setLabel("right", "Price", **_LABEL_CSS)
@@ -188,6 +328,7 @@ class ChartPane(QWidget):
         self.candle_item = CandlestickItem()
         self.ha_item = CandlestickItem()
         self.line_item = pg.PlotDataItem(pen=pg.mkPen(color="#2196f3", width=1.5))
+        self.line_item.setDownsampling(auto=True, method="peak")
         
         # Bubbles plot overlay
         self.bubbles_item = pg.ScatterPlotItem(
@@ -203,8 +344,21 @@ class ChartPane(QWidget):
         self.price_plot.addItem(self.line_item)
         self.price_plot.addItem(self.bubbles_item)
         
-        self.volume_item: pg.BarGraphItem | None = None
-        self.ema_item: pg.PlotDataItem | None = None
+        # Up and down volume bars live in two persistent items with one shared
+        # brush each; frames only swap their arrays.
+        self.volume_up_item = pg.BarGraphItem(
+            x=np.empty(0), height=np.empty(0), width=1.0, brush=_VOL_UP_BRUSH, pen=pg.mkPen(None)
+        )
+        self.volume_dn_item = pg.BarGraphItem(
+            x=np.empty(0), height=np.empty(0), width=1.0, brush=_VOL_DN_BRUSH, pen=pg.mkPen(None)
+        )
+        self.vb_vol.addItem(self.volume_up_item)
+        self.vb_vol.addItem(self.volume_dn_item)
+        # Mouse input is off for this box, so Y auto-range stays on once set
+        self.vb_vol.enableAutoRange(pg.ViewBox.YAxis, True)
+        self.ema_item = pg.PlotDataItem(pen=pg.mkPen(color=(100, 180, 255), width=1.0))
+        self.ema_item.setVisible(self.show_ema)
+        self.price_plot.addItem(self.ema_item)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -231,11 +385,13 @@ class ChartPane(QWidget):
 
         QTimer.singleShot(0, self._update_vol_geometry)
 
-        interval_ms = max(int(1000 / max(fps, 1)), 16)
-        self._render_timer = QTimer(self)
-        self._render_timer.setInterval(interval_ms)
-        self._render_timer.timeout.connect(self._render_if_dirty)
-        self._render_timer.start()
+        self._render_target = render_scheduler().register(
+            self,
+            self._render_if_dirty,
+            name=f"chart {exchange} {symbol} {timeframe}",
+            fps=fps,
+            is_dirty=lambda: bool(self._dirty or self._view_dirty),
+        )
 
         self.set_runtime(runtime)
 
@@ -243,10 +399,12 @@ class ChartPane(QWidget):
         if exchange == self.exchange and symbol == self.symbol and timeframe == self.timeframe:
             return
         self._unsubscribe()
+        self._unregister_handlers()
         self.exchange = exchange
         self.symbol = symbol
         self.timeframe = timeframe
         self.clear_data()
+        self._register_handlers()
         self._subscribe()
         LOGGER.debug("Chart pane resubscribed: %s/%s/%s", exchange, symbol, timeframe)
 
@@ -259,18 +417,17 @@ class ChartPane(QWidget):
         self.volumes.clear()
         self._did_initial_fit = False
         self._dirty = False
+        self._series_cache = None
+        self._rendered_window = None
         self.candle_item.set_data([], [], [], [], [], body_width=1.0)
         self.ha_item.set_data([], [], [], [], [], body_width=1.0)
         self.line_item.setData([], [])
         self.bubbles_item.clear()
         self._trades_cache.clear()
         
-        if self.volume_item is not None:
-            self.vb_vol.removeItem(self.volume_item)
-            self.volume_item = None
-        if self.ema_item is not None:
-            self.price_plot.removeItem(self.ema_item)
-            self.ema_item = None
+        self._update_volume(np.empty(0), np.empty(0), np.empty(0, dtype=bool), 1.0)
+        self.ema_item.setData([], [])
+        self._indicators.clear()
         if self._price_line is not None:
             self.price_plot.removeItem(self._price_line)
             self._price_line = None
@@ -320,7 +477,7 @@ class ChartPane(QWidget):
         emitter = self.runtime.core.emitter
         emitter.register(Signals.NEW_CANDLES, self._on_new_candles)
         emitter.register(Signals.UPDATED_CANDLES, self._on_updated_candles)
-        emitter.register(Signals.NEW_TRADE, self._on_new_trade)
+        emitter.register_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trade)
         self._handlers_registered = True
 
     def _unregister_handlers(self) -> None:
@@ -330,7 +487,7 @@ class ChartPane(QWidget):
         try:
             emitter.unregister(Signals.NEW_CANDLES, self._on_new_candles)
             emitter.unregister(Signals.UPDATED_CANDLES, self._on_updated_candles)
-            emitter.unregister(Signals.NEW_TRADE, self._on_new_trade)
+            emitter.unregister_keyed(Signals.NEW_TRADE, (self.exchange, self.symbol), self._on_new_trade)
         except Exception:
             pass
         self._handlers_registered = False
@@ -376,7 +533,7 @@ class ChartPane(QWidget):
     def _on_new_trade(self, exchange: str, trade_data: dict) -> None:
         if exchange != self.exchange or trade_data.get("symbol") != self.symbol:
             return
-        self._trades_cache.append(trade_data)
+        self._trades_cache.append_trade(trade_data)
         if self._show_bubbles:
             self._dirty = True
 
@@ -401,6 +558,8 @@ class ChartPane(QWidget):
         self.lows = tail["lows"].tolist()
         self.closes = tail["closes"].tolist()
         self.volumes = tail["volumes"].tolist()
+        self._series_cache = None
+        self._indicators.clear()
         self._did_initial_fit = False
         self._dirty = True
 
@@ -415,6 +574,7 @@ class ChartPane(QWidget):
         l = float(row["lows"])
         c = float(row["closes"])
         v = float(row["volumes"])
+        indicators_in_step = len(self._indicators) == len(self.timestamps)
 
         if self.timestamps and abs(self.timestamps[-1] - ts) < 1e-9:
             self.opens[-1] = o
@@ -422,6 +582,10 @@ class ChartPane(QWidget):
             self.lows[-1] = l
             self.closes[-1] = c
             self.volumes[-1] = v
+            if self._series_cache is not None:
+                self._series_cache[1:, -1] = (o, h, l, c, v)
+            if indicators_in_step:
+                self._indicators.update_last(o, h, l, c)
         elif not self.timestamps or ts > self.timestamps[-1]:
             self.timestamps.append(ts)
             self.opens.append(o)
@@ -429,6 +593,8 @@ class ChartPane(QWidget):
             self.lows.append(l)
             self.closes.append(c)
             self.volumes.append(v)
+            if indicators_in_step:
+                self._indicators.append(o, h, l, c)
             if len(self.timestamps) > self.max_points:
                 self.timestamps = self.timestamps[-self.max_points :]
                 self.opens = self.opens[-self.max_points :]
@@ -436,115 +602,157 @@ class ChartPane(QWidget):
                 self.lows = self.lows[-self.max_points :]
                 self.closes = self.closes[-self.max_points :]
                 self.volumes = self.volumes[-self.max_points :]
+                self._indicators.trim(self.max_points)
+            self._series_cache = None
         else:
             return
         self._dirty = True
 
+    def _series(self) -> np.ndarray:
+        """Return the candles as a (6, n) x/o/h/l/c/v float array."""
+        if self._series_cache is None or self._series_cache.shape[1] != len(self.timestamps):
+            self._series_cache = np.array(
+                [self.timestamps, self.opens, self.highs, self.lows, self.closes, self.volumes],
+                dtype=np.float64,
+            ).reshape(6, -1)
+        return self._series_cache
+
+    def _indicator_state(self) -> CandleIndicators:
+        """Return the HA/EMA state, rebuilding it in one vectorized pass if it fell out of step."""
+        if len(self._indicators) != len(self.timestamps):
+            series = self._series()
+            self._indicators.recompute(series[1], series[2], series[3], series[4])
+        return self._indicators
+
+    def _visible_window(self) -> tuple[int, int, int]:
+        """Bars [lo, hi) intersecting the X range, and the decimation step for them.
+
+        The step is the power of two that brings the visible bars down to at
+        most one per horizontal pixel; powers of two keep bucket boundaries
+        stable while zooming.
+        """
+        x = self._series()[0]
+        vb = self.price_plot.getViewBox()
+        x_min, x_max = vb.viewRange()[0]
+        lo = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+        hi = min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+        pixels = int(vb.width())
+        visible = hi - lo
+        step = 1
+        if pixels >= 2 and visible > pixels:
+            step = 1 << math.ceil(math.log2(visible / pixels))
+        return lo, hi, step
+
+    def _render_window(self) -> tuple[int, int, int]:
+        """The visible window padded by half its width on both sides, aligned to the step.
+
+        Panning within the padding does not need a re-render.
+        """
+        lo, hi, step = self._visible_window()
+        pad = max((hi - lo) // 2, step)
+        lo = (max(lo - pad, 0) // step) * step
+        hi = min(hi + pad, len(self.timestamps))
+        return lo, hi, step
+
+    def _window_is_current(self) -> bool:
+        if self._rendered_window is None:
+            return False
+        lo, hi, step = self._visible_window()
+        r_lo, r_hi, r_step = self._rendered_window
+        return step == r_step and r_lo <= lo and hi <= r_hi
+
+    def _on_x_range_changed(self, *_args) -> None:
+        self._view_dirty = True
+
     def _render_if_dirty(self) -> None:
-        if not self._dirty or not self.timestamps:
+        if not self.timestamps or not (self._dirty or self._view_dirty):
             return
+        if not self._dirty:
+            # Only the viewport moved: re-render once it leaves the rendered bars
+            # or the zoom level needs a different decimation step.
+            self._view_dirty = False
+            if self._window_is_current():
+                return
+        if not self._did_initial_fit:
+            self._fit_initial_view()
+            self._did_initial_fit = True
         self._dirty = False
+        self._view_dirty = False
 
-        x = self.timestamps
+        series = self._series()
+        lo, hi, step = self._render_window()
+        self._rendered_window = (lo, hi, step)
+        view = _decimate_ohlcv(series[:, lo:hi], step)
+        x = view[0]
         candle_width = self._infer_candle_width_seconds()
         self._current_candle_width = candle_width
-        
+        body_width = candle_width * step * 0.72
+
         self.candle_item.hide()
         self.ha_item.hide()
         self.line_item.hide()
 
         if self._chart_mode == "candles":
             self.candle_item.show()
-            self.candle_item.set_data(
-                x, self.opens, self.highs, self.lows, self.closes, body_width=candle_width * 0.72
-            )
+            self.candle_item.set_data(x, view[1], view[2], view[3], view[4], body_width=body_width)
         elif self._chart_mode == "line":
             self.line_item.show()
-            self.line_item.setData(x, self.closes)
+            # Peak downsampling in the item keeps min/max per pixel for the line
+            self.line_item.setData(series[0, lo:hi], series[4, lo:hi])
         elif self._chart_mode == "heikin ashi":
             self.ha_item.show()
-            ha_opens, ha_highs, ha_lows, ha_closes = [], [], [], []
-            for i in range(len(self.closes)):
-                ha_c = (self.opens[i] + self.highs[i] + self.lows[i] + self.closes[i]) / 4.0
-                if i == 0:
-                    ha_o = (self.opens[i] + self.closes[i]) / 2.0
-                else:
-                    ha_o = (ha_opens[-1] + ha_closes[-1]) / 2.0
-                ha_h = max(self.highs[i], ha_o, ha_c)
-                ha_l = min(self.lows[i], ha_o, ha_c)
-                ha_opens.append(ha_o)
-                ha_highs.append(ha_h)
-                ha_lows.append(ha_l)
-                ha_closes.append(ha_c)
+            ha = np.vstack([series[0, lo:hi], self._indicator_state().heikin_ashi[:, lo:hi], series[5, lo:hi]])
+            ha_view = _decimate_ohlcv(ha, step)
             self.ha_item.set_data(
-                x, ha_opens, ha_highs, ha_lows, ha_closes, body_width=candle_width * 0.72
+                ha_view[0], ha_view[1], ha_view[2], ha_view[3], ha_view[4], body_width=body_width
             )
-            
-        if self._show_bubbles and self._trades_cache:
-            spots = []
-            # Calculate dynamic sizing based on max amount in cache
-            max_amt = max(
-                (float(t.get("amount", 0.0)) for t in self._trades_cache if t.get("amount") is not None),
-                default=0.01,
+
+        if self._show_bubbles and len(self._trades_cache):
+            self._update_bubbles(
+                float(series[0, lo]) - candle_width, float(series[0, hi - 1]) + candle_width, candle_width
             )
-            for trade in self._trades_cache:
-                amt = float(trade.get("amount", 0.0) or 0.0)
-                price = float(trade.get("price", 0.0) or 0.0)
-                ts = float(trade.get("timestamp", 0) or 0) / 1000.0  # Assumes ms timestamps
-                
-                # Scale radius non-linearly for extreme outliers, bounded between 8px and 45px
-                ratio = math.sqrt(amt / max_amt) if max_amt > 0 else 0
-                size = 8 + (37 * ratio)
-                
-                side = trade.get("side", "")
-                if side == "buy":
-                    brush = pg.mkBrush(38, 166, 154, 180) # Buy Green
-                    pen = pg.mkPen(26, 115, 106, 200)
-                else:
-                    brush = pg.mkBrush(239, 83, 80, 180)  # Sell Red
-                    pen = pg.mkPen(182, 60, 58, 200)
-                    
-                spots.append({
-                    "pos": (ts, price),
-                    "size": size,
-                    "brush": brush,
-                    "pen": pen,
-                    "data": trade
-                })
-            
-            self.bubbles_item.show()
-            self.bubbles_item.setData(spots)
         else:
             self.bubbles_item.hide()
             self.bubbles_item.clear()
-            
+
         self._update_price_line()
 
-        if self.volume_item is not None:
-            self.vb_vol.removeItem(self.volume_item)
-        brushes = [
-            QBrush(QColor(38, 166, 154, 140)) if c >= o else QBrush(QColor(239, 83, 80, 140))
-            for o, c in zip(self.opens, self.closes)
-        ]
-        self.volume_item = pg.BarGraphItem(
-            x=x,
-            height=self.volumes,
-            width=candle_width * 0.72,
-            brushes=brushes,
-            pen=pg.mkPen(None),
-        )
-        self.vb_vol.addItem(self.volume_item)
-        self.vb_vol.enableAutoRange(pg.ViewBox.YAxis, True)
+        self._update_volume(x, view[5], view[4] >= view[1], body_width)
 
         if self.show_ema:
-            if self.ema_item is not None:
-                self.price_plot.removeItem(self.ema_item)
-            ema = pd.Series(self.closes).ewm(span=20, adjust=False).mean().tolist()
-            self.ema_item = self.price_plot.plot(x=x, y=ema, pen=pg.mkPen(color=(100, 180, 255), width=1.0))
+            # EMA is path dependent: it is kept over all bars and sampled for the window
+            ema = self._indicator_state().ema[lo:hi]
+            if step > 1:
+                ema = ema[_bucket_bounds(len(ema), step)[1]]
+            self.ema_item.setData(x, ema)
+
+    def _update_bubbles(self, x_lo: float, x_hi: float, candle_width: float) -> None:
+        """Show the cached trades between *x_lo* and *x_hi* as bubbles sized by amount."""
+        ts, prices, amounts, sides = self._trades_cache.columns()
+        visible = (ts >= x_lo) & (ts <= x_hi)
+        ts, prices, amounts, sides = ts[visible], prices[visible], amounts[visible], sides[visible]
+        if ts.size > _BUBBLE_AGGREGATE_ABOVE:
+            y_min, y_max = self.price_plot.getViewBox().viewRange()[1]
+            ts, prices, amounts, sides = aggregate_trades(
+                ts, prices, amounts, sides, candle_width, (y_max - y_min) / _BUBBLE_PRICE_BUCKETS
+            )
+        # Scale radius non-linearly for extreme outliers, bounded between 8px and 45px
+        max_amt = float(amounts.max()) if amounts.size else 0.0
+        ratios = np.sqrt(amounts / max_amt) if max_amt > 0 else np.zeros_like(amounts)
+        buys = sides == SIDE_BUY
+        self.bubbles_item.setData(
+            x=ts,
+            y=prices,
+            size=8 + 37 * ratios,
+            brush=np.where(buys, _BUBBLE_BUY_BRUSH, _BUBBLE_SELL_BRUSH),
+            pen=np.where(buys, _BUBBLE_BUY_PEN, _BUBBLE_SELL_PEN),
+        )
+        self.bubbles_item.show()
 
-        if x and not self._did_initial_fit:
-            self._fit_initial_view()
-            self._did_initial_fit = True
+    def _update_volume(self, x: np.ndarray, volumes: np.ndarray, rising: np.ndarray, width: float) -> None:
+        """Split the volume bars between the up and down items by *rising* and update them in place."""
+        self.volume_up_item.setOpts(x=x[rising], height=volumes[rising], width=width)
+        self.volume_dn_item.setOpts(x=x[~rising], height=volumes[~rising], width=width)
 
     def _fit_initial_view(self) -> None:
         if not self.timestamps:
@@ -705,13 +913,10 @@ class ChartPane(QWidget):
 
     def _infer_candle_width_seconds(self) -> float:
         if len(self.timestamps) >= 2:
-            diffs = [
-                float(self.timestamps[idx] - self.timestamps[idx - 1])
-                for idx in range(1, len(self.timestamps))
-                if self.timestamps[idx] > self.timestamps[idx - 1]
-            ]
-            if diffs:
-                return max(min(diffs), 1.0)
+            diffs = np.diff(self._series()[0])
+            diffs = diffs[diffs > 0]
+            if diffs.size:
+                return max(float(diffs.min()), 1.0)
         return float(_timeframe_to_seconds(self.timeframe))
 
     @staticmethod
@@ -725,7 +930,7 @@ class ChartPane(QWidget):
         return numeric.astype(float).tolist()
 
     def shutdown(self) -> None:
-        self._render_timer.stop()
+        render_scheduler().unregister(self)
         self._unsubscribe()
         self._unregister_handlers()
 
@@ -1,24 +1,28 @@
 from __future__ import annotations
 
+import copy
 import logging
 from typing import Any
 
-from PySide6.QtCore import Qt, QTimer
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide6.QtGui import QColor, QFont
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QCheckBox,
     QDockWidget,
     QHeaderView,
     QHBoxLayout,
     QLabel,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
 
-from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.analysis.orderbook_processor import KIND_ASK, KIND_BID, KIND_MID, LadderColumns, OrderBookProcessor
+from sentinel.analysis.orderbook_worker import OrderBookComputeWorker
+from sentinel.app.render_scheduler import render_scheduler
 from sentinel.core.signals import Signals
 
 
@@ -37,6 +41,169 @@ _MID_FONT.setBold(True)
 
 _EPSILON = 1e-9
 
+COL_BID_CUM, COL_BID_QTY, COL_PRICE, COL_ASK_QTY, COL_ASK_CUM = range(5)
+_HEADERS = ["Bid Cum", "Bid Qty", "Price", "Ask Qty", "Ask Cum"]
+_KIND_EMPTY = 2  # padding rows below the ladder
+
+_ALIGN_RIGHT = int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+_ALIGN_LEFT = int(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+_ALIGNMENTS = (_ALIGN_RIGHT, _ALIGN_RIGHT, int(Qt.AlignmentFlag.AlignCenter), _ALIGN_LEFT, _ALIGN_LEFT)
+# Roles the model answers, mapped to their slot in the per-row cell cache
+_ROLE_SLOTS = {
+    Qt.ItemDataRole.DisplayRole: 0,
+    Qt.ItemDataRole.BackgroundRole: 1,
+    Qt.ItemDataRole.ForegroundRole: 2,
+    Qt.ItemDataRole.TextAlignmentRole: 3,
+    Qt.ItemDataRole.FontRole: 4,
+}
+
+# Palette tables, built once. Depth backgrounds are indexed by alpha, which
+# grows with the level's quantity: min(140, 24 + quantity * 180).
+_MAX_DEPTH_ALPHA = 140
+_ASK_DEPTH = [QColor(120, 24, 36, alpha) for alpha in range(_MAX_DEPTH_ALPHA + 1)]
+_BID_DEPTH = [QColor(24, 94, 58, alpha) for alpha in range(_MAX_DEPTH_ALPHA + 1)]
+_PRICE_FG = QColor(215, 219, 224)
+_FOREGROUND = {
+    KIND_ASK: (QColor(230, 92, 104), _PRICE_FG),
+    KIND_BID: (QColor(53, 190, 130), _PRICE_FG),
+    KIND_MID: (QColor(238, 242, 247), QColor(248, 250, 252)),
+    _KIND_EMPTY: (QColor(160, 168, 176), QColor(160, 168, 176)),
+}
+_PRICE_BG = {
+    KIND_ASK: QColor(78, 18, 24, 20),
+    KIND_BID: QColor(18, 56, 38, 20),
+    KIND_MID: QColor(74, 84, 96, 220),
+    _KIND_EMPTY: QColor(0, 0, 0, 0),
+}
+
+
+def _format_quantity(value: float) -> str:
+    if value <= _EPSILON:
+        return ""
+    if value < 0.0001:
+        return "<0.0001"
+    return f"{value:,.4f}"
+
+
+class DomLadderModel(QAbstractTableModel):
+    """Table model over a fixed number of DOM rows held as NumPy arrays.
+
+    `set_columns` diffs the incoming ladder against the current one and emits
+    ``dataChanged`` only for the runs of rows that differ, so the view
+    repaints just those rows. Text is formatted lazily for the cells the view
+    asks for and cached per row until the row changes. Colours come from
+    palette tables built once at import, with depth backgrounds indexed by a
+    per-cell alpha computed in bulk, so the stock item delegate paints every
+    cell without any per-cell Python drawing code.
+    """
+
+    def __init__(self, rows: int, parent=None) -> None:
+        super().__init__(parent)
+        self._rows = int(rows)
+        self._values = np.zeros((self._rows, len(_HEADERS)), dtype=np.float64)
+        self._kinds = np.full(self._rows, _KIND_EMPTY, dtype=np.int8)
+        self._alpha = np.zeros((self._rows, len(_HEADERS)), dtype=np.int16)
+        self._cells: dict[int, tuple[tuple, ...]] = {}
+        self._show_cumulative = True
+        self.rows_changed_last_update = 0
+
+    def rowCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):  # noqa: N802
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return _HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        slot = _ROLE_SLOTS.get(role)
+        if slot is None:
+            return None
+        row = index.row()
+        cells = self._cells.get(row)
+        if cells is None:
+            cells = self._cells[row] = self._build_cells(row)
+        return cells[slot][index.column()]
+
+    def _build_cells(self, row: int) -> tuple[tuple, ...]:
+        """Everything the view may ask about one row, indexed by `_ROLE_SLOTS`."""
+        kind = int(self._kinds[row])
+        foreground = _FOREGROUND[kind]
+        font = _MID_FONT if kind == KIND_MID else None
+        return (
+            self._format_row(row),
+            tuple(self.background(row, col) for col in range(len(_HEADERS))),
+            tuple(foreground[col == COL_PRICE] for col in range(len(_HEADERS))),
+            _ALIGNMENTS,
+            (font,) * len(_HEADERS),
+        )
+
+    def background(self, row: int, col: int) -> QColor:
+        kind = int(self._kinds[row])
+        if col == COL_PRICE or kind == KIND_MID or kind == _KIND_EMPTY:
+            return _PRICE_BG[kind]
+        depth = _ASK_DEPTH if kind == KIND_ASK else _BID_DEPTH
+        return depth[self._alpha[row, col]]
+
+    def _format_row(self, row: int) -> tuple[str, ...]:
+        kind = int(self._kinds[row])
+        if kind == _KIND_EMPTY:
+            return ("",) * len(_HEADERS)
+        bid_cum, bid_qty, price, ask_qty, ask_cum = self._values[row].tolist()
+        has_bid = bid_qty > _EPSILON
+        has_ask = ask_qty > _EPSILON
+        return (
+            _format_quantity(bid_cum) if has_bid and self._show_cumulative else "",
+            _format_quantity(bid_qty) if has_bid else "",
+            f"{price:.2f} MID" if kind == KIND_MID else f"{price:.2f}",
+            _format_quantity(ask_qty) if has_ask else "",
+            _format_quantity(ask_cum) if has_ask and self._show_cumulative else "",
+        )
+
+    def set_show_cumulative(self, show: bool) -> None:
+        if show == self._show_cumulative:
+            return
+        self._show_cumulative = show
+        self._cells.clear()
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._rows - 1, len(_HEADERS) - 1))
+
+    def set_columns(self, columns: LadderColumns) -> int:
+        """Load a ladder (extra rows are dropped, missing rows blanked); returns the rows that changed."""
+        n = min(len(columns), self._rows)
+        values = np.zeros_like(self._values)
+        values[:n, COL_BID_CUM] = columns.bid_cum[:n]
+        values[:n, COL_BID_QTY] = columns.bid_qty[:n]
+        values[:n, COL_PRICE] = columns.price[:n]
+        values[:n, COL_ASK_QTY] = columns.ask_qty[:n]
+        values[:n, COL_ASK_CUM] = columns.ask_cum[:n]
+        kinds = np.full(self._rows, _KIND_EMPTY, dtype=np.int8)
+        kinds[:n] = columns.kind[:n]
+
+        changed = np.flatnonzero((values != self._values).any(axis=1) | (kinds != self._kinds))
+        self.rows_changed_last_update = int(changed.size)
+        if changed.size == 0:
+            return 0
+        magnitudes = np.minimum(values, 1.0)
+        magnitudes[:, COL_PRICE] = 0.0
+        self._values = values
+        self._kinds = kinds
+        self._alpha = np.minimum(_MAX_DEPTH_ALPHA, 24 + (magnitudes * 180).astype(np.int16))
+        for row in changed.tolist():
+            self._cells.pop(row, None)
+
+        # One signal per run of consecutive changed rows
+        breaks = np.flatnonzero(np.diff(changed) != 1)
+        starts = np.append(changed[0], changed[breaks + 1])
+        ends = np.append(changed[breaks], changed[-1])
+        last_col = len(_HEADERS) - 1
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            self.dataChanged.emit(self.index(start, 0), self.index(end, last_col))
+        return int(changed.size)
+
 
 class DomDockWidget(QDockWidget):
     def __init__(
@@ -49,6 +216,7 @@ class DomDockWidget(QDockWidget):
         levels: int = 16,
         price_precision: float = 0.01,
         fps: int = 15,
+        offload: bool = False,
     ) -> None:
         super().__init__(f"DOM - {exchange.upper()} {symbol}")
         self.instance_id = instance_id
@@ -64,7 +232,8 @@ class DomDockWidget(QDockWidget):
         self.last_orderbook: dict[str, Any] | None = None
         self._dirty = False
         self._show_cumulative = True
-        self._cell_cache: dict[tuple[int, int], tuple[str, str, str]] = {}
+        # Optional off-thread ladder builds for deep books
+        self._compute = OrderBookComputeWorker() if offload else None
 
         self.setObjectName(f"dock:{instance_id}")
         self.setFeatures(
@@ -100,11 +269,12 @@ class DomDockWidget(QDockWidget):
         controls.addWidget(self.spread_label)
         root.addLayout(controls)
 
-        self.table = QTableWidget((self.levels * 2) + 1, 5)
-        self.table.setHorizontalHeaderLabels(["Bid Cum", "Bid Qty", "Price", "Ask Qty", "Ask Cum"])
+        self.model = DomLadderModel((self.levels * 2) + 1, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.table.horizontalHeader().setStretchLastSection(False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.setAlternatingRowColors(True)
@@ -117,10 +287,13 @@ class DomDockWidget(QDockWidget):
         self.setMinimumWidth(300)
         self.setMaximumWidth(520)
 
-        self._timer = QTimer(self)
-        self._timer.setInterval(max(int(1000 / max(fps, 1)), 16))
-        self._timer.timeout.connect(self._render_if_dirty)
-        self._timer.start()
+        self._render_target = render_scheduler().register(
+            self,
+            self._render_if_dirty,
+            name=f"dom {exchange} {symbol}",
+            fps=fps,
+            is_dirty=lambda: self._dirty or (self._compute is not None and self._compute.ready),
+        )
         self._apply_headers()
 
         self.set_runtime(runtime)
@@ -133,6 +306,7 @@ class DomDockWidget(QDockWidget):
                 "exchange": self.exchange,
                 "symbol": self.symbol,
                 "levels": self.levels,
+                "offload": self._compute is not None,
             },
         }
 
@@ -146,14 +320,18 @@ class DomDockWidget(QDockWidget):
     def _register_handlers(self) -> None:
         if self._handlers_registered or self.runtime is None or self.runtime.core is None:
             return
-        self.runtime.core.emitter.register(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+        self.runtime.core.emitter.register_keyed(
+            Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update
+        )
         self._handlers_registered = True
 
     def _unregister_handlers(self) -> None:
         if not self._handlers_registered or self.runtime is None or self.runtime.core is None:
             return
         try:
-            self.runtime.core.emitter.unregister(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+            self.runtime.core.emitter.unregister_keyed(
+                Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update
+            )
         except Exception:
             pass
         self._handlers_registered = False
@@ -188,6 +366,13 @@ class DomDockWidget(QDockWidget):
         self.last_orderbook = orderbook
         self._dirty = True
 
+    def _order_book_model(self):
+        """Shared incremental book for this market, if the core keeps one."""
+        if self.runtime is None or self.runtime.core is None:
+            return None
+        store = getattr(self.runtime.core, "order_books", None)
+        return store.get(self.exchange, self.symbol) if store is not None else None
+
     def _current_mid_price(self) -> float | None:
         if not self.last_orderbook:
             return None
@@ -209,120 +394,71 @@ class DomDockWidget(QDockWidget):
 
     def _on_toggle_cumulative(self, checked: bool) -> None:
         self._show_cumulative = checked
+        self.model.set_show_cumulative(checked)
         self._apply_headers()
         self._dirty = True
 
     def _render_if_dirty(self) -> None:
-        if not self._dirty or not self.last_orderbook:
+        if self._compute is not None:
+            processed = self._take_computed_ladder()
+        elif not self._dirty or not self.last_orderbook:
             return
-        self._dirty = False
-
-        processed = self.processor.build_dom_ladder(
-            self.last_orderbook.get("bids", []),
-            self.last_orderbook.get("asks", []),
-            self.levels,
-            self._current_mid_price(),
-        )
+        else:
+            self._dirty = False
+            processed = self.processor.build_dom_ladder(
+                self.last_orderbook.get("bids", []),
+                self.last_orderbook.get("asks", []),
+                self.levels,
+                self._current_mid_price(),
+                book=self._order_book_model(),
+                columnar=True,
+            )
         if not processed:
             return
 
-        rows = processed["rows"]
-        for row_index, row in enumerate(rows):
-            kind = row["kind"]
-            has_bid_liquidity = row["bid_qty"] > _EPSILON
-            has_ask_liquidity = row["ask_qty"] > _EPSILON
-            bid_qty = self._format_quantity(row["bid_qty"]) if has_bid_liquidity else ""
-            bid_cum = (
-                self._format_quantity(row["bid_cum"])
-                if has_bid_liquidity and self._show_cumulative
-                else ""
-            )
-            ask_cum = (
-                self._format_quantity(row["ask_cum"])
-                if has_ask_liquidity and self._show_cumulative
-                else ""
-            )
-            ask_qty = self._format_quantity(row["ask_qty"]) if has_ask_liquidity else ""
-            price_val = f"{row['price']:.2f}" if kind != "mid" else f"{row['price']:.2f} MID"
-
-            self._set_cell(row_index, 0, bid_cum, kind=kind, role="bid_cum", magnitude=row["bid_cum"])
-            self._set_cell(row_index, 1, bid_qty, kind=kind, role="bid_qty", magnitude=row["bid_qty"])
-            self._set_cell(row_index, 2, price_val, kind=kind, role="price", magnitude=0.0)
-            self._set_cell(row_index, 3, ask_qty, kind=kind, role="ask_qty", magnitude=row["ask_qty"])
-            self._set_cell(row_index, 4, ask_cum, kind=kind, role="ask_cum", magnitude=row["ask_cum"])
+        self.model.set_columns(processed["columns"])
 
         spread = processed["best_ask"] - processed["best_bid"]
         self.spread_label.setText(f"Spread: {spread:.2f}")
 
-        # Clear any extra rows if the ladder size changes in the future.
-        for row_index in range(len(rows), self.table.rowCount()):
-            for col in range(self.table.columnCount()):
-                self._set_cell(row_index, col, "", kind="empty", role="empty", magnitude=0.0)
-
-    def _set_cell(self, row: int, col: int, text: str, *, kind: str, role: str, magnitude: float) -> None:
-        item = self.table.item(row, col)
-        if item is None:
-            item = QTableWidgetItem()
-            self.table.setItem(row, col, item)
-        fg, bg = self._cell_palette(kind=kind, role=role, magnitude=magnitude)
-        cache_key = (row, col)
-        state = (text, fg.name(QColor.NameFormat.HexArgb), bg.name(QColor.NameFormat.HexArgb))
-        if self._cell_cache.get(cache_key) == state:
-            return
-        self._cell_cache[cache_key] = state
-
-        item.setText(text)
-        item.setForeground(fg)
-        item.setBackground(bg)
-        item.setFont(_MID_FONT if kind == "mid" else _MONO_FONT)
-        if role == "price":
-            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        elif role.startswith("ask"):
-            item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        else:
-            item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-
-    def _cell_palette(self, *, kind: str, role: str, magnitude: float) -> tuple[QColor, QColor]:
-        if kind == "mid":
-            if role == "price":
-                return QColor(248, 250, 252), QColor(74, 84, 96, 220)
-            return QColor(238, 242, 247), QColor(74, 84, 96, 220)
-        if kind == "ask":
-            alpha = min(140, 24 + int(magnitude * 180))
-            if role == "price":
-                return QColor(215, 219, 224), QColor(78, 18, 24, 20)
-            return QColor(230, 92, 104), QColor(120, 24, 36, alpha)
-        if kind == "bid":
-            alpha = min(140, 24 + int(magnitude * 180))
-            if role == "price":
-                return QColor(215, 219, 224), QColor(18, 56, 38, 20)
-            return QColor(53, 190, 130), QColor(24, 94, 58, alpha)
-        return QColor(160, 168, 176), QColor(0, 0, 0, 0)
+    def _take_computed_ladder(self):
+        """Queue a ladder build for the latest book and return the newest finished one."""
+        if self._dirty and self.last_orderbook:
+            self._dirty = False
+            book = self._order_book_model()
+            # The worker gets immutable inputs and a processor copy with the current settings
+            self._compute.submit(
+                copy.copy(self.processor).build_dom_ladder,
+                list(self.last_orderbook.get("bids", [])),
+                list(self.last_orderbook.get("asks", [])),
+                self.levels,
+                self._current_mid_price(),
+                book=book.snapshot() if book is not None else None,
+                columnar=True,
+            )
+        return self._compute.take()
+
+    def compute_stats(self) -> dict[str, int] | None:
+        """Worker counters (submitted/completed/superseded/dropped/failed) when offloading."""
+        return self._compute.stats() if self._compute is not None else None
 
     def _apply_headers(self) -> None:
-        headers = ["Bid Cum", "Bid Qty", "Price", "Ask Qty", "Ask Cum"]
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setColumnHidden(0, not self._show_cumulative)
-        self.table.setColumnHidden(4, not self._show_cumulative)
+        self.table.setColumnHidden(COL_BID_CUM, not self._show_cumulative)
+        self.table.setColumnHidden(COL_ASK_CUM, not self._show_cumulative)
         header = self.table.horizontalHeader()
-        for col in range(self.table.columnCount()):
+        for col in range(self.model.columnCount()):
             if self.table.isColumnHidden(col):
                 continue
             header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
 
-    def _format_quantity(self, value: float) -> str:
-        if value <= _EPSILON:
-            return ""
-        if value < 0.0001:
-            return "<0.0001"
-        return f"{value:,.4f}"
-
     def resizeEvent(self, event):  # noqa: N802
         self._apply_headers()
         super().resizeEvent(event)
 
     def closeEvent(self, event):  # noqa: N802
-        self._timer.stop()
+        render_scheduler().unregister(self)
+        if self._compute is not None:
+            self._compute.close()
         self._unsubscribe()
         self._unregister_handlers()
         super().closeEvent(event)
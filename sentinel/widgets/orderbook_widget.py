@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import copy
 import logging
 from typing import Any
 
+import numpy as np
 import pyqtgraph as pg
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -18,6 +20,8 @@ from PySide6.QtWidgets import (
 )
 
 from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.analysis.orderbook_worker import OrderBookComputeWorker
+from sentinel.app.render_scheduler import render_scheduler
 from sentinel.core.signals import Signals
 
 
@@ -34,6 +38,18 @@ _DATA_FONT = QFont()
 _DATA_FONT.setStyleHint(QFont.StyleHint.Monospace)
 _DATA_FONT.setPointSize(9)
 
+_BID_COLOR = (40, 210, 120)
+_ASK_COLOR = (220, 80, 90)
+_BID_LINE_PEN = pg.mkPen(_BID_COLOR, width=2)
+_ASK_LINE_PEN = pg.mkPen(_ASK_COLOR, width=2)
+_BID_BAR_PEN = pg.mkPen(_BID_COLOR, width=1)
+_ASK_BAR_PEN = pg.mkPen(_ASK_COLOR, width=1)
+_BID_BAR_BRUSH = pg.mkBrush(*_BID_COLOR, 160)
+_ASK_BAR_BRUSH = pg.mkBrush(*_ASK_COLOR, 160)
+_BID_FILL_BRUSH = pg.mkBrush(*_BID_COLOR, 60)
+_ASK_FILL_BRUSH = pg.mkBrush(*_ASK_COLOR, 60)
+_EMPTY = np.empty(0, dtype=np.float64)
+
 
 def _style_pg_plot(plot: pg.PlotWidget) -> None:
     for axis_name in ("left", "right", "top", "bottom"):
@@ -55,6 +71,8 @@ class OrderbookDockWidget(QDockWidget):
         symbol: str = "BTC/USD",
         price_precision: float = 0.01,
         fps: int = 20,
+        step_depth: bool = False,
+        offload: bool = False,
     ) -> None:
         super().__init__(f"Orderbook - {exchange.upper()} {symbol}")
         self.instance_id = instance_id
@@ -68,8 +86,10 @@ class OrderbookDockWidget(QDockWidget):
         self.last_orderbook: dict[str, Any] | None = None
         self._dirty = False
         self._mode = "agg"
-        self._bids_bars = None
-        self._asks_bars = None
+        self._step_depth = bool(step_depth)
+        self._bars_visible = False
+        # Optional off-thread processing for deep books
+        self._compute = OrderBookComputeWorker() if offload else None
 
         self.setObjectName(f"dock:{instance_id}")
         self.setFeatures(
@@ -86,6 +106,11 @@ class OrderbookDockWidget(QDockWidget):
         self.agg_checkbox.setChecked(self.processor.aggregation_enabled)
         self.agg_checkbox.toggled.connect(self._on_toggle_aggregation)
         top_row.addWidget(self.agg_checkbox)
+        self.step_checkbox = QCheckBox("Step")
+        self.step_checkbox.setToolTip("Draw cumulative depth as filled steps instead of per-level bars")
+        self.step_checkbox.setChecked(self._step_depth)
+        self.step_checkbox.toggled.connect(self.set_step_depth)
+        top_row.addWidget(self.step_checkbox)
 
         top_row.addWidget(QLabel("Spread %"))
         self.spread_slider = QSlider()
@@ -131,18 +156,28 @@ class OrderbookDockWidget(QDockWidget):
         _style_pg_plot(self.plot)
         root.addWidget(self.plot, 1)
 
-        self.bids_line = self.plot.plot([], [], pen=pg.mkPen((40, 210, 120), width=2), name="Bids")
-        self.asks_line = self.plot.plot([], [], pen=pg.mkPen((220, 80, 90), width=2), name="Asks")
+        self.bids_line = self.plot.plot([], [], pen=_BID_LINE_PEN, name="Bids")
+        self.asks_line = self.plot.plot([], [], pen=_ASK_LINE_PEN, name="Asks")
+        # Per-level bars live for the lifetime of the dock and are refreshed
+        # through setOpts; only their visibility follows the render mode.
+        self._bids_bars = pg.BarGraphItem(x=_EMPTY, height=_EMPTY, width=1.0, brush=_BID_BAR_BRUSH, pen=_BID_BAR_PEN)
+        self._asks_bars = pg.BarGraphItem(x=_EMPTY, height=_EMPTY, width=1.0, brush=_ASK_BAR_BRUSH, pen=_ASK_BAR_PEN)
+        for bars in (self._bids_bars, self._asks_bars):
+            bars.setVisible(False)
+            self.plot.addItem(bars)
+        self._apply_depth_style()
 
         self.setWidget(body)
         self.setMinimumWidth(300)
         self.setMaximumWidth(560)
 
-        interval_ms = max(int(1000 / max(fps, 1)), 16)
-        self._render_timer = QTimer(self)
-        self._render_timer.setInterval(interval_ms)
-        self._render_timer.timeout.connect(self._render_if_dirty)
-        self._render_timer.start()
+        self._render_target = render_scheduler().register(
+            self,
+            self._render_if_dirty,
+            name=f"orderbook {exchange} {symbol}",
+            fps=fps,
+            is_dirty=lambda: self._dirty or (self._compute is not None and self._compute.ready),
+        )
 
         self.set_runtime(runtime)
 
@@ -153,6 +188,8 @@ class OrderbookDockWidget(QDockWidget):
             "config": {
                 "exchange": self.exchange,
                 "symbol": self.symbol,
+                "step_depth": self._step_depth,
+                "offload": self._compute is not None,
             },
         }
 
@@ -167,7 +204,7 @@ class OrderbookDockWidget(QDockWidget):
         if self._handlers_registered or self.runtime is None or self.runtime.core is None:
             return
         emitter = self.runtime.core.emitter
-        emitter.register(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+        emitter.register_keyed(Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update)
         self._handlers_registered = True
 
     def _unregister_handlers(self) -> None:
@@ -175,7 +212,7 @@ class OrderbookDockWidget(QDockWidget):
             return
         emitter = self.runtime.core.emitter
         try:
-            emitter.unregister(Signals.ORDER_BOOK_UPDATE, self._on_order_book_update)
+            emitter.unregister_keyed(Signals.ORDER_BOOK_UPDATE, (self.exchange, self.symbol), self._on_order_book_update)
         except Exception:
             pass
         self._handlers_registered = False
@@ -215,6 +252,31 @@ class OrderbookDockWidget(QDockWidget):
         self._mode = "agg" if self.processor.aggregation_enabled else "bars"
         self._dirty = True
 
+    def set_step_depth(self, enabled: bool) -> None:
+        """Switch between per-level bars and filled cumulative step curves.
+
+        Step curves cost the same as the aggregated depth lines, so they keep
+        deep unaggregated books cheap to redraw.
+        """
+        enabled = bool(enabled)
+        if enabled == self._step_depth:
+            return
+        self._step_depth = enabled
+        if self.step_checkbox.isChecked() != enabled:
+            self.step_checkbox.setChecked(enabled)
+        self._apply_depth_style()
+        self._dirty = True
+
+    def _apply_depth_style(self) -> None:
+        if self._step_depth:
+            self.bids_line.setFillLevel(0.0)
+            self.asks_line.setFillLevel(0.0)
+            self.bids_line.setFillBrush(_BID_FILL_BRUSH)
+            self.asks_line.setFillBrush(_ASK_FILL_BRUSH)
+        else:
+            self.bids_line.setFillLevel(None)
+            self.asks_line.setFillLevel(None)
+
     def _on_spread_changed(self, value: int) -> None:
         # slider is 1..200 -> 0.001..0.2
         spread = max(value / 1000.0, 0.001)
@@ -233,6 +295,13 @@ class OrderbookDockWidget(QDockWidget):
         self.tick_label.setText(f"Tick: {new_tick:.8g}")
         self._dirty = True
 
+    def _order_book_model(self):
+        """Shared incremental book for this market, if the core keeps one."""
+        if self.runtime is None or self.runtime.core is None:
+            return None
+        store = getattr(self.runtime.core, "order_books", None)
+        return store.get(self.exchange, self.symbol) if store is not None else None
+
     def _current_mid_price(self) -> float | None:
         if not self.last_orderbook:
             return None
@@ -243,40 +312,44 @@ class OrderbookDockWidget(QDockWidget):
         return (bids[0][0] + asks[0][0]) / 2
 
     def _render_if_dirty(self) -> None:
-        if not self._dirty or not self.last_orderbook:
+        if self._compute is not None:
+            processed = self._take_computed_book()
+        elif not self._dirty or not self.last_orderbook:
             return
-        self._dirty = False
-
-        raw_bids = self.last_orderbook.get("bids", [])
-        raw_asks = self.last_orderbook.get("asks", [])
-        current_price = self._current_mid_price()
-        processed = self.processor.process_orderbook(raw_bids, raw_asks, current_price)
+        else:
+            self._dirty = False
+            processed = self.processor.process_orderbook(
+                self.last_orderbook.get("bids", []),
+                self.last_orderbook.get("asks", []),
+                self._current_mid_price(),
+                book=self._order_book_model(),
+                as_arrays=True,
+            )
         if not processed:
             return
 
+        # (N, 3) [price, qty, cum] arrays; the column views below are handed
+        # to the persistent items without building per-level Python lists.
         bids = processed["bids_processed"]
         asks = processed["asks_processed"]
-        if self.processor.aggregation_enabled:
-            bid_x = [row[0] for row in bids]
-            bid_y = [row[2] for row in bids]
-            ask_x = [row[0] for row in asks]
-            ask_y = [row[2] for row in asks]
-            self.bids_line.setData(bid_x, bid_y)
-            self.asks_line.setData(ask_x, ask_y)
+        if self._step_depth:
+            self.bids_line.setData(bids[:, 0], bids[:, 2], stepMode="right")
+            self.asks_line.setData(asks[:, 0], asks[:, 2], stepMode="right")
+            self._clear_bars()
+        elif self.processor.aggregation_enabled:
+            # stepMode sticks in the item's opts across setData calls, so clear it explicitly
+            self.bids_line.setData(bids[:, 0], bids[:, 2], stepMode=None)
+            self.asks_line.setData(asks[:, 0], asks[:, 2], stepMode=None)
             self._clear_bars()
         else:
-            bid_x = [row[0] for row in bids]
-            bid_y = [row[1] for row in bids]
-            ask_x = [row[0] for row in asks]
-            ask_y = [row[1] for row in asks]
-            self.bids_line.setData([], [])
-            self.asks_line.setData([], [])
-            self._set_bars(bid_x, bid_y, ask_x, ask_y)
+            self.bids_line.setData(_EMPTY, _EMPTY, stepMode=None)
+            self.asks_line.setData(_EMPTY, _EMPTY, stepMode=None)
+            self._set_bars(bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1])
 
         x_min, x_max = processed["x_axis_limits"]
         y_min, y_max = processed["y_axis_limits"]
-        self.plot.setXRange(x_min, x_max, padding=0.0)
-        self.plot.setYRange(y_min, y_max, padding=0.02)
+        y_pad = (y_max - y_min) * 0.02
+        self.plot.setRange(xRange=(x_min, x_max), yRange=(y_min - y_pad, y_max + y_pad), padding=0.0)
 
         best_bid = processed["best_bid"]
         best_ask = processed["best_ask"]
@@ -286,35 +359,48 @@ class OrderbookDockWidget(QDockWidget):
         self.best_ask_label.setText(f"Ask: {best_ask:.2f}")
         self.spread_label.setText(f"Spread: {best_ask - best_bid:.2f}")
 
+    def _take_computed_book(self):
+        """Queue processing of the latest book and return the newest finished result."""
+        if self._dirty and self.last_orderbook:
+            self._dirty = False
+            book = self._order_book_model()
+            # The worker gets immutable inputs and a processor copy with the current settings
+            self._compute.submit(
+                copy.copy(self.processor).process_orderbook,
+                list(self.last_orderbook.get("bids", [])),
+                list(self.last_orderbook.get("asks", [])),
+                self._current_mid_price(),
+                book=book.snapshot() if book is not None else None,
+                as_arrays=True,
+            )
+        return self._compute.take()
+
+    def compute_stats(self) -> dict[str, int] | None:
+        """Worker counters (submitted/completed/superseded/dropped/failed) when offloading."""
+        return self._compute.stats() if self._compute is not None else None
+
     def _set_bars(self, bid_x, bid_y, ask_x, ask_y) -> None:
-        self._clear_bars()
-        self._bids_bars = pg.BarGraphItem(
-            x=bid_x,
-            height=bid_y,
-            width=max(self.processor.tick_size, 1e-9) * 0.85,
-            brush=(40, 210, 120, 160),
-            pen=pg.mkPen((40, 210, 120), width=1),
-        )
-        self._asks_bars = pg.BarGraphItem(
-            x=ask_x,
-            height=ask_y,
-            width=max(self.processor.tick_size, 1e-9) * 0.85,
-            brush=(220, 80, 90, 160),
-            pen=pg.mkPen((220, 80, 90), width=1),
-        )
-        self.plot.addItem(self._bids_bars)
-        self.plot.addItem(self._asks_bars)
+        width = max(self.processor.tick_size, 1e-9) * 0.85
+        self._bids_bars.setOpts(x=bid_x, height=bid_y, width=width)
+        self._asks_bars.setOpts(x=ask_x, height=ask_y, width=width)
+        if not self._bars_visible:
+            self._bids_bars.setVisible(True)
+            self._asks_bars.setVisible(True)
+            self._bars_visible = True
 
     def _clear_bars(self) -> None:
-        if self._bids_bars is not None:
-            self.plot.removeItem(self._bids_bars)
-            self._bids_bars = None
-        if self._asks_bars is not None:
-            self.plot.removeItem(self._asks_bars)
-            self._asks_bars = None
+        if not self._bars_visible:
+            return
+        self._bids_bars.setOpts(x=_EMPTY, height=_EMPTY)
+        self._asks_bars.setOpts(x=_EMPTY, height=_EMPTY)
+        self._bids_bars.setVisible(False)
+        self._asks_bars.setVisible(False)
+        self._bars_visible = False
 
     def closeEvent(self, event):  # noqa: N802
-        self._render_timer.stop()
+        render_scheduler().unregister(self)
+        if self._compute is not None:
+            self._compute.close()
         self._unsubscribe()
         self._unregister_handlers()
         self._clear_bars()
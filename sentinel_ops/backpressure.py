@@ -0,0 +1,175 @@
+# sentinel/backpressure.py
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Dict, Hashable
+
+# Backpressure policies for BackpressureQueue
+BLOCK = "block"                                 # Wait for room (up to block_timeout), then drop the new item
+DROP_OLDEST = "drop_oldest"                     # Evict the oldest queued item to make room
+DROP_NEWEST = "drop_newest"                     # Drop the new item
+COALESCE_LATEST_BOOK = "coalesce_latest_book"   # Above the high-water mark, replace the queued item with the same key; drop-oldest when full
+
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE_LATEST_BOOK)
+
+
+class _QueueEntry:
+    __slots__ = ("item", "key", "enqueued_at")
+
+    def __init__(self, item: Any, key: Hashable | None, enqueued_at: float):
+        self.item = item
+        self.key = key
+        self.enqueued_at = enqueued_at
+
+
+class BackpressureQueue(asyncio.Queue):
+    """
+    asyncio.Queue with a bounded-latency overflow policy and counters for healthz.
+
+    Producers call `offer`, which never waits longer than `block_timeout` and applies
+    the queue's policy when it is full. Consumers use the normal get()/task_done() API
+    and receive plain items, so writers need no changes.
+
+    With COALESCE_LATEST_BOOK, once the queue holds `coalesce_high_water` items, an item
+    offered with a key (e.g. (exchange, symbol)) replaces the newest item with the same key
+    that is still waiting, in its queue slot, so a consumer that keeps falling behind only
+    sees the latest snapshot per symbol. Below the mark every snapshot is queued, so a
+    briefly slow flush does not cost recorded history. Queue latency is
+    measured from when a slot was first queued until a consumer takes it, so a stalled
+    consumer shows up as growing latency even while snapshots are being coalesced.
+    """
+
+    def __init__(self, maxsize: int = 0, policy: str = BLOCK, name: str = "queue", block_timeout: float | None = 0.5,
+                 coalesce_high_water: int | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy '{policy}'. Expected one of {POLICIES}.")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.name = name
+        self.block_timeout = block_timeout
+        # Queue size from which COALESCE_LATEST_BOOK starts coalescing; defaults to full
+        if coalesce_high_water is None:
+            coalesce_high_water = maxsize if maxsize > 0 else float("inf")
+        self.coalesce_high_water = coalesce_high_water
+        self.offered = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.high_watermark = 0
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    # asyncio.Queue storage hooks ------------------------------------------------
+
+    def _init(self, maxsize):
+        self._queue = collections.deque()
+        self._pending_by_key: Dict[Hashable, _QueueEntry] = {}
+
+    def _put(self, entry):
+        if not isinstance(entry, _QueueEntry): # Plain put()/put_nowait() callers
+            entry = _QueueEntry(entry, None, time.monotonic())
+        self._queue.append(entry)
+        if entry.key is not None:
+            self._pending_by_key[entry.key] = entry
+        self.high_watermark = max(self.high_watermark, len(self._queue))
+
+    def _get(self):
+        entry = self._queue.popleft()
+        self._forget(entry)
+        latency = time.monotonic() - entry.enqueued_at
+        self.delivered += 1
+        self._latency_count += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        return entry.item
+
+    def _forget(self, entry: _QueueEntry):
+        if entry.key is not None and self._pending_by_key.get(entry.key) is entry:
+            del self._pending_by_key[entry.key]
+
+    def _evict_oldest(self):
+        entry = self._queue.popleft()
+        self._forget(entry)
+        self.task_done() # The evicted item will never be processed by a consumer
+        self.dropped += 1
+
+    # Producer API -----------------------------------------------------------------
+
+    async def offer(self, item: Any, key: Hashable | None = None) -> bool:
+        """
+        Queues *item* according to the policy.
+
+        Returns False if *item* itself was dropped. Items evicted to make room and
+        snapshots superseded by coalescing are counted, but still return True.
+        """
+        self.offered += 1
+        if self.policy == COALESCE_LATEST_BOOK and key is not None and self.qsize() >= self.coalesce_high_water:
+            pending = self._pending_by_key.get(key)
+            if pending is not None:
+                pending.item = item
+                self.coalesced += 1
+                return True
+
+        entry = _QueueEntry(item, key, time.monotonic())
+        if not self.full():
+            self.put_nowait(entry)
+            return True
+
+        if self.policy == DROP_NEWEST:
+            self.dropped += 1
+            return False
+        if self.policy in (DROP_OLDEST, COALESCE_LATEST_BOOK):
+            self._evict_oldest()
+            self.put_nowait(entry)
+            return True
+
+        # BLOCK: wait for room, but never longer than block_timeout
+        self.blocked += 1
+        try:
+            await asyncio.wait_for(self.put(entry), timeout=self.block_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logging.warning(f"Queue '{self.name}' stayed full for {self.block_timeout}s. Dropping item.")
+            return False
+
+    # Metrics ----------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cumulative counters plus the queue latency since the previous call.
+
+        The latency window is reset on every call, so healthz reports per-interval values.
+        """
+        count = self._latency_count
+        stats = {
+            "policy": self.policy,
+            "size": self.qsize(),
+            "maxsize": self.maxsize,
+            "high_watermark": self.high_watermark,
+            "offered": self.offered,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "blocked": self.blocked,
+            "latency_avg_ms": self._latency_total / count * 1000 if count else 0.0,
+            "latency_max_ms": self._latency_max * 1000,
+        }
+        oldest = self._queue[0].enqueued_at if self._queue else None
+        stats["oldest_age_ms"] = (time.monotonic() - oldest) * 1000 if oldest is not None else 0.0
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self.high_watermark = self.qsize()
+        return stats
+
+
+async def offer(queue: asyncio.Queue, item: Any, key: Hashable | None = None) -> bool:
+    """Offers *item* to a BackpressureQueue, or puts it on a plain asyncio.Queue."""
+    if isinstance(queue, BackpressureQueue):
+        return await queue.offer(item, key=key)
+    await queue.put(item)
+    return True
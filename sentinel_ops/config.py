@@ -27,6 +27,20 @@ WS_RECONNECT_BACKOFF = [1, 2, 5, 10]  # Seconds to wait before WebSocket reconne
 WRITER_BATCH_SIZE_POINTS = 5000       # Max points to batch before writing to InfluxDB
 WRITER_FLUSH_INTERVAL_MS = 100      # Max time to wait before flushing batch to InfluxDB
 
+# Collector queue backpressure (policies are defined in sentinel_ops/backpressure.py)
+QUEUE_MAXSIZE = 10000                 # Max items per collector -> writer queue
+TRADE_QUEUE_POLICY = "block"          # Trades wait for room, up to QUEUE_BLOCK_TIMEOUT_S, then the new trade is dropped
+BOOK_QUEUE_POLICY = "coalesce_latest_book" # Near capacity, a newer snapshot replaces the one still queued for the same target
+BOOK_QUEUE_COALESCE_HIGH_WATER = 8000 # Book snapshots are only coalesced once a queue holds this many items
+QUEUE_BLOCK_TIMEOUT_S = 0.5           # Longest a producer waits on a full "block" queue
+
+# Write-ahead spool for InfluxDB outages (see sentinel_ops/writers/spool.py)
+SPOOL_DIR = "./sentinel_spool"        # Batches that could not be written are appended here; None disables the spool
+SPOOL_SEGMENT_MAX_BYTES = 64 * 1024 * 1024     # Spool segment files are rotated at this size
+SPOOL_MAX_TOTAL_BYTES = 4 * 1024 * 1024 * 1024 # Disk cap for the spool; new batches are dropped while it is full
+SPOOL_FSYNC = False                   # fsync every spooled batch (survives power loss); rotated segments are always fsynced
+SPOOL_REPLAY_POINTS_PER_SEC = 50000   # Backlog replay rate once InfluxDB is back; live writes go direct and are not limited
+
 # Logging configuration
 LOG_FILE = "./sentinel.log"         # Path to the log file
 LOG_LEVEL = "INFO"                  # Default logging level (e.g., DEBUG, INFO, WARNING, ERROR)
@@ -43,4 +57,10 @@ HEALTH_CHECK_INTERVAL_SECONDS = 30
 # Targetted assets and exchanges
 TARGET_EXCHANGE = "coinbase"
 TARGET_SYMBOL_CCXT = "BTC/USD" # CCXT format
-TARGET_SYMBOL_INFLUX = "BTC-USD" # Format for InfluxDB tags/fields if different 
\ No newline at end of file
+TARGET_SYMBOL_INFLUX = "BTC-USD" # Format for InfluxDB tags/fields if different 
+
+# Collection targets: (exchange, CCXT symbol) pairs recorded by one Supervisor.
+# Symbols on the same exchange share one connection and the writer queues are shared by all targets.
+TARGETS = [
+    (TARGET_EXCHANGE, TARGET_SYMBOL_CCXT),
+]
@@ -16,11 +16,18 @@ from sentinel_ops import config
 # Logger setup is handled in supervisor.py, but run.py can also use it.
 logger = logging.getLogger("sentinel.run")
 
+def parse_target(value: str) -> tuple[str, str]:
+    """Parses an EXCHANGE:SYMBOL command line target, e.g. 'coinbase:BTC/USD'."""
+    exchange, sep, symbol = value.partition(":")
+    if not sep or not exchange or not symbol:
+        raise argparse.ArgumentTypeError(f"Expected EXCHANGE:SYMBOL, got '{value}'.")
+    return exchange.strip().lower(), symbol.strip()
+
 async def main(args):
     """Main function to initialize and run the Supervisor."""
     supervisor = None # Initialize to None for finally block
     try:
-        supervisor = Supervisor(is_raw_enabled=args.raw)
+        supervisor = Supervisor(is_raw_enabled=args.raw, targets=args.targets)
     except ValueError as e:
         logger.critical(f"Failed to initialize Supervisor: {e}. Ensure INFLUXDB_TOKEN_LOCAL is set.")
         return # Exit if supervisor cannot be initialized
@@ -79,6 +86,10 @@ if __name__ == "__main__":
     group.add_argument("--dry-run", action="store_true", help="Run for a short duration (30s) and print logs.")
     group.add_argument("--live", action="store_true", help="Run continuously for the configured duration (e.g., 48h).")
     parser.add_argument("--raw", action="store_true", help="Enable collection and writing of raw top-N order book data to a separate bucket.")
+    parser.add_argument(
+        "--target", dest="targets", action="append", type=parse_target, metavar="EXCHANGE:SYMBOL",
+        help="Record this exchange/symbol pair, e.g. coinbase:ETH/USD. Repeat for several; defaults to config.TARGETS."
+    )
 
     args = parser.parse_args()
 
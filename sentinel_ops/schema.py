@@ -60,8 +60,47 @@ def build_trade_lp(exchange: str, symbol: str, side: str, size: float, price: fl
 #     }
 # }
 
+from functools import lru_cache
+
+import numpy as np
+
 from sentinel_ops import config # For binning constants
-import math # For rounding
+
+
+@lru_cache(maxsize=256)
+def _book_lp_prefixes(exchange: str, safe_symbol: str, max_bins: int) -> Tuple[str, ...]:
+    """
+    Measurement and tag set for every bin of one (exchange, symbol), up to the first field.
+
+    Bins run from -max_bins to +max_bins: negative offsets are 'bid', positive
+    are 'ask' and bin 0 is the neutral 'mid_bin' at the center of the book.
+    """
+    prefixes = []
+    for bps_offset_idx in range(-max_bins, max_bins + 1):
+        if bps_offset_idx < 0:
+            side = "bid"
+        elif bps_offset_idx > 0:
+            side = "ask"
+        else:
+            side = "mid_bin"
+        prefixes.append(
+            f"order_book,exchange={exchange},symbol={safe_symbol},side={side},bps_offset_idx={bps_offset_idx} total_qty="
+        )
+    return tuple(prefixes)
+
+
+def _levels_array(levels) -> np.ndarray | None:
+    """[[price, amount, ...], ...] as a float64 (N, 2+) array, or None if it has no usable levels."""
+    if levels is None or len(levels) == 0:
+        return None
+    try:
+        arr = np.asarray(levels, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        return None
+    return arr
+
 
 def build_book_lp(
     exchange: str, 
@@ -75,97 +114,50 @@ def build_book_lp(
     Builds InfluxDB Line Protocol strings for an order book snapshot, binned by basis points (bps) from mid-price.
     Generates a fixed number of points based on config.ORDER_BOOK_MAX_BINS_PER_SIDE.
 
+    Each level goes to bin int(round((price - mid) / mid * 1e4 / ORDER_BOOK_BIN_BPS)), clamped
+    to +/- ORDER_BOOK_MAX_BINS_PER_SIDE, so far-away liquidity accumulates in the outermost bins.
+    The offsets of a whole side are computed with NumPy and summed per bin with np.bincount;
+    the tag part of every line is built once per (exchange, symbol).
+
     Args:
         exchange: Name of the exchange.
         symbol: Trading symbol (e.g., 'BTC-USD').
-        bids: Raw list of [price, amount] for bids, sorted best (highest price) first.
-        asks: Raw list of [price, amount] for asks, sorted best (lowest price) first.
+        bids: Raw list (or array) of [price, amount] for bids, sorted best (highest price) first.
+        asks: Raw list (or array) of [price, amount] for asks, sorted best (lowest price) first.
         timestamp_ns: Timestamp of the snapshot in nanoseconds.
         sequence: Optional sequence number of this order book state.
 
     Returns:
         A list of strings formatted for InfluxDB Line Protocol for binned book data.
-        Example: order_book,exchange=cb,symbol=BTC-USD,side=bid,bin_bps_offset=-1 total_qty=1.23 1678886400000000000
+        Example: order_book,exchange=cb,symbol=BTC-USD,side=bid,bps_offset_idx=-1 total_qty=1.23 1678886400000000000
     """
-    lines = []
-    safe_symbol = symbol.replace("/", "-")
-
-    if not bids or not asks or not bids[0] or not asks[0]:
-        # logging.warning(f"[{exchange}-{safe_symbol}] Insufficient data for binned order book: bids or asks empty or invalid.")
+    bid_levels = _levels_array(bids)
+    ask_levels = _levels_array(asks)
+    if bid_levels is None or ask_levels is None:
+        # logging.warning(f"[{exchange}-{symbol}] Insufficient data for binned order book: bids or asks empty or invalid.")
         return [] # Cannot calculate mid-price or meaningful book
 
-    mid_price = (bids[0][0] + asks[0][0]) / 2.0
+    mid_price = (float(bid_levels[0, 0]) + float(ask_levels[0, 0])) / 2.0
     if mid_price == 0: # Avoid division by zero
-        # logging.warning(f"[{exchange}-{safe_symbol}] Mid price is zero, cannot bin order book.")
+        # logging.warning(f"[{exchange}-{symbol}] Mid price is zero, cannot bin order book.")
         return []
 
-    # Initialize bins: keys are bps offsets from -MAX_BINS to +MAX_BINS (relative to BIN_BPS)
-    # e.g., if MAX_BINS_PER_SIDE = 5, bins from -5 to 5.
-    # Bin 0 represents quotes closest to mid-price within +/- (BIN_BPS/2).
-    num_bins_total = config.ORDER_BOOK_MAX_BINS_PER_SIDE * 2 + 1 # e.g., 5 for bids, 5 for asks, 1 for zero-offset
-    # bins will store total quantity for each bps_offset bin
-    # We will create MAX_BINS_PER_SIDE on bid side (negative offsets) and MAX_BINS_PER_SIDE on ask side (positive offsets)
-    # Bin 0 represents the very center (e.g. -2.5bps to +2.5bps if BIN_BPS is 5)
-    # Let's use MAX_BINS_PER_SIDE for each side, so -5 to -1 for bids, 1 to 5 for asks, bin 0 for center.
-    
-    # bins dict: key is integer bps_offset_index, value is aggregated quantity.
-    # bps_offset_index ranges from -config.ORDER_BOOK_MAX_BINS_PER_SIDE to +config.ORDER_BOOK_MAX_BINS_PER_SIDE.
-    binned_quantities = {i: 0.0 for i in range(-config.ORDER_BOOK_MAX_BINS_PER_SIDE, config.ORDER_BOOK_MAX_BINS_PER_SIDE + 1)}
-
-    # Process bids
-    for price, qty in bids:
-        if price <= 0: continue
-        # bps_offset = (price - mid_price) / mid_price * 10000 # Raw BPS offset
-        # bps_offset_index = math.floor(bps_offset / config.ORDER_BOOK_BIN_BPS) # Gist example used round
-        # Let's follow the gist's rounding logic: int(round((price - mid) / mid * 1e4 / BIN_BPS))
-        bps_offset_index = int(round((price - mid_price) / mid_price * 10000 / config.ORDER_BOOK_BIN_BPS))
-        
-        # Clamp to the defined bin range
-        if bps_offset_index < -config.ORDER_BOOK_MAX_BINS_PER_SIDE:
-            bps_offset_index = -config.ORDER_BOOK_MAX_BINS_PER_SIDE
-        elif bps_offset_index > config.ORDER_BOOK_MAX_BINS_PER_SIDE: # This case mainly for asks, but good to be robust
-            bps_offset_index = config.ORDER_BOOK_MAX_BINS_PER_SIDE
-        
-        if -config.ORDER_BOOK_MAX_BINS_PER_SIDE <= bps_offset_index <= config.ORDER_BOOK_MAX_BINS_PER_SIDE:
-            binned_quantities[bps_offset_index] += qty
-
-    # Process asks
-    for price, qty in asks:
-        if price <= 0: continue
-        bps_offset_index = int(round((price - mid_price) / mid_price * 10000 / config.ORDER_BOOK_BIN_BPS))
-        
-        if bps_offset_index < -config.ORDER_BOOK_MAX_BINS_PER_SIDE:
-            bps_offset_index = -config.ORDER_BOOK_MAX_BINS_PER_SIDE
-        elif bps_offset_index > config.ORDER_BOOK_MAX_BINS_PER_SIDE:
-            bps_offset_index = config.ORDER_BOOK_MAX_BINS_PER_SIDE
-
-        if -config.ORDER_BOOK_MAX_BINS_PER_SIDE <= bps_offset_index <= config.ORDER_BOOK_MAX_BINS_PER_SIDE:
-            binned_quantities[bps_offset_index] += qty
-    
-    # Generate Line Protocol for each bin that has quantity or all defined bins
-    # The gist implies emitting all defined bins, even if quantity is 0, for constant cardinality.
-    for bps_offset_idx, total_qty in binned_quantities.items():
-        # Determine side based on offset. Bin 0 can be considered neutral or assigned based on convention.
-        # For simplicity, let's say negative is bid, positive is ask. Bin 0 can be split or reported as 'mid'.
-        # The gist example: side = "bid" if off_bp < 0 else "ask"
-        # This means bin 0 is 'ask'. If that's not desired, adjust.
-        # Let's adjust so bin 0 is 'mid', <0 is 'bid', >0 is 'ask' for clarity in tags.
-        if bps_offset_idx < 0:
-            side = "bid"
-        elif bps_offset_idx > 0:
-            side = "ask"
-        else: # bps_offset_idx == 0
-            side = "mid_bin" # A neutral bin at the center
-        
-        # Measurement: order_book_binned (or just order_book if only one type of book data per bucket)
-        lp = f"order_book,exchange={exchange},symbol={safe_symbol},side={side},bps_offset_idx={bps_offset_idx} " \
-             f"total_qty={total_qty:.8f},mid_price={mid_price:.2f}" # Added mid_price, formatted to 2 decimal places
-        if sequence is not None:
-            lp += f",sequence={sequence}i" # Add sequence as an integer field
-        lp += f" {timestamp_ns}"
-        lines.append(lp)
-
-    return lines
+    max_bins = config.ORDER_BOOK_MAX_BINS_PER_SIDE
+    # Bids first, then asks, so each bin sums its quantities in the same order as a per-level loop
+    levels = np.concatenate((bid_levels[:, :2], ask_levels[:, :2]))
+    levels = levels[levels[:, 0] > 0]
+    # np.rint rounds half to even, like round()
+    offsets = np.rint((levels[:, 0] - mid_price) / mid_price * 10000 / config.ORDER_BOOK_BIN_BPS)
+    bin_indices = np.clip(offsets, -max_bins, max_bins).astype(np.intp) + max_bins
+    binned_quantities = np.bincount(bin_indices, weights=levels[:, 1], minlength=2 * max_bins + 1)
+
+    # Every bin is emitted, even when empty, for constant cardinality
+    suffix = f",mid_price={mid_price:.2f}"
+    if sequence is not None:
+        suffix += f",sequence={sequence}i" # Add sequence as an integer field
+    suffix += f" {timestamp_ns}"
+    prefixes = _book_lp_prefixes(exchange, symbol.replace("/", "-"), max_bins)
+    return [f"{prefix}{total_qty:.8f}{suffix}" for prefix, total_qty in zip(prefixes, binned_quantities.tolist())]
 
 
 def build_raw_book_lp(
@@ -4,9 +4,11 @@ import logging
 import os
 import signal # For graceful shutdown
 import logging.handlers # For RotatingFileHandler
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple
 
-from sentinel_ops.collectors.coinbase import stream_data_to_queues
+from sentinel_ops.backpressure import BackpressureQueue
+from sentinel_ops.collectors.coinbase import TargetStats, stream_symbols_to_queues
 from sentinel_ops.writers.influx_writer import InfluxWriter
 from sentinel.core.data.data_source import Data as TradeSuiteData # Alias to avoid confusion
 from sentinel_ops import config
@@ -40,20 +42,28 @@ root_logger.addHandler(console_handler)
 logger = logging.getLogger(__name__) # Supervisor specific logger
 
 class Supervisor:
-    def __init__(self, is_raw_enabled: bool = False, data_source: Optional[TradeSuiteData] = None): # Accept data_source
+    def __init__(
+        self,
+        is_raw_enabled: bool = False,
+        data_source: Optional[TradeSuiteData] = None, # Accept data_source
+        targets: Optional[List[Tuple[str, str]]] = None, # (exchange, symbol) pairs, defaults to config.TARGETS
+    ):
         self.is_raw_enabled = is_raw_enabled
-        self.trade_queue = asyncio.Queue(maxsize=10000)
-        self.order_book_queue = asyncio.Queue(maxsize=10000)
-        self.raw_order_book_queue = asyncio.Queue(maxsize=10000) if self.is_raw_enabled else None
+        # Duplicates are dropped, order is kept. All targets share the writer queues below.
+        self.targets: List[Tuple[str, str]] = list(dict.fromkeys(
+            (exchange, symbol) for exchange, symbol in (targets or config.TARGETS)
+        ))
+        if not self.targets:
+            raise ValueError("Supervisor needs at least one (exchange, symbol) target.")
+        self.trade_queue = self._make_queue("trades", config.TRADE_QUEUE_POLICY)
+        self.order_book_queue = self._make_queue("binned_books", config.BOOK_QUEUE_POLICY)
+        self.raw_order_book_queue = self._make_queue("raw_books", config.BOOK_QUEUE_POLICY) if self.is_raw_enabled else None
         self.stop_event = asyncio.Event()
         self.tasks = []
 
-        # For healthz
-        self.dropped_trades_count = 0
-        self.dropped_binned_books_count = 0
-        self.dropped_raw_books_count = 0
-        # The collector will have its own counters, this is illustrative
-        # The actual counters should be accessed from collector or passed via a shared mechanism if needed here
+        # For healthz: per-queue drop/coalesce counters and latency live on the queues themselves;
+        # per-target throughput and drop counters are updated in place by the collectors
+        self.target_stats: Dict[Tuple[str, str], TargetStats] = {target: TargetStats() for target in self.targets}
 
         # Initialize InfluxWriter
         influx_token = os.getenv("INFLUXDB_TOKEN_LOCAL")
@@ -74,18 +84,37 @@ class Supervisor:
         else:
             logger.info("No DataSource provided. Supervisor is creating its own instance for standalone operation.")
             # No emitter needed for sentinel's use case. Influx client is managed by InfluxWriter.
-            self.data_source = TradeSuiteData(influx=None, emitter=None, exchanges=[config.TARGET_EXCHANGE], force_public=True)
+            self.data_source = TradeSuiteData(influx=None, emitter=None, exchanges=self.exchanges, force_public=True)
         
         self._is_standalone = data_source is None
 
-    async def _run_with_restart(self, coro_func, *args, name="UnnamedTask"):
+    @staticmethod
+    def _make_queue(name: str, policy: str) -> BackpressureQueue:
+        return BackpressureQueue(
+            maxsize=config.QUEUE_MAXSIZE, policy=policy, name=name, block_timeout=config.QUEUE_BLOCK_TIMEOUT_S,
+            coalesce_high_water=config.BOOK_QUEUE_COALESCE_HIGH_WATER
+        )
+
+    @property
+    def queues(self) -> List[BackpressureQueue]:
+        return [q for q in (self.trade_queue, self.order_book_queue, self.raw_order_book_queue) if q is not None]
+
+    @property
+    def exchanges(self) -> List[str]:
+        """Exchanges with at least one target, in target order."""
+        return list(dict.fromkeys(exchange for exchange, _ in self.targets))
+
+    def symbols_for(self, exchange: str) -> List[str]:
+        return [symbol for target_exchange, symbol in self.targets if target_exchange == exchange]
+
+    async def _run_with_restart(self, coro_func, *args, name="UnnamedTask", **kwargs):
         """Runs a coroutine and restarts it with exponential backoff on failure."""
         backoff_times = config.WS_RECONNECT_BACKOFF
         attempt = 0
         while not self.stop_event.is_set():
             try:
                 logger.info(f"Starting task: {name}")
-                await coro_func(*args)
+                await coro_func(*args, **kwargs)
                 # If the coro_func returns normally, it might mean it completed (e.g. stop_event was set internally)
                 # or an unexpected exit. If it's not due to stop_event, we might want to restart.
                 if self.stop_event.is_set():
@@ -124,16 +153,8 @@ class Supervisor:
                 # Ideally, collector exposes these or healthz is part of the collector, 
                 # or metrics are pushed to a central place (like Prometheus later).
                 # For now, logging queue sizes is a good start.
-                trade_q_size = self.trade_queue.qsize()
-                binned_book_q_size = self.order_book_queue.qsize()
-                raw_book_q_size = self.raw_order_book_queue.qsize() if self.raw_order_book_queue else 'N/A'
-                
-                logger.info(
-                    f"[Healthz] Queues - Trades: {trade_q_size}, BinnedBooks: {binned_book_q_size}, RawBooks: {raw_book_q_size}"
-                    # f", Dropped - Trades: {self.dropped_trades_count}, Binned: {self.dropped_binned_books_count}, Raw: {self.dropped_raw_books_count}"
-                )
-                # Resetting supervisor-level counters would require collector to update them.
-                # For simplicity, we'll rely on collector logs for drops for now.
+                for line in self._queue_report() + self._spool_report() + self._throughput_report():
+                    logger.info(line)
                 
                 await asyncio.sleep(interval_seconds)
             except asyncio.CancelledError:
@@ -145,6 +166,59 @@ class Supervisor:
                 await asyncio.sleep(interval_seconds) 
         logger.info("Healthz monitor stopped.")
 
+    def _queue_report(self) -> List[str]:
+        """One healthz line per writer queue: fill, policy counters and queue latency since the last report."""
+        lines = []
+        for q in self.queues:
+            stats = q.stats()
+            lines.append(
+                f"[Healthz] Queue {q.name} ({stats['policy']}) - Size: {stats['size']}/{stats['maxsize']} "
+                f"(peak {stats['high_watermark']}), Delivered: {stats['delivered']}, Dropped: {stats['dropped']}, "
+                f"Coalesced: {stats['coalesced']}, Blocked: {stats['blocked']}, "
+                f"Latency avg/max: {stats['latency_avg_ms']:.1f}/{stats['latency_max_ms']:.1f}ms, "
+                f"Oldest: {stats['oldest_age_ms']:.0f}ms"
+            )
+            if stats['maxsize'] and stats['high_watermark'] >= stats['maxsize']:
+                logger.warning(f"[Healthz] Queue {q.name} reached its capacity of {stats['maxsize']} since the last report.")
+        return lines
+
+    def _spool_report(self) -> List[str]:
+        """One healthz line for the InfluxWriter's write-ahead spool, if it has one."""
+        spool = self.influx_writer.spool if self.influx_writer else None
+        if spool is None:
+            return []
+        stats = spool.stats()
+        return [
+            f"[Healthz] Spool - Segments: {stats['segments']}, Pending: {stats['pending_bytes'] / 1e6:.1f}MB, "
+            f"Appended: {stats['appended']}, Replayed: {stats['replayed']}, Rejected: {stats['rejected']}, "
+            f"Corrupt: {stats['corrupt']}, Dead-lettered: {stats['dead_lettered']}"
+        ]
+
+    def _throughput_report(self, now: float | None = None) -> List[str]:
+        """One healthz line per target with rates since the previous report, plus a total."""
+        now = time.monotonic() if now is None else now
+        lines = []
+        totals = [0.0, 0.0, 0.0]
+        idle = 0
+        for (exchange, symbol), stats in self.target_stats.items():
+            rates = stats.rates(now)
+            totals[0] += rates["trades_per_s"]
+            totals[1] += rates["books_per_s"]
+            totals[2] += rates["lines_per_s"]
+            last_seen = f"{now - stats.last_event_time:.1f}s ago" if stats.last_event_time is not None else "never"
+            if stats.last_event_time is None or rates["trades_per_s"] == rates["books_per_s"] == 0:
+                idle += 1
+            lines.append(
+                f"[Healthz] {exchange} {symbol} - Trades/s: {rates['trades_per_s']:.2f}, Books/s: {rates['books_per_s']:.2f}, "
+                f"Lines/s: {rates['lines_per_s']:.1f}, Dropped (trades/binned/raw): "
+                f"{stats.dropped_trades}/{stats.dropped_binned_books}/{stats.dropped_raw_books}, Last event: {last_seen}"
+            )
+        lines.append(
+            f"[Healthz] Total over {len(self.target_stats)} target(s) - Trades/s: {totals[0]:.2f}, Books/s: {totals[1]:.2f}, "
+            f"Lines/s: {totals[2]:.1f}, Idle targets: {idle}"
+        )
+        return lines
+
     async def start(self, duration_seconds: float | None = None):
         """Starts the collector and writer tasks and manages them."""
         logger.info("Supervisor starting...")
@@ -155,28 +229,38 @@ class Supervisor:
         # If running standalone, we need to load the exchanges ourselves.
         if self._is_standalone:
             await self.data_source.load_exchanges() 
-            
-        if config.TARGET_EXCHANGE not in self.data_source.exchange_list:
-            logger.critical(f"Target exchange '{config.TARGET_EXCHANGE}' not loaded in DataSource. Aborting.")
+        elif any(exchange not in self.data_source.exchange_list for exchange in self.exchanges):
+            # A shared DataSource may not have every target exchange loaded yet
+            await self.data_source.load_exchanges([exchange for exchange in self.exchanges if exchange not in self.data_source.exchange_list])
+
+        missing = [exchange for exchange in self.exchanges if exchange not in self.data_source.exchange_list]
+        for exchange in missing:
+            logger.critical(f"Target exchange '{exchange}' not loaded in DataSource. Skipping {', '.join(self.symbols_for(exchange))}.")
+        if len(missing) == len(self.exchanges):
+            logger.critical("None of the target exchanges are loaded. Aborting.")
             return
 
-        # Collector task
-        collector_task = asyncio.create_task(
-            self._run_with_restart(
-                stream_data_to_queues,
-                self.data_source,
-                config.TARGET_SYMBOL_CCXT,
-                self.stop_event,
-                self.trade_queue,
-                self.order_book_queue,
-                self.is_raw_enabled, # Pass is_raw_enabled
-                self.raw_order_book_queue, # Pass raw queue
-                config.TARGET_EXCHANGE,
-                config.CADENCE_MS,
-                name="DataCollector"
+        # One collector task per exchange; its symbols are multiplexed over the exchange's connection
+        for exchange in self.exchanges:
+            if exchange in missing:
+                continue
+            collector_task = asyncio.create_task(
+                self._run_with_restart(
+                    stream_symbols_to_queues,
+                    self.data_source,
+                    exchange,
+                    self.symbols_for(exchange),
+                    self.stop_event,
+                    self.trade_queue,
+                    self.order_book_queue,
+                    self.is_raw_enabled, # Pass is_raw_enabled
+                    self.raw_order_book_queue, # Pass raw queue
+                    config.CADENCE_MS,
+                    self.target_stats,
+                    name=f"DataCollector[{exchange}]"
+                )
             )
-        )
-        self.tasks.append(collector_task)
+            self.tasks.append(collector_task)
 
         # Writer task for trades
         trade_writer_task = asyncio.create_task(
@@ -216,6 +300,17 @@ class Supervisor:
             self.tasks.append(raw_ob_writer_task)
             logger.info("Raw order book writer task created.")
 
+        # Replays batches spooled while InfluxDB was unavailable
+        if self.influx_writer.spool is not None:
+            spool_task = asyncio.create_task(
+                self._run_with_restart(
+                    self.influx_writer.run_spool_replay,
+                    self.stop_event,
+                    name="SpoolReplay"
+                )
+            )
+            self.tasks.append(spool_task)
+
         # Healthz task
         healthz_task = asyncio.create_task(self._healthz())
         self.tasks.append(healthz_task)
@@ -0,0 +1,103 @@
+import asyncio
+import unittest
+
+from sentinel_ops.backpressure import (
+    BLOCK,
+    COALESCE_LATEST_BOOK,
+    DROP_NEWEST,
+    DROP_OLDEST,
+    BackpressureQueue,
+    offer,
+)
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+        q.task_done()
+    return items
+
+
+class TestBackpressureQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_drop_newest_keeps_what_is_queued(self):
+        q = BackpressureQueue(maxsize=2, policy=DROP_NEWEST)
+        results = [await q.offer(i) for i in range(4)]
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(_drain(q), [0, 1])
+        self.assertEqual((q.dropped, q.delivered), (2, 2))
+
+    async def test_drop_oldest_evicts_to_make_room(self):
+        q = BackpressureQueue(maxsize=2, policy=DROP_OLDEST)
+        for i in range(4):
+            self.assertTrue(await q.offer(i))
+        self.assertEqual(_drain(q), [2, 3])
+        self.assertEqual(q.dropped, 2)
+        # Evicted items count as done, so join() does not wait for them
+        await asyncio.wait_for(q.join(), timeout=1)
+
+    async def test_block_waits_for_room_up_to_the_timeout(self):
+        q = BackpressureQueue(maxsize=1, policy=BLOCK, block_timeout=0.05)
+        await q.offer("a")
+        self.assertFalse(await q.offer("b")) # Nobody consumes: dropped after the timeout
+        self.assertEqual((q.blocked, q.dropped), (1, 1))
+
+        waiter = asyncio.create_task(q.offer("c"))
+        await asyncio.sleep(0)
+        self.assertEqual(await q.get(), "a")
+        self.assertTrue(await waiter)
+        self.assertEqual(await q.get(), "c")
+
+    async def test_coalesce_replaces_the_pending_snapshot_for_the_same_key(self):
+        q = BackpressureQueue(maxsize=3, policy=COALESCE_LATEST_BOOK, coalesce_high_water=2)
+        await q.offer("btc-1", key=("cb", "BTC/USD"))
+        await q.offer("eth-1", key=("cb", "ETH/USD"))
+        await q.offer("btc-2", key=("cb", "BTC/USD"))
+        self.assertEqual(q.qsize(), 2)
+        self.assertEqual(q.coalesced, 1)
+        self.assertEqual(await q.get(), "btc-2") # Latest snapshot, in the original slot
+
+        # Once taken, the next snapshot for that key queues normally again
+        await q.offer("btc-3", key=("cb", "BTC/USD"))
+        await q.offer("sol-1", key=("cb", "SOL/USD"))
+        await q.offer("ada-1", key=("cb", "ADA/USD")) # Full: the oldest slot is evicted
+        self.assertEqual(_drain(q), ["btc-3", "sol-1", "ada-1"])
+        self.assertEqual(q.dropped, 1)
+
+    async def test_coalesce_keeps_every_snapshot_below_the_high_water_mark(self):
+        q = BackpressureQueue(maxsize=100, policy=COALESCE_LATEST_BOOK, coalesce_high_water=80)
+        for i in range(60):
+            await q.offer(f"btc-{i}", key=("cb", "BTC/USD"))
+        self.assertEqual((q.qsize(), q.coalesced), (60, 0))
+
+        for i in range(60, 90):
+            await q.offer(f"btc-{i}", key=("cb", "BTC/USD"))
+        # From 80 queued on, the newest pending snapshot is replaced instead of adding a slot
+        self.assertEqual((q.qsize(), q.coalesced, q.dropped), (80, 10, 0))
+        items = _drain(q)
+        self.assertEqual(items[:79], [f"btc-{i}" for i in range(79)])
+        self.assertEqual(items[-1], "btc-89")
+
+    async def test_stats_report_latency_since_the_previous_call(self):
+        q = BackpressureQueue(maxsize=10, policy=DROP_NEWEST, name="books")
+        await q.offer("x")
+        await asyncio.sleep(0.02)
+        await q.get()
+        stats = q.stats()
+        self.assertEqual((stats["offered"], stats["delivered"], stats["size"]), (1, 1, 0))
+        self.assertGreaterEqual(stats["latency_max_ms"], 15.0)
+        self.assertEqual(q.stats()["latency_max_ms"], 0.0)
+
+    async def test_offer_helper_accepts_plain_queues(self):
+        plain = asyncio.Queue()
+        self.assertTrue(await offer(plain, "x", key=("cb", "BTC/USD")))
+        self.assertEqual(plain.get_nowait(), "x")
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            BackpressureQueue(maxsize=1, policy="spill")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+
+from sentinel.core.data.streamer import Streamer
+from sentinel_ops.collectors.coinbase import TargetStats, stream_symbols_to_queues
+
+
+class FakeMultiSymbolExchange:
+    """Replays scripted trade batches and books through the *ForSymbols watch calls."""
+
+    has = {"watchTradesForSymbols": True, "watchOrderBookForSymbols": True}
+    rateLimit = 0
+
+    def __init__(self, trade_batches, books, stop_event):
+        self.trade_batches = list(trade_batches)
+        self.books = list(books)
+        self.stop_event = stop_event
+        self.symbol_requests = []
+
+    async def _next(self, items, symbols):
+        self.symbol_requests.append(tuple(symbols))
+        if not items:
+            # Stop once both streams have replayed everything
+            if not self.trade_batches and not self.books:
+                self.stop_event.set()
+            await asyncio.sleep(0.001)
+            return None
+        await asyncio.sleep(0)
+        return items.pop(0)
+
+    async def watchTradesForSymbols(self, symbols):
+        return await self._next(self.trade_batches, symbols)
+
+    async def watchOrderBookForSymbols(self, symbols):
+        return await self._next(self.books, symbols)
+
+
+def _trade(symbol, trade_id):
+    return {"symbol": symbol, "id": trade_id, "timestamp": 1_700_000_000_000, "side": "buy", "price": 100.0, "amount": 0.5}
+
+
+def _book(symbol, nonce):
+    return {"symbol": symbol, "timestamp": 1_700_000_000_000, "nonce": nonce, "bids": [[99.0, 1.0]], "asks": [[101.0, 2.0]]}
+
+
+class TestMultiSymbolCollector(unittest.IsolatedAsyncioTestCase):
+
+    async def test_symbols_share_one_watch_loop_and_keep_separate_stats(self):
+        stop_event = asyncio.Event()
+        exchange = FakeMultiSymbolExchange(
+            trade_batches=[[_trade("BTC/USD", 1), _trade("ETH/USD", 2)], [_trade("BTC/USD", 3)]],
+            books=[_book("BTC/USD", 1), _book("ETH/USD", 7), _book("BTC/USD", 2)],
+            stop_event=stop_event,
+        )
+        streamer = Streamer(emitter=None, aggregator=None, influx=None)
+        streamer.set_exchange_list({"fakeex": exchange})
+        trade_queue, order_book_queue, raw_queue = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
+        target_stats = {}
+
+        await asyncio.wait_for(
+            stream_symbols_to_queues(
+                streamer, "fakeex", ["BTC/USD", "ETH/USD"], stop_event,
+                trade_queue, order_book_queue, True, raw_queue,
+                order_book_cadence_ms=0, target_stats=target_stats,
+            ),
+            timeout=5,
+        )
+
+        self.assertEqual(set(exchange.symbol_requests), {("BTC/USD", "ETH/USD")})
+        btc, eth = target_stats[("fakeex", "BTC/USD")], target_stats[("fakeex", "ETH/USD")]
+        self.assertEqual((btc.trades, btc.books), (2, 2))
+        self.assertEqual((eth.trades, eth.books), (1, 1))
+        self.assertEqual(trade_queue.qsize(), 3)
+        self.assertEqual(order_book_queue.qsize(), 3)
+        self.assertEqual(raw_queue.qsize(), 3)
+        self.assertIn("symbol=ETH-USD", order_book_queue._queue[1][0])
+        # Two trade lines plus two binned and two raw book line batches
+        self.assertEqual(btc.lines, 2 + 2 * len(order_book_queue._queue[0]) + 2 * len(raw_queue._queue[0]))
+
+    async def test_order_book_cadence_is_applied_per_symbol(self):
+        stop_event = asyncio.Event()
+        exchange = FakeMultiSymbolExchange(
+            trade_batches=[],
+            books=[_book("BTC/USD", 1), _book("ETH/USD", 1), _book("BTC/USD", 2), _book("ETH/USD", 2)],
+            stop_event=stop_event,
+        )
+        streamer = Streamer(emitter=None, aggregator=None, influx=None)
+        streamer.set_exchange_list({"fakeex": exchange})
+        order_book_queue = asyncio.Queue()
+        target_stats = {}
+
+        await asyncio.wait_for(
+            stream_symbols_to_queues(
+                streamer, "fakeex", ["BTC/USD", "ETH/USD"], stop_event,
+                asyncio.Queue(), order_book_queue, False,
+                order_book_cadence_ms=60_000, target_stats=target_stats,
+            ),
+            timeout=5,
+        )
+
+        # Only the first book of each symbol falls outside the 60s cadence window
+        self.assertEqual(order_book_queue.qsize(), 2)
+        self.assertEqual([stats.books for stats in target_stats.values()], [1, 1])
+
+
+class TestTargetStats(unittest.TestCase):
+
+    def test_rates_cover_the_time_since_the_previous_report(self):
+        stats = TargetStats()
+        self.assertEqual(stats.rates(now=10.0)["trades_per_s"], 0.0)
+        stats.trades, stats.books, stats.lines = 20, 5, 60
+        self.assertEqual(stats.rates(now=20.0), {"trades_per_s": 2.0, "books_per_s": 0.5, "lines_per_s": 6.0})
+        stats.trades += 10
+        self.assertEqual(stats.rates(now=25.0)["trades_per_s"], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
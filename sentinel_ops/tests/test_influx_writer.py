@@ -0,0 +1,239 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sentinel_ops import config
+from sentinel_ops.writers.influx_writer import InfluxWriter
+
+
+class _InfluxStandIn(BaseHTTPRequestHandler):
+    """Answers /ping and /api/v2/write like InfluxDB and records the written lines.
+
+    Writes are answered with the server's `status`, or 400 for a bucket in `rejected_buckets`;
+    only accepted (204) lines are recorded.
+    """
+
+    def do_GET(self):
+        self.send_response(204)
+        self.end_headers()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        bucket = parse_qs(urlparse(self.path).query).get("bucket", [""])[0]
+        with self.server.lock:
+            status = 400 if bucket in self.server.rejected_buckets else self.server.status
+            self.server.requests += 1
+            if status == 204:
+                self.server.lines.extend(line for line in body.decode().split("\n") if line)
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+async def _previous_run_queue_consumer(writer, data_queue, bucket_name, stop_event):
+    """The per-item consumer this module used before bulk draining, kept for the benchmark."""
+    local_batch = []
+    last_flush_time = asyncio.get_event_loop().time()
+    while not stop_event.is_set():
+        try:
+            item = await asyncio.wait_for(data_queue.get(), timeout=0.05)
+            if isinstance(item, str):
+                local_batch.append(item)
+            elif isinstance(item, list):
+                local_batch.extend(item)
+            data_queue.task_done()
+        except asyncio.TimeoutError:
+            pass
+        current_time = asyncio.get_event_loop().time()
+        if local_batch and (len(local_batch) >= config.WRITER_BATCH_SIZE_POINTS or
+                            (current_time - last_flush_time) * 1000 >= config.WRITER_FLUSH_INTERVAL_MS):
+            await writer.write_batch(bucket_name, list(local_batch))
+            local_batch.clear()
+            last_flush_time = current_time
+    if local_batch:
+        await writer.write_batch(bucket_name, list(local_batch))
+
+
+def _trade_lp(i):
+    return f"trades,exchange=coinbase,symbol=BTC-USD,side=buy trade_id=\"{i}\",price=50000.{i % 10},size=0.01 {1678886400000000000 + i}"
+
+
+class TestInfluxWriterConsumer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _InfluxStandIn)
+        self.server.lock = threading.Lock()
+        self.server.lines = []
+        self.server.requests = 0
+        self.server.status = 204
+        self.server.rejected_buckets = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self._spool_dir = tempfile.TemporaryDirectory()
+        self.writer = InfluxWriter(
+            f"http://127.0.0.1:{self.server.server_port}", "test-token", "test-org", spool_dir=self._spool_dir.name
+        )
+
+    def tearDown(self):
+        self.writer.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self._spool_dir.cleanup()
+
+    async def _wait_for_lines(self, count, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.server.lock:
+                if len(self.server.lines) >= count:
+                    return
+            await asyncio.sleep(0.005)
+        self.fail(f"Stand-in received {len(self.server.lines)} of {count} lines")
+
+    async def _run(self, consumer, items, points):
+        queue = asyncio.Queue()
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(consumer(queue, config.INFLUX_BUCKET_TR, stop_event))
+        start = time.perf_counter()
+        for item in items:
+            queue.put_nowait(item)
+        await self._wait_for_lines(points)
+        elapsed = time.perf_counter() - start
+        stop_event.set()
+        await task
+        return elapsed
+
+    async def test_queued_items_reach_the_server_as_newline_separated_payloads(self):
+        book = [f"order_book,exchange=cb,symbol=BTC-USD,side=bid,bps_offset_idx={i} total_qty=1.0 1" for i in range(-5, 6)]
+        items = [_trade_lp(i) for i in range(20)] + [book, [], _trade_lp(20)]
+
+        await self._run(self.writer.run_queue_consumer, items, 32)
+
+        self.assertEqual(sorted(self.server.lines), sorted([_trade_lp(i) for i in range(21)] + book))
+        # Everything was queued before the first flush, so it went out as one request
+        self.assertEqual(self.server.requests, 1)
+
+    async def test_batches_are_spooled_during_an_outage_and_replayed_in_order(self):
+        self.writer.write_retry_delay = 0
+        self.server.status = 503
+        batches = [[_trade_lp(i) for i in range(start, start + 5)] for start in range(0, 20, 5)]
+
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, batches[0])
+        self.assertEqual(self.server.requests, self.writer.write_retries)
+        # With a backlog on disk, later batches queue up behind it without hitting InfluxDB
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, "\n".join(batches[1]).encode())
+        self.assertEqual(self.server.requests, self.writer.write_retries)
+        self.assertEqual(self.writer.spool.stats()["appended"], 2)
+
+        stop_event = asyncio.Event()
+        replay = asyncio.create_task(self.writer.run_spool_replay(stop_event, points_per_second=1_000))
+        await asyncio.sleep(0.1) # Replay keeps failing while the outage lasts
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, batches[2])
+        self.server.status = 204
+        await self._wait_for_lines(15)
+        while self.writer.spool.pending:
+            await asyncio.sleep(0.01)
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, batches[3]) # Spool drained: written directly
+        stop_event.set()
+        await replay
+
+        self.assertEqual(self.server.lines, [line for batch in batches for line in batch])
+        self.assertEqual(self.writer.spool.stats()["replayed"], 3)
+
+    async def test_rejected_batches_are_dead_lettered_instead_of_blocking_others(self):
+        self.server.rejected_buckets.add("bad")
+        bad, good = [_trade_lp(i) for i in range(3)], [_trade_lp(i) for i in range(3, 6)]
+
+        # Live path: no retries, no spooling, and InfluxDB stays available for other buckets
+        await self.writer.write_batch("bad", bad)
+        self.assertEqual(self.server.requests, 1)
+        await self.writer.write_batch("good", good)
+        self.assertEqual(self.server.lines, good)
+        self.assertFalse(self.writer.spool.pending)
+
+        # Replay path: a rejected batch at the head of the spool is set aside, the rest goes through
+        self.writer.spool.append("bad", "\n".join(bad).encode())
+        self.writer.spool.append("good", "\n".join(good).encode())
+        stop_event = asyncio.Event()
+        replay = asyncio.create_task(self.writer.run_spool_replay(stop_event, points_per_second=1_000))
+        await self._wait_for_lines(6)
+        stop_event.set()
+        await replay
+
+        self.assertEqual(self.server.lines, good + good)
+        stats = self.writer.spool.stats()
+        self.assertEqual((stats["dead_lettered"], stats["replayed"]), (2, 2))
+        with open(os.path.join(self._spool_dir.name, "dead-letter.lp")) as f:
+            dead_letter = f.read()
+        self.assertEqual(dead_letter.count("# bucket=bad reason=status=400"), 2)
+        self.assertEqual(dead_letter.count(bad[0]), 2)
+
+    async def test_auth_failures_are_spooled_and_replayed_once_fixed(self):
+        self.server.status = 401 # e.g. a rotated token
+        batch = [_trade_lp(i) for i in range(5)]
+
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, batch)
+        self.assertEqual(self.server.requests, 1) # Not retried in place
+        self.assertTrue(self.writer.spool.pending)
+        self.assertEqual(self.writer.spool.stats()["dead_lettered"], 0)
+
+        stop_event = asyncio.Event()
+        replay = asyncio.create_task(self.writer.run_spool_replay(stop_event, points_per_second=1_000))
+        await asyncio.sleep(0.1) # Replay backs off while the token is still wrong
+        self.assertTrue(self.writer.spool.pending)
+        self.server.status = 204
+        await self._wait_for_lines(5)
+        while self.writer.spool.pending:
+            await asyncio.sleep(0.01)
+        stop_event.set()
+        await replay
+
+        self.assertEqual(self.server.lines, batch)
+        stats = self.writer.spool.stats()
+        self.assertEqual((stats["replayed"], stats["dead_lettered"]), (1, 0))
+        self.assertFalse(os.path.exists(os.path.join(self._spool_dir.name, "dead-letter.lp")))
+
+    async def test_live_batches_bypass_the_replay_rate_limit_once_influx_is_back(self):
+        self.writer.write_retry_delay = 0
+        self.server.status = 503
+        backlog = [[_trade_lp(i) for i in range(start, start + 5)] for start in (0, 5)]
+        for batch in backlog:
+            await self.writer.write_batch(config.INFLUX_BUCKET_TR, batch)
+        self.assertEqual(self.writer.spool.stats()["appended"], 2)
+
+        self.server.status = 204
+        stop_event = asyncio.Event()
+        # 1 point/s: after the first 5-point batch the replay waits 5s before the next one
+        replay = asyncio.create_task(self.writer.run_spool_replay(stop_event, points_per_second=1))
+        while not self.writer.spool.replayed:
+            await asyncio.sleep(0.01)
+        live = [_trade_lp(i) for i in range(100, 105)]
+        await self.writer.write_batch(config.INFLUX_BUCKET_TR, live)
+        stop_event.set()
+        await replay
+
+        self.assertEqual(self.server.lines, backlog[0] + live)
+        self.assertTrue(self.writer.spool.pending) # The second backlog batch is still waiting its turn
+
+    @unittest.skipUnless(os.environ.get("SENTINEL_BENCH"), "set SENTINEL_BENCH=1 to run benchmarks")
+    async def test_benchmark_consumer_points_per_second(self):
+        asyncio.get_running_loop().set_debug(False) # The test runner's debug loop dominates the per-item path
+        points = int(os.environ.get("SENTINEL_BENCH_POINTS", 200_000))
+        items = [_trade_lp(i) for i in range(points)]
+        previous = await self._run(
+            lambda q, b, e: _previous_run_queue_consumer(self.writer, q, b, e), items, points
+        )
+        with self.server.lock:
+            self.server.lines.clear()
+        bulk = await self._run(self.writer.run_queue_consumer, items, points)
+        print(f"\n{points} trade points  per-item consumer {points / previous:,.0f} pts/s | bulk consumer {points / bulk:,.0f} pts/s")
+        self.assertLess(bulk, previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
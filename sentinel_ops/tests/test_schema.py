@@ -1,7 +1,46 @@
+import os
+import random
+import time
 import unittest
+
+import numpy as np
+
 from sentinel_ops import schema
 from sentinel_ops import config # For accessing constants like RAW_BOOK_TOP_N for tests
 
+
+def _loop_build_book_lp(exchange, symbol, bids, asks, timestamp_ns, sequence=None):
+    """The previous per-level implementation of schema.build_book_lp, kept as the reference."""
+    if not bids or not asks or not bids[0] or not asks[0]:
+        return []
+    mid_price = (bids[0][0] + asks[0][0]) / 2.0
+    if mid_price == 0:
+        return []
+    max_bins = config.ORDER_BOOK_MAX_BINS_PER_SIDE
+    binned_quantities = {i: 0.0 for i in range(-max_bins, max_bins + 1)}
+    for price, qty in list(bids) + list(asks):
+        if price <= 0: continue
+        bps_offset_index = int(round((price - mid_price) / mid_price * 10000 / config.ORDER_BOOK_BIN_BPS))
+        bps_offset_index = max(-max_bins, min(max_bins, bps_offset_index))
+        binned_quantities[bps_offset_index] += qty
+    lines = []
+    for bps_offset_idx, total_qty in binned_quantities.items():
+        side = "bid" if bps_offset_idx < 0 else "ask" if bps_offset_idx > 0 else "mid_bin"
+        lp = f"order_book,exchange={exchange},symbol={symbol.replace('/', '-')},side={side},bps_offset_idx={bps_offset_idx} " \
+             f"total_qty={total_qty:.8f},mid_price={mid_price:.2f}"
+        if sequence is not None:
+            lp += f",sequence={sequence}i"
+        lp += f" {timestamp_ns}"
+        lines.append(lp)
+    return lines
+
+
+def _deep_book(rng, levels, mid=3000.0, tick=0.01):
+    bids = [(round(mid - tick * i, 2), round(rng.uniform(0.001, 5.0), 8)) for i in range(1, levels + 1)]
+    asks = [(round(mid + tick * i, 2), round(rng.uniform(0.001, 5.0), 8)) for i in range(1, levels + 1)]
+    return bids, asks
+
+
 class TestSchemaBuilders(unittest.TestCase):
 
     def test_build_trade_lp_example(self):
@@ -184,6 +223,41 @@ class TestSchemaBuilders(unittest.TestCase):
         self.assertTrue(found_bin_minus_2, "Bin for -2 bps offset was not found or incorrect.")
         self.assertTrue(found_summed_ask_bin, "Ask quantities were not handled correctly.")
 
+    def test_build_book_lp_matches_per_level_reference(self):
+        rng = random.Random(7)
+        cases = [_deep_book(rng, n, tick=tick) for n, tick in ((1, 0.01), (50, 0.5), (2000, 0.01), (500, 1.0))]
+        # Levels landing exactly on a half bin (round half to even), zero/negative prices and extra columns
+        cases.append(([(2998.5, 1.0), (2997.0, 2.0), (0.0, 9.0)], [(3001.5, 1.5), (3004.5, 0.25), (-1.0, 9.0)]))
+        cases.append(([[2999.0, 1.0, 3], [2990.0, 2.0, 1]], [[3001.0, 0.5, 2]]))
+        for bids, asks in cases:
+            for sequence in (None, 42):
+                expected = _loop_build_book_lp("coinbase", "BTC/USD", [level[:2] for level in bids], [level[:2] for level in asks], 1678886400000000000, sequence)
+                self.assertEqual(schema.build_book_lp("coinbase", "BTC/USD", bids, asks, 1678886400000000000, sequence), expected)
+
+    def test_build_book_lp_accepts_arrays(self):
+        bids, asks = _deep_book(random.Random(3), 100)
+        self.assertEqual(
+            schema.build_book_lp("coinbase", "BTC/USD", np.array(bids), np.array(asks), 1),
+            schema.build_book_lp("coinbase", "BTC/USD", bids, asks, 1),
+        )
+        self.assertEqual(schema.build_book_lp("coinbase", "BTC/USD", np.empty((0, 2)), np.array(asks), 1), [])
+
+    @unittest.skipUnless(os.environ.get("SENTINEL_BENCH"), "set SENTINEL_BENCH=1 to run benchmarks")
+    def test_benchmark_build_book_lp(self):
+        rng = random.Random(1)
+        for levels in (100, 1000, 10000):
+            bids, asks = _deep_book(rng, levels)
+            timings = {}
+            for name, build in (("loop", _loop_build_book_lp), ("numpy", schema.build_book_lp)):
+                runs = 200
+                start = time.perf_counter()
+                for _ in range(runs):
+                    build("coinbase", "BTC/USD", bids, asks, 1678886400000000000, 12345)
+                timings[name] = (time.perf_counter() - start) / runs * 1e6
+            print(f"\n{levels} levels/side  loop {timings['loop']:.1f}us | numpy {timings['numpy']:.1f}us")
+            if levels >= 1000:
+                self.assertLess(timings["numpy"], timings["loop"])
+
     def test_build_raw_book_lp_example(self):
         exchange = "rawex"
         symbol = "ADA/USDT"
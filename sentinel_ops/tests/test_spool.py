@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from sentinel_ops.writers.spool import WriteAheadSpool
+
+
+def _payload(i, lines=3):
+    return "\n".join(f"trades,exchange=cb,symbol=BTC-USD price={i}.{n} {i}" for n in range(lines)).encode()
+
+
+class TestWriteAheadSpool(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+
+    def _drain(self, spool):
+        batches = []
+        while (batch := spool.peek()) is not None:
+            batches.append(batch)
+            spool.ack()
+        return batches
+
+    def test_batches_replay_in_order_across_rotated_segments(self):
+        spool = WriteAheadSpool(self.directory, segment_max_bytes=400)
+        expected = [("trades" if i % 2 else "order_book", _payload(i)) for i in range(12)]
+        for bucket, payload in expected:
+            self.assertTrue(spool.append(bucket, payload))
+        self.assertGreater(len(self._segments()), 2)
+
+        self.assertEqual(self._drain(spool), expected)
+        self.assertFalse(spool.pending)
+        # Replayed segments are deleted; only the active one is left
+        self.assertEqual(len(self._segments()), 1)
+        self.assertEqual(spool.stats()["replayed"], 12)
+        spool.close()
+
+    def test_peek_repeats_until_ack(self):
+        spool = WriteAheadSpool(self.directory)
+        spool.append("trades", b"a 1")
+        spool.append("trades", b"b 2")
+        self.assertEqual(spool.peek(), ("trades", b"a 1"))
+        self.assertEqual(spool.peek(), ("trades", b"a 1"))
+        spool.ack()
+        self.assertEqual(spool.peek(), ("trades", b"b 2"))
+        spool.close()
+
+    def test_restart_resumes_after_the_last_acknowledged_batch(self):
+        spool = WriteAheadSpool(self.directory, segment_max_bytes=400)
+        for i in range(8):
+            spool.append("trades", _payload(i))
+        for _ in range(3):
+            spool.peek()
+            spool.ack()
+        spool.peek() # Read but never acknowledged, so it must be replayed again
+        spool.close()
+
+        reopened = WriteAheadSpool(self.directory, segment_max_bytes=400)
+        reopened.append("trades", _payload(8))
+        self.assertEqual([payload for _, payload in self._drain(reopened)], [_payload(i) for i in range(3, 9)])
+        reopened.close()
+
+    def test_size_cap_rejects_new_batches(self):
+        spool = WriteAheadSpool(self.directory, segment_max_bytes=400, max_total_bytes=1000)
+        results = [spool.append("trades", _payload(i)) for i in range(20)]
+        self.assertIn(False, results)
+        self.assertEqual(spool.stats()["rejected"], results.count(False))
+        self.assertLessEqual(sum(os.path.getsize(os.path.join(self.directory, name)) for name in self._segments()), 1000)
+
+        # Whatever was accepted is replayed, and draining makes room again
+        accepted = [_payload(i) for i, ok in enumerate(results) if ok]
+        self.assertEqual([payload for _, payload in self._drain(spool)], accepted)
+        spool.close()
+
+    def test_corrupt_record_skips_the_rest_of_its_segment(self):
+        spool = WriteAheadSpool(self.directory, segment_max_bytes=400)
+        for i in range(6):
+            spool.append("trades", _payload(i))
+        spool.close()
+        first = os.path.join(self.directory, self._segments()[0])
+        with open(first, "r+b") as f:
+            data = bytearray(f.read())
+            data[-40] ^= 0xFF # Inside the last batch record, before the seal
+            f.seek(0)
+            f.write(data)
+
+        reopened = WriteAheadSpool(self.directory, segment_max_bytes=400)
+        payloads = [payload for _, payload in self._drain(reopened)]
+        self.assertEqual(reopened.stats()["corrupt"], 1)
+        self.assertNotIn(b"\xff", b"".join(payloads))
+        self.assertEqual(payloads[-1], _payload(5)) # Later segments are still replayed
+        self.assertLess(len(payloads), 6)
+        reopened.close()
+
+    def test_torn_tail_is_dropped(self):
+        spool = WriteAheadSpool(self.directory)
+        for i in range(3):
+            spool.append("trades", _payload(i))
+        spool._active_file.close() # Simulate a crash: no seal
+        path = os.path.join(self.directory, self._segments()[0])
+        os.truncate(path, os.path.getsize(path) - 5)
+
+        reopened = WriteAheadSpool(self.directory)
+        self.assertEqual([payload for _, payload in self._drain(reopened)], [_payload(0), _payload(1)])
+        self.assertEqual(self._segments(), [])
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
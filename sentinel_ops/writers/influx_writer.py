@@ -6,12 +6,39 @@ from typing import List, Union, Any # Union for queue item type, Any for InfluxD
 
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 from influxdb_client.client.exceptions import InfluxDBError
-from influxdb_client.client.write_api import ASYNCHRONOUS, WriteOptions
+from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions
 
 from sentinel_ops import config
+from sentinel_ops.writers.spool import WriteAheadSpool
+
+
+# Statuses for which InfluxDB rejected the payload itself; resending it can never succeed
+_REJECTED_PAYLOAD_STATUSES = (400, 413, 422) # Bad line protocol / field type conflict, too large, unprocessable
+# Statuses an operator can fix (token, permissions, bucket); the batch is kept until they are
+_OPERATOR_FIXABLE_STATUSES = (401, 403, 404)
+
+
+def _status_of(error: Exception) -> int | None:
+    return getattr(getattr(error, "response", None), "status", None)
+
+
+def _is_rejected_payload(error: Exception) -> bool:
+    """True if InfluxDB will refuse this payload however often it is sent."""
+    return _status_of(error) in _REJECTED_PAYLOAD_STATUSES
+
+
+async def _sleep_unless_set(event: asyncio.Event, seconds: float):
+    """Sleeps for *seconds*, returning early once *event* is set."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
 
 class InfluxWriter:
-    def __init__(self, influx_url: str, influx_token: str, influx_org: str):
+    write_retries = 3
+    write_retry_delay = 2 # seconds, doubled after every failed attempt
+
+    def __init__(self, influx_url: str, influx_token: str, influx_org: str, spool_dir: str | None = config.SPOOL_DIR):
         """
         Initializes the InfluxWriter with connection details for InfluxDB.
 
@@ -19,12 +46,26 @@ class InfluxWriter:
             influx_url: URL of the InfluxDB instance.
             influx_token: Authentication token for InfluxDB.
             influx_org: Organization name in InfluxDB.
+            spool_dir: Directory for the write-ahead spool that absorbs batches while InfluxDB
+                       is unavailable. None disables it, and failed batches are lost.
         """
         self.influx_url = influx_url
         self.influx_token = influx_token
         self.influx_org = influx_org
         self.client: InfluxDBClient | None = None
         self.write_api = None
+        self.influx_available = True # False after a retryable write failure, until a write succeeds again
+        self.spool: WriteAheadSpool | None = None
+        if spool_dir:
+            try:
+                self.spool = WriteAheadSpool(
+                    spool_dir,
+                    segment_max_bytes=config.SPOOL_SEGMENT_MAX_BYTES,
+                    max_total_bytes=config.SPOOL_MAX_TOTAL_BYTES,
+                    fsync=config.SPOOL_FSYNC
+                )
+            except OSError as e:
+                logging.error(f"Failed to open write-ahead spool at '{spool_dir}': {e}. Continuing without it.")
         self._connect()
 
     def _connect(self):
@@ -35,14 +76,10 @@ class InfluxWriter:
                 token=self.influx_token,
                 org=self.influx_org
             )
-            # Configure WriteOptions for batching
-            # Using batch_size from config, flush_interval from config
-            # jitter_interval and retry_interval can be added for more robust retries by the client library
-            write_options = WriteOptions(
-                batch_size=config.WRITER_BATCH_SIZE_POINTS,
-                flush_interval=config.WRITER_FLUSH_INTERVAL_MS,
-                write_type=ASYNCHRONOUS
-            )
+            # Batching happens in run_queue_consumer, so the client writes synchronously (in a worker
+            # thread, see write_batch). Unlike ASYNCHRONOUS, this keeps at most one request per consumer
+            # in memory during an outage and lets a failed write reach the spool.
+            write_options = WriteOptions(write_type=SYNCHRONOUS)
             self.write_api = self.client.write_api(write_options=write_options)
             logging.info("InfluxDB client initialized and write_api configured.")
             # Verify connection (optional, but good for early feedback)
@@ -53,39 +90,54 @@ class InfluxWriter:
             self.client = None # Ensure client is None if connection fails
             self.write_api = None
 
-    async def write_batch(self, bucket: str, data_points: List[str]):
+    async def write_batch(self, bucket: str, data_points: Union[List[str], bytes]):
         """
         Writes a batch of Line Protocol data points to the specified InfluxDB bucket.
         Includes basic retry logic.
 
+        A batch that still fails after the retries goes to the write-ahead spool and marks
+        InfluxDB as unavailable. Auth and missing-bucket errors (401, 403, 404) are spooled
+        right away, without retrying, since only an operator can fix them. Until a write or
+        a replay succeeds again, new batches are spooled without trying InfluxDB. Once it is
+        back, live batches are written directly while run_spool_replay drains the backlog.
+        Only a batch whose payload InfluxDB rejects (400, 413, 422) goes to the spool's
+        dead-letter file, since sending it again would fail the same way.
+
         Args:
             bucket: The InfluxDB bucket to write to.
-            data_points: A list of strings, where each string is in Line Protocol format.
+            data_points: A list of strings, where each string is in Line Protocol format,
+                         or one newline-separated UTF-8 LP payload.
         """
         if not self.write_api:
             logging.error("InfluxDB write_api not initialized. Cannot write data.")
             return
         if not data_points:
             return
+        if self.spool is not None and not self.influx_available:
+            self._spool_batch(bucket, data_points)
+            return
 
-        max_retries = 3
-        retry_delay = 2  # seconds
+        max_retries = self.write_retries
+        retry_delay = self.write_retry_delay
 
         for attempt in range(max_retries):
             try:
-                # The ASYNCHRONOUS write_api handles batching and flushing based on WriteOptions.
-                # We are just passing the prepared line protocol strings.
-                self.write_api.write(bucket=bucket, org=self.influx_org, record=data_points)
+                # The blocking HTTP request runs in a worker thread so the event loop keeps going
+                await asyncio.to_thread(self.write_api.write, bucket=bucket, org=self.influx_org, record=data_points)
                 # logging.debug(f"Successfully wrote {len(data_points)} points to bucket '{bucket}'.")
+                self.influx_available = True
                 return # Success
             except InfluxDBError as e:
                 logging.error(f"InfluxDBError writing to bucket '{bucket}' (attempt {attempt + 1}/{max_retries}): {e}")
-                if e.response and e.response.status == 401:
-                    logging.error("InfluxDB authentication error (401). Check token.")
-                    break # No point retrying auth error
+                if _is_rejected_payload(e):
+                    self._dead_letter_batch(bucket, data_points, e)
+                    return # Retrying would fail the same way
+                if e.response and e.response.status in (401, 403):
+                    logging.error(f"InfluxDB authentication error ({e.response.status}). Check token.")
+                    break # No point retrying until the token is fixed; spool the batch
                 if e.response and e.response.status == 404:
                     logging.error(f"InfluxDB bucket '{bucket}' not found (404).")
-                    break # No point retrying if bucket doesn't exist
+                    break # No point retrying until the bucket exists; spool the batch
                 # For other errors, retry after a delay
                 if attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay * (2 ** attempt)) # Exponential backoff
@@ -97,12 +149,117 @@ class InfluxWriter:
                     await asyncio.sleep(retry_delay * (2 ** attempt))
                 else:
                     logging.error(f"Failed to write to bucket '{bucket}' after {max_retries} attempts due to unexpected error.")
+        self.influx_available = False
+        self._spool_batch(bucket, data_points)
+
+    @staticmethod
+    def _payload_bytes(data_points: Union[List[str], bytes]) -> bytes:
+        if isinstance(data_points, list):
+            return "\n".join(data_points).encode()
+        return bytes(data_points)
+
+    def _spool_batch(self, bucket: str, data_points: Union[List[str], bytes]):
+        """Appends a batch that could not be written to the spool, or logs its loss if there is none."""
+        payload = self._payload_bytes(data_points)
+        if self.spool is None:
+            logging.error(f"No write-ahead spool configured. {len(payload)} bytes for bucket '{bucket}' are lost.")
+            return
+        if self.spool.append(bucket, payload):
+            logging.debug(f"Spooled {len(payload)} bytes for bucket '{bucket}'.")
+
+    def _dead_letter_batch(self, bucket: str, data_points: Union[List[str], bytes], error: Exception):
+        """Sets aside a batch InfluxDB rejected for good, or logs its loss if there is no spool."""
+        payload = self._payload_bytes(data_points)
+        status = _status_of(error)
+        if self.spool is None:
+            logging.error(f"InfluxDB rejected {len(payload)} bytes for bucket '{bucket}' (status {status}). No spool configured; they are lost.")
+            return
+        if self.spool.dead_letter(bucket, payload, f"status={status}"):
+            logging.error(f"InfluxDB rejected {len(payload)} bytes for bucket '{bucket}' (status {status}). Moved them to the dead-letter file.")
+
+    async def run_spool_replay(self, stop_event: asyncio.Event, points_per_second: float = config.SPOOL_REPLAY_POINTS_PER_SEC):
+        """
+        Replays spooled batches to InfluxDB in the order they were spooled.
+
+        A batch is removed from the spool once InfluxDB accepted it, or once it was moved to
+        the dead-letter file because InfluxDB rejected its payload (400, 413, 422). Other
+        failures, including auth and missing-bucket errors, are retried with exponential
+        backoff (up to 30s). A successful replay marks
+        InfluxDB as available again, so live batches go straight to it while the backlog is
+        replayed alongside at points_per_second.
+
+        Args:
+            stop_event: An asyncio.Event to signal when to stop replaying.
+            points_per_second: Rate limit for the backlog replay in LP lines per second.
+                               Live writes are not counted against it.
+        """
+        if self.spool is None or not self.write_api:
+            logging.info("No write-ahead spool or write_api. Spool replay not started.")
+            return
+
+        logging.info(f"Starting spool replay from '{self.spool.directory}'.")
+        backoff = 1.0
+        draining = False
+        while not stop_event.is_set():
+            batch = self.spool.peek()
+            if batch is None:
+                if draining:
+                    logging.info(f"Spool drained. Replayed {self.spool.replayed} batches so far.")
+                    draining = False
+                await _sleep_unless_set(stop_event, 0.5)
+                continue
+            if not draining:
+                logging.info(f"Replaying spooled batches: {self.spool.stats()['pending_bytes']} bytes pending.")
+                draining = True
+
+            bucket, payload = batch
+            try:
+                await asyncio.to_thread(self.write_api.write, bucket=bucket, org=self.influx_org, record=payload)
+            except Exception as e:
+                if _is_rejected_payload(e):
+                    self._dead_letter_batch(bucket, payload, e)
+                    self.spool.ack() # Retrying would fail the same way and block every batch behind it
+                    continue
+                if _status_of(e) in _OPERATOR_FIXABLE_STATUSES:
+                    logging.error(f"Spool replay to bucket '{bucket}' needs operator action (status {_status_of(e)}), retrying in {backoff:.0f}s.")
+                else:
+                    logging.warning(f"Spool replay to bucket '{bucket}' failed, retrying in {backoff:.0f}s: {e}")
+                await _sleep_unless_set(stop_event, backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            self.spool.ack()
+            self.influx_available = True
+            backoff = 1.0
+            points = payload.count(b"\n") + (0 if payload.endswith(b"\n") else 1)
+            await _sleep_unless_set(stop_event, points / points_per_second)
+        logging.info("Spool replay stopped.")
+
+    @staticmethod
+    def _append_lp(payload: bytearray, item: Union[str, List[str]]) -> int:
+        """Appends one queue item to the payload as newline-terminated LP. Returns the number of points."""
+        if isinstance(item, str): # Single trade LP
+            payload += item.encode()
+            payload += b"\n"
+            return 1
+        if isinstance(item, list): # List of order book LPs
+            if item:
+                payload += "\n".join(item).encode()
+                payload += b"\n"
+            return len(item)
+        return -1
 
     async def run_queue_consumer(self, data_queue: asyncio.Queue, bucket_name: str, stop_event: asyncio.Event):
         """
         Continuously consumes data from an asyncio.Queue and writes it to InfluxDB.
         Manages batching based on size or time.
 
+        Items already in the queue are drained in bulk with get_nowait(); the consumer only
+        suspends (with a single timeout) when the queue is empty. Lines are encoded straight
+        into one bytearray payload, so a flush hands a single buffer to the client instead of
+        a list of small strings. A batch is flushed once it holds WRITER_BATCH_SIZE_POINTS
+        points or its first point is WRITER_FLUSH_INTERVAL_MS old. A flush waits for InfluxDB
+        (or the spool), so a slow database backs up into the queue and its backpressure policy.
+
         Args:
             data_queue: The asyncio.Queue to read data from.
                        Expected items: single LP string for trades, list of LP strings for order books.
@@ -114,70 +271,83 @@ class InfluxWriter:
             return
 
         logging.info(f"Starting InfluxDB writer for bucket: {bucket_name}")
-        local_batch = []
-        last_flush_time = asyncio.get_event_loop().time()
+        loop = asyncio.get_running_loop()
+        flush_interval = config.WRITER_FLUSH_INTERVAL_MS / 1000.0
+        idle_poll = 0.05 # How often an idle consumer re-checks stop_event
+        payload = bytearray()
+        points = 0
+        batch_started = 0.0 # loop time of the first point in the current batch
+
+        def _add(item) -> None:
+            nonlocal points, batch_started
+            added = self._append_lp(payload, item)
+            if added < 0:
+                logging.warning(f"Received unexpected data type in queue for bucket {bucket_name}: {type(item)}")
+                return
+            if not points:
+                batch_started = loop.time()
+            points += added
+
+        async def _flush(reason: str) -> None:
+            nonlocal points
+            logging.debug(f"Flushing batch to '{bucket_name}' ({reason}). Points: {points}, Bytes: {len(payload)}")
+            body = bytes(payload) # The only copy: the client sends it from a worker thread
+            payload.clear()
+            points = 0
+            await self.write_batch(bucket_name, body)
 
         try:
             while not stop_event.is_set():
-                try:
-                    # Wait for an item from the queue with a timeout
-                    # This allows the loop to check stop_event and flush interval periodically
-                    item = await asyncio.wait_for(data_queue.get(), timeout=0.05) # 50ms timeout
-                    
-                    if isinstance(item, str): # Single trade LP
-                        local_batch.append(item)
-                    elif isinstance(item, list): # List of order book LPs
-                        local_batch.extend(item)
-                    else:
-                        logging.warning(f"Received unexpected data type in queue for bucket {bucket_name}: {type(item)}")
+                if data_queue.empty():
+                    timeout = max(flush_interval - (loop.time() - batch_started), 0.0) if points else idle_poll
+                    try:
+                        # Wait for an item, the batch's flush deadline or the next stop_event check
+                        item = await asyncio.wait_for(data_queue.get(), timeout=timeout)
+                        _add(item)
                         data_queue.task_done()
-                        continue
+                    except asyncio.TimeoutError:
+                        pass # No item received, proceed to check flush conditions
+                    except asyncio.CancelledError:
+                        logging.info(f"Writer for bucket '{bucket_name}' received cancellation.")
+                        break # Exit if the task is cancelled
 
+                # Drain what is already queued without suspending
+                while points < config.WRITER_BATCH_SIZE_POINTS:
+                    try:
+                        item = data_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    _add(item)
                     data_queue.task_done()
 
-                except asyncio.TimeoutError:
-                    # No item received, proceed to check flush conditions
-                    pass 
-                except asyncio.CancelledError:
-                    logging.info(f"Writer for bucket '{bucket_name}' received cancellation.")
-                    break # Exit if the task is cancelled
-                except Exception as e:
-                    logging.error(f"Error getting item from queue for bucket {bucket_name}: {e}")
-                    # Potentially add a small sleep to prevent tight loop on persistent queue errors
-                    await asyncio.sleep(0.1)
-                    continue
-
-                current_time = asyncio.get_event_loop().time()
-                time_since_last_flush_ms = (current_time - last_flush_time) * 1000
-
                 # Flush conditions
-                if local_batch and \
-                   (len(local_batch) >= config.WRITER_BATCH_SIZE_POINTS or \
-                    time_since_last_flush_ms >= config.WRITER_FLUSH_INTERVAL_MS):
-                    
-                    logging.debug(f"Flushing batch to '{bucket_name}'. Size: {len(local_batch)}, Interval: {time_since_last_flush_ms:.0f}ms")
-                    await self.write_batch(bucket_name, list(local_batch)) # Pass a copy
-                    local_batch.clear()
-                    last_flush_time = current_time
-            
+                if points >= config.WRITER_BATCH_SIZE_POINTS:
+                    await _flush("size")
+                elif points and loop.time() - batch_started >= flush_interval:
+                    await _flush("interval")
+
             # Final flush for any remaining items after stop_event is set
-            if local_batch:
-                logging.info(f"Flushing remaining {len(local_batch)} items from '{bucket_name}' before shutdown.")
-                await self.write_batch(bucket_name, list(local_batch))
-                local_batch.clear()
+            while True:
+                try:
+                    _add(data_queue.get_nowait())
+                    data_queue.task_done()
+                except asyncio.QueueEmpty:
+                    break
+            if points:
+                logging.info(f"Flushing remaining {points} items from '{bucket_name}' before shutdown.")
+                await _flush("shutdown")
 
         except asyncio.CancelledError:
             logging.info(f"Writer for bucket '{bucket_name}' task cancelled externally.")
             # Final flush for any remaining items
-            if local_batch:
-                logging.info(f"Flushing remaining {len(local_batch)} items from '{bucket_name}' due to cancellation.")
-                await self.write_batch(bucket_name, list(local_batch))
-                local_batch.clear()
+            if points:
+                logging.info(f"Flushing remaining {points} items from '{bucket_name}' due to cancellation.")
+                await _flush("cancellation")
         finally:
             logging.info(f"InfluxDB writer for bucket '{bucket_name}' stopped.")
 
     def close(self):
-        """Closes the InfluxDB client and write_api."""
+        """Closes the InfluxDB client, write_api and spool."""
         if self.write_api:
             try:
                 self.write_api.close() # Flushes any pending writes and closes
@@ -192,6 +362,9 @@ class InfluxWriter:
             except Exception as e:
                 logging.error(f"Error closing InfluxDB client: {e}")
             self.client = None
+        if self.spool:
+            self.spool.close()
+            logging.info("Write-ahead spool closed.")
 
 # Example usage (for testing, typically part of supervisor.py)
 async def main_writer_test():
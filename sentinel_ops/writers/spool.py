@@ -0,0 +1,293 @@
+# sentinel/writers/spool.py
+import collections
+import logging
+import os
+import struct
+import zlib
+from typing import Any, Dict, Tuple
+
+# Record framing: kind, bucket length, payload length, CRC32 of bucket + payload
+_HEADER = struct.Struct("<BHII")
+_BATCH = 1
+_SEAL = 2 # Last record of a rotated segment: batch count and the CRC32 over all batch records
+_SEAL_BODY = struct.Struct("<II")
+_SEAL_SIZE = _HEADER.size + _SEAL_BODY.size
+
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+DEAD_LETTER_FILE = "dead-letter.lp"
+
+
+class _CorruptRecord(Exception):
+    pass
+
+
+class WriteAheadSpool:
+    """
+    Append-only on-disk spool for LP batches that could not be written to InfluxDB.
+
+    Batches are appended to numbered segment files (`0000000001.seg`, ...), which are
+    rotated once they reach `segment_max_bytes`. Every record carries a CRC32 of its
+    bucket and payload, and a rotated segment is sealed with the CRC32 over all of its
+    records, so a torn tail or a flipped bit is detected on replay instead of being sent.
+
+    Replay is in append order: `peek` returns the oldest batch not yet acknowledged and
+    `ack` moves past it. The read position is persisted in a small cursor file, and a
+    segment is deleted once it has been replayed completely. A batch that was written
+    but not acknowledged before a crash is replayed again after restart; InfluxDB
+    overwrites identical points, so this is harmless.
+
+    Batches that InfluxDB rejects for good (e.g. bad line protocol) must not block the
+    ones behind them; `dead_letter` moves them to a plain LP file, `dead-letter.lp`,
+    with a comment line giving the bucket and the reason, for inspection by hand.
+
+    Disk usage, spool and dead-letter file together, is capped at `max_total_bytes`.
+    When the cap is reached, new batches are rejected (and counted) rather than
+    evicting older, not yet replayed ones.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024,
+                 max_total_bytes: int = 4 * 1024 * 1024 * 1024, fsync: bool = False):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.fsync = fsync
+        self.appended = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.corrupt = 0
+        self.dead_lettered = 0
+        os.makedirs(directory, exist_ok=True)
+        dead_letter_path = os.path.join(directory, DEAD_LETTER_FILE)
+        self._dead_letter_bytes = os.path.getsize(dead_letter_path) if os.path.exists(dead_letter_path) else 0
+
+        segments = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)]) for name in os.listdir(directory)
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        read_seq, read_offset = self._load_cursor()
+        for seq in [seq for seq in segments if seq < read_seq]: # Replayed before a crash, not yet deleted
+            self._remove(seq)
+            segments.remove(seq)
+        self._segments = collections.deque(segments)
+        self._total_bytes = sum(os.path.getsize(self._path(seq)) for seq in segments)
+        self._next_seq = max(segments + [read_seq, 0]) + 1
+
+        # Writer side: segments found on disk are only read; appends always go to a new segment
+        self._active_seq: int | None = None
+        self._active_file = None
+        self._active_size = 0
+        self._active_crc = 0
+        self._active_records = 0
+
+        # Reader side
+        self._read_offset = read_offset if segments and segments[0] == read_seq else 0
+        self._read_file = None
+        self._read_crc: int | None = None # None when replay resumed mid-segment and the seal can't be verified
+        self._peeked: Tuple[str, bytes, int] | None = None # (bucket, payload, offset after the record)
+        self._full_logged = False
+
+        if self._segments:
+            logging.info(f"Spool '{directory}' holds {len(self._segments)} segment(s), {self._total_bytes} bytes to replay.")
+
+    # Files ------------------------------------------------------------------------
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:010d}{_SEGMENT_SUFFIX}")
+
+    def _remove(self, seq: int) -> None:
+        try:
+            os.remove(self._path(seq))
+        except FileNotFoundError:
+            pass
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, _CURSOR_FILE)) as f:
+                seq, offset = (int(value) for value in f.read().split())
+                return seq, offset
+        except (OSError, ValueError):
+            return 0, 0
+
+    def _save_cursor(self) -> None:
+        seq = self._segments[0] if self._segments else self._next_seq
+        path = os.path.join(self.directory, _CURSOR_FILE)
+        with open(path + ".tmp", "w") as f:
+            f.write(f"{seq} {self._read_offset}")
+        os.replace(path + ".tmp", path)
+
+    # Writer -------------------------------------------------------------------------
+
+    def append(self, bucket: str, payload: bytes) -> bool:
+        """Appends one batch. Returns False if it was rejected because the spool is at its size cap."""
+        bucket_bytes = bucket.encode()
+        header = _HEADER.pack(_BATCH, len(bucket_bytes), len(payload), zlib.crc32(payload, zlib.crc32(bucket_bytes)))
+        size = len(header) + len(bucket_bytes) + len(payload)
+        if not self._reserve_disk(size + _SEAL_SIZE):
+            return False
+
+        if self._active_file is not None and self._active_records and self._active_size + size + _SEAL_SIZE > self.segment_max_bytes:
+            self._rotate()
+        if self._active_file is None:
+            self._open_segment()
+
+        for part in (header, bucket_bytes, payload):
+            self._active_file.write(part)
+            self._active_crc = zlib.crc32(part, self._active_crc)
+        self._active_file.flush()
+        if self.fsync:
+            os.fsync(self._active_file.fileno())
+        self._active_size += size
+        self._active_records += 1
+        self._total_bytes += size
+        self.appended += 1
+        return True
+
+    def dead_letter(self, bucket: str, payload: bytes, reason: str) -> bool:
+        """Appends a batch InfluxDB will never accept to the dead-letter file. Returns False if over the cap."""
+        header = f"# bucket={bucket} reason={reason}\n".encode()
+        size = len(header) + len(payload) + 1
+        if not self._reserve_disk(size):
+            return False
+        with open(os.path.join(self.directory, DEAD_LETTER_FILE), "ab") as f:
+            f.write(header)
+            f.write(payload)
+            f.write(b"\n")
+        self._dead_letter_bytes += size
+        self.dead_lettered += 1
+        return True
+
+    def _reserve_disk(self, size: int) -> bool:
+        if self._total_bytes + self._dead_letter_bytes + size <= self.max_total_bytes:
+            self._full_logged = False
+            return True
+        self.rejected += 1
+        if not self._full_logged:
+            logging.error(f"Spool '{self.directory}' reached its cap of {self.max_total_bytes} bytes. Dropping new batches until it drains.")
+            self._full_logged = True
+        return False
+
+    def _open_segment(self) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._active_file = open(self._path(seq), "ab")
+        self._active_seq = seq
+        self._active_size = 0
+        self._active_crc = 0
+        self._active_records = 0
+        self._segments.append(seq)
+
+    def _rotate(self) -> None:
+        """Seals the active segment; the next append starts a new one."""
+        if self._active_file is None:
+            return
+        body = _SEAL_BODY.pack(self._active_records, self._active_crc)
+        self._active_file.write(_HEADER.pack(_SEAL, 0, len(body), zlib.crc32(body)) + body)
+        self._active_file.flush()
+        os.fsync(self._active_file.fileno())
+        self._active_file.close()
+        self._total_bytes += _SEAL_SIZE
+        self._active_file = None
+        self._active_seq = None
+
+    # Reader ---------------------------------------------------------------------------
+
+    @property
+    def pending(self) -> bool:
+        """True while a batch is waiting to be replayed."""
+        return self.peek() is not None
+
+    def peek(self) -> Tuple[str, bytes] | None:
+        """The oldest batch not yet acknowledged as (bucket, payload), or None if the spool is drained."""
+        if self._peeked is not None:
+            return self._peeked[0], self._peeked[1]
+        while self._segments:
+            seq = self._segments[0]
+            if self._read_file is None:
+                self._read_file = open(self._path(seq), "rb")
+                self._read_crc = 0 if self._read_offset == 0 else None
+            try:
+                record = self._read_record()
+            except _CorruptRecord as e:
+                self.corrupt += 1
+                logging.error(f"Spool segment {self._path(seq)} is corrupt at offset {self._read_offset}: {e}. Skipping the rest of it.")
+                if seq == self._active_seq:
+                    self._rotate()
+                self._finish_segment()
+                continue
+            if record is None: # End of the segment, or a torn tail left by a crash
+                if seq == self._active_seq:
+                    return None
+                self._finish_segment()
+                continue
+            kind, header, body, bucket_length, next_offset = record
+            if kind == _SEAL:
+                records, crc = _SEAL_BODY.unpack(body)
+                if self._read_crc is not None and crc != self._read_crc:
+                    self.corrupt += 1
+                    logging.error(f"Spool segment {self._path(seq)} failed its checksum over {records} batches.")
+                self._read_offset = next_offset
+                continue
+            if self._read_crc is not None:
+                self._read_crc = zlib.crc32(body, zlib.crc32(header, self._read_crc))
+            self._peeked = (body[:bucket_length].decode(), body[bucket_length:], next_offset)
+            return self._peeked[0], self._peeked[1]
+        return None
+
+    def ack(self) -> None:
+        """Marks the batch returned by `peek` as written."""
+        if self._peeked is None:
+            return
+        self._read_offset = self._peeked[2]
+        self._peeked = None
+        self.replayed += 1
+        self._save_cursor()
+
+    def _read_record(self) -> Tuple[int, bytes, bytes, int, int] | None:
+        f = self._read_file
+        f.seek(self._read_offset)
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+        kind, bucket_length, payload_length, crc = _HEADER.unpack(header)
+        if kind not in (_BATCH, _SEAL):
+            raise _CorruptRecord(f"unknown record kind {kind}")
+        body = f.read(bucket_length + payload_length)
+        if len(body) < bucket_length + payload_length:
+            return None
+        if zlib.crc32(body) != crc:
+            raise _CorruptRecord("record checksum mismatch")
+        return kind, header, body, bucket_length, self._read_offset + len(header) + len(body)
+
+    def _finish_segment(self) -> None:
+        """Deletes the segment at the head of the spool once it has been replayed."""
+        seq = self._segments.popleft()
+        self._read_file.close()
+        self._read_file = None
+        self._total_bytes -= os.path.getsize(self._path(seq))
+        self._remove(seq)
+        self._read_offset = 0
+        self._save_cursor()
+
+    # Lifecycle ------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segments": len(self._segments),
+            "bytes": self._total_bytes,
+            "pending_bytes": max(self._total_bytes - self._read_offset, 0),
+            "appended": self.appended,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+            "corrupt": self.corrupt,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def close(self) -> None:
+        """Seals the active segment and persists the read position."""
+        self._rotate()
+        if self._read_file is not None:
+            self._read_file.close()
+            self._read_file = None
+        self._peeked = None
+        self._save_cursor()
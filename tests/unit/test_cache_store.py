@@ -0,0 +1,174 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentinel.core.data.cache_store import OHLCV_CACHE_COLUMNS, OHLCV_RECORD, CacheStore
+
+
+def _candles(count, start_ms=1_700_000_000_000, step_ms=60_000, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 0.1, count))
+    return pd.DataFrame(
+        {
+            "dates": start_ms + step_ms * np.arange(count, dtype=np.int64),
+            "opens": closes + rng.normal(0, 0.05, count),
+            "highs": closes + 0.2,
+            "lows": closes - 0.2,
+            "closes": closes,
+            "volumes": rng.uniform(0, 10, count),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_binary_cache_round_trip_and_tail_append(tmp_path):
+    store = CacheStore(str(tmp_path))
+    path = store.path_for("coinbase_BTC-USD_1m")
+    df = _candles(100)
+
+    await store.save_cache(df.iloc[:80], path, "k", "coinbase", "BTC/USD", "1m")
+    appended = await store.append_cache(df.iloc[80:], path, "k", "coinbase", "BTC/USD", "1m")
+    assert appended == 20
+    assert os.path.getsize(path) == 100 * OHLCV_RECORD.itemsize
+    # Rewriting already persisted candles appends corrections; the last write wins
+    await store.append_cache(df.iloc[90:], path, "k", "coinbase", "BTC/USD", "1m")
+
+    loaded, first_ts, last_ts, from_cache = await store.load_cache(path, "k")
+    assert from_cache
+    assert (first_ts, last_ts) == (int(df["dates"].iloc[0]), int(df["dates"].iloc[-1]))
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+@pytest.mark.asyncio
+async def test_legacy_csv_is_migrated_once(tmp_path):
+    store = CacheStore(str(tmp_path))
+    df = _candles(50)
+    legacy = df.assign(exchange="coinbase", symbol="BTC/USD", timeframe="1m")
+    legacy.to_csv(tmp_path / "coinbase_BTC-USD_1m.csv", index=False)
+
+    loaded, _, _, from_cache = await store.load_cache(store.path_for("coinbase_BTC-USD_1m"), "k")
+
+    assert from_cache
+    pd.testing.assert_frame_equal(loaded, df)
+    assert not (tmp_path / "coinbase_BTC-USD_1m.csv").exists()
+    assert (tmp_path / "coinbase_BTC-USD_1m.csv.migrated").exists()
+    assert (tmp_path / "coinbase_BTC-USD_1m.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_truncated_trailing_record_is_ignored(tmp_path):
+    store = CacheStore(str(tmp_path))
+    path = store.path_for("k")
+    await store.save_cache(_candles(10), path, "k", "coinbase", "BTC/USD", "1m")
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)
+
+    loaded, _, _, from_cache = await store.load_cache(path, "k")
+    assert from_cache and len(loaded) == 10
+
+
+@pytest.mark.skipif(not os.environ.get("SENTINEL_BENCH"), reason="set SENTINEL_BENCH=1 to run benchmarks")
+@pytest.mark.asyncio
+async def test_benchmark_binary_vs_csv_1m_rows(tmp_path):
+    df = _candles(1_000_000)
+    csv_path = tmp_path / "bench.csv"
+    store = CacheStore(str(tmp_path / "bin"))
+    bin_path = store.path_for("bench")
+
+    t0 = time.perf_counter()
+    df.to_csv(csv_path, index=False)
+    csv_save = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pd.read_csv(csv_path, dtype={"dates": "Int64"})
+    csv_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await store.save_cache(df, bin_path, "bench", "x", "y", "1m")
+    bin_save = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    loaded, *_ = await store.load_cache(bin_path, "bench")
+    bin_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    await store.append_cache(_candles(100, start_ms=int(df["dates"].iloc[-1]) + 60_000), bin_path, "bench", "x", "y", "1m")
+    bin_append = time.perf_counter() - t0
+
+    print(
+        f"\n1M rows  csv save {csv_save:.3f}s load {csv_load:.3f}s | "
+        f"binary save {bin_save:.3f}s load {bin_load:.3f}s append(100) {bin_append * 1000:.2f}ms"
+    )
+    assert list(loaded.columns) == OHLCV_CACHE_COLUMNS
+    assert bin_load < csv_load
+
+
+@pytest.mark.asyncio
+async def test_backfill_is_appended_then_compacted(tmp_path):
+    store = CacheStore(str(tmp_path))
+    path = store.path_for("k")
+    df = _candles(60)
+    await store.save_cache(df.iloc[20:], path, "k", "coinbase", "BTC/USD", "1m")
+
+    await store.append_cache(df.iloc[:20], path, "k", "coinbase", "BTC/USD", "1m")
+    assert store.last_persisted_timestamp(path) == int(df["dates"].iloc[-1])
+    assert os.path.getsize(path) == 60 * OHLCV_RECORD.itemsize
+    assert store.read_records(path)["dates"][0] == df["dates"].iloc[20]
+
+    assert await store.compact_pending() == 1
+    assert np.array_equal(store.read_records(path)["dates"], df["dates"].to_numpy())
+    loaded, *_ = await store.load_cache(path, "k")
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+@pytest.mark.asyncio
+async def test_task_manager_compacts_backfilled_caches_on_shutdown(tmp_path):
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+
+    from sentinel.core.task_manager import TaskManager
+
+    store = CacheStore(str(tmp_path))
+    path = store.path_for("k")
+    df = _candles(30)
+    await store.save_cache(df.iloc[10:], path, "k", "coinbase", "BTC/USD", "1m")
+    await store.append_cache(df.iloc[:10], path, "k", "coinbase", "BTC/USD", "1m")
+
+    data = MagicMock(cache_store=store, close_all_exchanges=AsyncMock())
+    task_manager = TaskManager(data=data, sec_fetcher=None, mode="external", loop=asyncio.get_running_loop())
+    task_manager.start_cache_compaction(interval_seconds=3600)
+    assert "cache_compaction" in task_manager.tasks
+    await asyncio.sleep(0) # Let the timer task start before shutdown cancels it
+    await task_manager.aclose()
+
+    assert np.array_equal(store.read_records(path)["dates"], df["dates"].to_numpy())
+
+
+@pytest.mark.asyncio
+async def test_fetcher_refresh_appends_only_new_rows(tmp_path):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from sentinel.core.data.candle_fetcher import CandleFetcher
+
+    store = CacheStore(str(tmp_path))
+    fetcher = CandleFetcher(store, MagicMock())
+    exchange = MagicMock()
+    exchange.id = "coinbase"
+    exchange.parse_timeframe.return_value = 60
+    exchange.milliseconds.return_value = 1_800_000_000_000
+    df = _candles(1000)
+    key = fetcher._generate_cache_key("coinbase", "BTC/USD", "1m")
+    await store.save_cache(df.iloc[:990], store.path_for(key), key, "coinbase", "BTC/USD", "1m")
+
+    tail = df.iloc[990:].to_numpy().tolist()
+    fetcher._fetch_candle_data_after_timestamp = AsyncMock(return_value=tail)
+    store.save_cache = AsyncMock(side_effect=AssertionError("refresh must not rewrite the cache"))
+    all_candles = {"coinbase": {}}
+
+    _, _, stats = await fetcher.fetch_and_process_candles(
+        exchange, "BTC/USD", "1m", int(df["dates"].iloc[0]), "coinbase", all_candles
+    )
+
+    assert stats == {"from_cache": 990, "delta": 10}
+    assert os.path.getsize(store.path_for(key)) == 1000 * OHLCV_RECORD.itemsize
+    assert np.array_equal(all_candles["coinbase"][key]["dates"].to_numpy(), df["dates"].to_numpy())
@@ -0,0 +1,113 @@
+import random
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from sentinel.core.data.candle_engine import CandleEngine
+from sentinel.core.data.candle_factory import CandleFactory
+from sentinel.core.signals import SignalEmitter, Signals
+
+TIMEFRAME_SECONDS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+@pytest.fixture
+def mock_data():
+    mock_exchange = MagicMock()
+    mock_exchange.parse_timeframe.side_effect = lambda tf: TIMEFRAME_SECONDS[tf]
+    mock_exchange.market.return_value = {"precision": {"price": 0.01}}
+    data = MagicMock()
+    data.exchange_list = {"binance": mock_exchange}
+    return data
+
+
+def _make_factory(emitter, data, timeframe, subscribe_trades=False):
+    return CandleFactory(
+        exchange="binance",
+        symbol="BTC/USDT",
+        timeframe_str=timeframe,
+        emitter=emitter,
+        task_manager=MagicMock(),
+        data=data,
+        subscribe_trades=subscribe_trades,
+    )
+
+
+def _random_trades(count=600, seed=7):
+    rng = random.Random(seed)
+    base_ms = int(datetime(2023, 1, 1, 10, 0, 0, tzinfo=timezone.utc).timestamp() * 1000)
+    ts = base_ms
+    trades = []
+    for _ in range(count):
+        ts += rng.randint(0, 6000)
+        trades.append({
+            "timestamp": ts,
+            "price": round(50000 + rng.uniform(-250, 250), 2),
+            "amount": round(rng.uniform(0.001, 2.0), 4),
+            "symbol": "BTC/USDT",
+        })
+    return trades
+
+
+def _resample_reference(frame: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Same first/max/min/last/sum rules as CandleFactory.try_resample."""
+    indexed = frame.set_index(pd.to_datetime(frame["dates"], unit="s"))
+    out = indexed.resample(rule).agg(
+        {"opens": "first", "highs": "max", "lows": "min", "closes": "last", "volumes": "sum"}
+    ).dropna(subset=["opens"])
+    out["dates"] = out.index.as_unit("s").astype("int64")
+    return out.reset_index(drop=True)[["dates", "opens", "highs", "lows", "closes", "volumes"]]
+
+
+def test_engine_rolls_coarser_timeframes_up_from_one_fold(mock_data):
+    emitter = SignalEmitter()
+    engine = CandleEngine("binance", "BTC/USDT", emitter)
+    factories = {tf: _make_factory(emitter, mock_data, tf) for tf in ("1m", "5m", "15m")}
+    for factory in factories.values():
+        engine.attach(factory)
+    assert engine.base_timeframe_ms == 60_000
+
+    for trade in _random_trades():
+        emitter.emit(Signals.NEW_TRADE, exchange="binance", trade_data=trade)
+    engine._process_trade_batch()
+
+    one_minute = factories["1m"].ohlcv
+    for tf, rule in (("5m", "5min"), ("15m", "15min")):
+        expected = _resample_reference(one_minute, rule)
+        actual = factories[tf].ohlcv
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_engine_matches_standalone_factory(mock_data):
+    emitter = SignalEmitter()
+    engine = CandleEngine("binance", "BTC/USDT", emitter)
+    shared = _make_factory(emitter, mock_data, "5m")
+    engine.attach(shared)
+    standalone = _make_factory(MagicMock(), mock_data, "5m", subscribe_trades=True)
+
+    for trade in _random_trades(seed=11):
+        emitter.emit(Signals.NEW_TRADE, exchange="binance", trade_data=trade)
+        standalone._on_new_trade("binance", trade)
+    engine._process_trade_batch()
+    standalone._process_trade_batch()
+
+    pd.testing.assert_frame_equal(shared.ohlcv, standalone.ohlcv)
+
+
+def test_engine_unregisters_when_last_factory_detaches(mock_data):
+    emitter = SignalEmitter()
+    engine = CandleEngine("binance", "BTC/USDT", emitter)
+    factory = _make_factory(emitter, mock_data, "1m")
+    engine.attach(factory)
+
+    factory.cleanup()
+
+    assert engine.factories == {}
+    assert factory.engine is None
+    emitter.emit(
+        Signals.NEW_TRADE,
+        exchange="binance",
+        trade_data={"timestamp": 1, "price": 1.0, "amount": 1.0, "symbol": "BTC/USDT"},
+    )
+    assert len(engine._trade_queue) == 0
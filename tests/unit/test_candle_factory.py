@@ -274,6 +274,50 @@ def test_process_trade_batch_emits_signal(candle_factory: CandleFactory, mock_de
     # Assert: Check that the queue is now empty
     assert len(candle_factory._trade_queue) == 0
 
+def test_process_trade_batch_matches_per_trade_folding(candle_factory: CandleFactory, mock_dependencies):
+    """
+    The vectorized batch path must produce the same candles as feeding each
+    trade through _process_trade, including unsorted input and bar rollovers.
+    """
+    base_ms = int(datetime(2023, 1, 1, 10, 0, 0, tzinfo=timezone.utc).timestamp() * 1000)
+    offsets_s = [5, 61, 2, 30, 59, 125, 64, 180, 181, 240]
+    trades = [
+        {"timestamp": base_ms + off * 1000, "price": 50000.0 + i * 7.5 - (i % 3) * 11, "amount": 0.1 * (i + 1), "symbol": "BTC/USDT"}
+        for i, off in enumerate(offsets_s)
+    ]
+
+    for trade in sorted(trades, key=lambda t: t["timestamp"]):
+        candle_factory._process_trade(trade)
+    expected = candle_factory.ohlcv.copy()
+
+    candle_factory.ohlcv = pd.DataFrame(columns=["dates", "opens", "highs", "lows", "closes", "volumes"])
+    candle_factory.last_candle_timestamp = None
+    candle_factory._trade_queue.extend(trades)
+    candle_factory._process_trade_batch()
+
+    pd.testing.assert_frame_equal(candle_factory.ohlcv, expected)
+    assert candle_factory.last_candle_timestamp == expected["dates"].iloc[-1]
+    assert len(candle_factory.ohlcv) == 5  # 10:00 through 10:04
+
+
+def test_process_trade_batch_ignores_stale_trades(candle_factory: CandleFactory, mock_dependencies):
+    """Trades older than the live candle are dropped; the rest still fold."""
+    base_ms = int(datetime(2023, 1, 1, 10, 5, 0, tzinfo=timezone.utc).timestamp() * 1000)
+    candle_factory._process_trade({"timestamp": base_ms + 1000, "price": 100.0, "amount": 1.0, "symbol": "BTC/USDT"})
+
+    candle_factory._trade_queue.extend([
+        {"timestamp": base_ms - 60_000, "price": 1.0, "amount": 9.0, "symbol": "BTC/USDT"},
+        {"timestamp": base_ms + 2000, "price": 101.0, "amount": 2.0, "symbol": "BTC/USDT"},
+    ])
+    candle_factory._process_trade_batch()
+
+    assert len(candle_factory.ohlcv) == 1
+    bar = candle_factory.ohlcv.iloc[-1]
+    assert bar["lows"] == 100.0
+    assert bar["highs"] == 101.0
+    assert bar["closes"] == 101.0
+    assert bar["volumes"] == 3.0
+
 # More tests to follow...
 # def test_multiple_trades_within_interval():
 #     pass
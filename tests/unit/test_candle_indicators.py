@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from sentinel.analysis.candle_indicators import CandleIndicators
+
+
+def _ohlc(count, seed=4):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    opens = closes + rng.normal(0, 0.5, count)
+    highs = np.maximum(opens, closes) + rng.uniform(0, 1, count)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 1, count)
+    return opens, highs, lows, closes
+
+
+def _reference_heikin_ashi(opens, highs, lows, closes):
+    ha = []
+    for i in range(len(closes)):
+        ha_c = (opens[i] + highs[i] + lows[i] + closes[i]) / 4.0
+        ha_o = (opens[i] + closes[i]) / 2.0 if i == 0 else (ha[-1][0] + ha[-1][3]) / 2.0
+        ha.append((ha_o, max(highs[i], ha_o, ha_c), min(lows[i], ha_o, ha_c), ha_c))
+    return np.array(ha).T
+
+
+def test_recompute_matches_loop_and_pandas_ewm():
+    opens, highs, lows, closes = _ohlc(2000)
+    indicators = CandleIndicators(ema_span=20)
+    indicators.recompute(opens, highs, lows, closes)
+
+    np.testing.assert_allclose(indicators.heikin_ashi, _reference_heikin_ashi(opens, highs, lows, closes))
+    np.testing.assert_allclose(indicators.ema, pd.Series(closes).ewm(span=20, adjust=False).mean().to_numpy())
+
+
+def test_incremental_updates_match_full_recompute():
+    opens, highs, lows, closes = _ohlc(600)
+    incremental = CandleIndicators()
+    incremental.recompute(opens[:500], highs[:500], lows[:500], closes[:500])
+    for i in range(500, 600):
+        # A live tick first, then the candle's final values
+        incremental.append(opens[i], opens[i], opens[i], opens[i])
+        incremental.update_last(opens[i], highs[i], lows[i], closes[i])
+
+    full = CandleIndicators()
+    full.recompute(opens, highs, lows, closes)
+    assert len(incremental) == 600
+    np.testing.assert_allclose(incremental.heikin_ashi, full.heikin_ashi)
+    np.testing.assert_allclose(incremental.ema, full.ema)
+
+    tail = incremental.ema[-100:].copy()
+    incremental.trim(100)
+    np.testing.assert_array_equal(incremental.ema, tail)
+
+
+def test_append_and_trim_reuse_the_preallocated_block():
+    opens, highs, lows, closes = _ohlc(400)
+    indicators = CandleIndicators()
+    indicators.recompute(opens[:100], highs[:100], lows[:100], closes[:100])
+    reallocations = 0
+    for i in range(100, 400):
+        block = indicators._data
+        indicators.append(opens[i], highs[i], lows[i], closes[i])
+        indicators.trim(100)
+        reallocations += indicators._data is not block
+
+    full = CandleIndicators()
+    full.recompute(opens, highs, lows, closes)
+    assert len(indicators) == 100
+    assert reallocations <= 3
+    np.testing.assert_allclose(indicators.heikin_ashi, full.heikin_ashi[:, -100:])
+    np.testing.assert_allclose(indicators.ema, full.ema[-100:])
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+from PySide6.QtGui import QImage, QPainter, QTransform
+from PySide6.QtWidgets import QApplication
+
+from sentinel.widgets.chart_pane import CandlestickItem
+
+
+def _bars(count, start=0, seed=1):
+    rng = np.random.default_rng(seed)
+    x = (start + np.arange(count)) * 60.0
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    opens = closes + rng.normal(0, 0.5, count)
+    highs = np.maximum(opens, closes) + rng.uniform(0, 1, count)
+    lows = np.minimum(opens, closes) - rng.uniform(0, 1, count)
+    return [x.tolist(), opens.tolist(), highs.tolist(), lows.tolist(), closes.tolist()]
+
+
+def _render(item: CandlestickItem) -> QImage:
+    image = QImage(400, 300, QImage.Format.Format_ARGB32)
+    image.fill(0)
+    rect = item.boundingRect()
+    painter = QPainter(image)
+    transform = QTransform()
+    transform.scale(400 / rect.width(), 300 / rect.height())
+    transform.translate(-rect.left(), -rect.top())
+    painter.setTransform(transform)
+    item.paint(painter)
+    painter.end()
+    return image
+
+
+def test_live_bar_update_redraws_only_that_bar() -> None:
+    app = QApplication.instance() or QApplication([])
+    item = CandlestickItem()
+    series = _bars(1001)
+    x, o, h, l, c = (values[:1000] for values in series)
+    item.set_data(x, o, h, l, c, body_width=43.2)
+    assert item.bars_drawn_last_update == 1000
+
+    c[-1] += 0.5
+    h[-1] = max(h[-1], c[-1])
+    item.set_data(x, o, h, l, c, body_width=43.2)
+    assert item.bars_drawn_last_update == 1
+
+    # A new candle with the oldest one trimmed re-records at most two partial segments
+    series[4][999] = c[-1]
+    series[2][999] = h[-1]
+    item.set_data(*(values[1:] for values in series), body_width=43.2)
+    assert item.bars_drawn_last_update <= 2 * CandlestickItem.segment_bars + 1
+    app.processEvents()
+
+
+def test_incremental_picture_matches_full_redraw() -> None:
+    app = QApplication.instance() or QApplication([])
+    incremental = CandlestickItem()
+    x, o, h, l, c = _bars(600)
+    incremental.set_data(x[:500], o[:500], h[:500], l[:500], c[:500], body_width=43.2)
+    for end in range(501, 601):
+        incremental.set_data(x[:end], o[:end], h[:end], l[:end], c[:end], body_width=43.2)
+
+    fresh = CandlestickItem()
+    fresh.set_data(x, o, h, l, c, body_width=43.2)
+
+    assert incremental.boundingRect() == fresh.boundingRect()
+    assert _render(incremental) == _render(fresh)
+    app.processEvents()
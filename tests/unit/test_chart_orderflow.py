@@ -6,6 +6,7 @@ from sentinel.analysis.orderbook_processor import OrderBookProcessor
 from sentinel.widgets.chart_widget import ChartDockWidget
 from sentinel.widgets.chart_orderflow_widget import (
     ChartOrderflowDockWidget,
+    LadderCanvas,
     OrderflowLadderPane,
     choose_auto_tick_size,
 )
@@ -243,3 +244,64 @@ def test_changing_one_chart_toolbar_does_not_change_another_chart() -> None:
     first.close()
     second.close()
     del app
+
+
+def test_visible_ladder_columns_match_rows_and_feed_canvas() -> None:
+    app = QApplication.instance() or QApplication([])
+    processor = OrderBookProcessor(price_precision=0.01)
+    raw_bids = [[100.00 - i * 0.01, 1.0 + i] for i in range(50)]
+    raw_asks = [[100.02 + i * 0.01, 2.0 + i] for i in range(50)]
+    kwargs = dict(price_min=99.80, price_max=100.20, current_price=100.01)
+
+    rows = processor.build_visible_ladder(raw_bids, raw_asks, **kwargs)["rows"]
+    ladder = processor.build_visible_ladder(raw_bids, raw_asks, columnar=True, **kwargs)
+    assert ladder["columns"].to_visible_rows() == rows
+
+    pane = OrderflowLadderPane(exchange="coinbase", symbol="BTC/USD", price_precision=0.01)
+    pane.set_visible_price_range(99.80, 100.20)
+    pane.set_last_price(100.01)
+    expanded = pane._build_visible_tick_columns(ladder)
+    assert expanded.to_visible_rows() == pane._build_visible_tick_rows({**ladder, "rows": rows, "columns": None})
+
+    pane.canvas.resize(260, 400)
+    pane.canvas.set_rows(expanded)
+    pane.canvas.grab()
+    assert len(pane.canvas._rows) == len(expanded)
+    pane.shutdown()
+    app.processEvents()
+
+
+def test_ladder_canvas_reuses_layout_until_rows_or_size_change() -> None:
+    app = QApplication.instance() or QApplication([])
+    processor = OrderBookProcessor(price_precision=0.01)
+    raw_bids = [[100.00 - i * 0.01, 1.0 + i] for i in range(50)]
+    raw_asks = [[100.02 + i * 0.01, 2.0 + i] for i in range(50)]
+    ladder = processor.build_visible_ladder(
+        raw_bids, raw_asks, price_min=99.80, price_max=100.20, current_price=100.01, columnar=True
+    )
+
+    canvas = LadderCanvas()
+    canvas.resize(260, 800)
+    canvas.set_price_range(99.80, 100.20)
+    canvas.set_rows(ladder["columns"])
+    canvas.grab()
+    assert canvas.layouts_built == 1
+    labels = len(canvas._text_cache)
+    assert labels > 0
+    assert abs(canvas._row_height(800) - 0.01 * 800 / 0.4) < 1e-6
+
+    # Moving the last-price line repaints from the cached draw lists
+    canvas.set_last_price(100.01)
+    canvas.grab()
+    assert canvas.layouts_built == 1
+
+    # Same values again: the layout is rebuilt but every label is reused
+    canvas.set_rows(ladder["columns"])
+    canvas.grab()
+    assert canvas.layouts_built == 2
+    assert len(canvas._text_cache) == labels
+
+    canvas.resize(260, 600)
+    canvas.grab()
+    assert canvas.layouts_built == 3
+    app.processEvents()
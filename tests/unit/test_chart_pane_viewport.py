@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyqtgraph as pg
+import pytest
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import QApplication
+
+from sentinel.app.render_scheduler import render_scheduler
+from sentinel.widgets.chart_pane import ChartPane, _decimate_ohlcv
+
+
+def _candles(count, seed=2):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 1, count))
+    opens = closes + rng.normal(0, 0.5, count)
+    return pd.DataFrame(
+        {
+            "dates": 1_700_000_000_000 + 60_000 * np.arange(count, dtype=np.int64),
+            "opens": opens,
+            "highs": np.maximum(opens, closes) + rng.uniform(0, 1, count),
+            "lows": np.minimum(opens, closes) - rng.uniform(0, 1, count),
+            "closes": closes,
+            "volumes": rng.uniform(0, 10, count),
+        }
+    )
+
+
+def _pane(count):
+    pane = ChartPane(runtime=None, max_points=count)
+    pane.resize(900, 500)
+    pane.show()
+    render_scheduler().unregister(pane)
+    pane._replace_from_dataframe(_candles(count))
+    pane._render_if_dirty()
+    return pane
+
+
+def test_decimation_keeps_open_close_and_extremes() -> None:
+    series = _candles(10).to_numpy(dtype=np.float64).T
+    decimated = _decimate_ohlcv(series, 4)
+
+    assert decimated.shape == (6, 3)
+    assert decimated[1].tolist() == series[1, [0, 4, 8]].tolist()
+    assert decimated[4].tolist() == series[4, [3, 7, 9]].tolist()
+    assert decimated[2, 0] == series[2, :4].max()
+    assert decimated[3, 2] == series[3, 8:].min()
+    assert np.isclose(decimated[5].sum(), series[5].sum())
+
+
+def test_only_visible_bars_are_rendered() -> None:
+    app = QApplication.instance() or QApplication([])
+    pane = _pane(50_000)
+
+    lo, hi, step = pane._rendered_window
+    assert step == 1
+    assert hi == 50_000 and hi - lo < 400
+    assert len(pane.candle_item._bars) == hi - lo
+
+    # Panning inside the padded window reuses what is already on screen
+    x_min, x_max = pane.price_plot.getViewBox().viewRange()[0]
+    pane.price_plot.setXRange(x_min - 600, x_max - 600, padding=0.0)
+    pane._render_if_dirty()
+    assert pane._rendered_window == (lo, hi, step)
+
+    # A new candle updates the persistent volume items in place
+    up_item, dn_item = pane.volume_up_item, pane.volume_dn_item
+    pane._merge_update(_candles(50_001).iloc[[-1]])
+    pane._render_if_dirty()
+    assert (pane.volume_up_item, pane.volume_dn_item) == (up_item, dn_item)
+    assert pane.vb_vol.addedItems.count(up_item) == 1
+    lo, hi, _ = pane._rendered_window
+    rising = np.asarray(pane.closes[lo:hi]) >= np.asarray(pane.opens[lo:hi])
+    assert np.array_equal(up_item.getData()[1], np.asarray(pane.volumes[lo:hi])[rising])
+
+    # Only trades inside the rendered window become bubbles
+    pane.set_bubbles_enabled(True)
+    for ts in (pane.timestamps[0], pane.timestamps[-2], pane.timestamps[-1]):
+        pane._on_new_trade("coinbase", {"symbol": "BTC/USD", "timestamp": ts * 1000, "price": 100.0, "amount": 1.0, "side": "buy"})
+    pane._render_if_dirty()
+    assert pane.bubbles_item.getData()[0].tolist() == pane.timestamps[-2:]
+
+    pane.close()
+    app.processEvents()
+
+
+def test_zoomed_out_history_is_decimated_to_screen_width() -> None:
+    app = QApplication.instance() or QApplication([])
+    pane = _pane(50_000)
+    pane.price_plot.setXRange(pane.timestamps[0], pane.timestamps[-1], padding=0.0)
+    pane._render_if_dirty()
+
+    _, _, step = pane._rendered_window
+    pixels = pane.price_plot.getViewBox().width()
+    bars = pane.candle_item._bars
+    assert step > 1
+    assert len(bars) <= 2 * pixels
+    assert bars[:, 2].max() == max(pane.highs)
+    assert bars[:, 3].min() == min(pane.lows)
+
+    pane.close()
+    app.processEvents()
+
+
+def _recreate_volume_item(pane, x, volumes, opens, closes, width):
+    """The previous per-frame volume path: a new item and a brush per bar."""
+    if getattr(pane, "_bench_volume_item", None) is not None:
+        pane.vb_vol.removeItem(pane._bench_volume_item)
+    brushes = [
+        QBrush(QColor(38, 166, 154, 140)) if c >= o else QBrush(QColor(239, 83, 80, 140))
+        for o, c in zip(opens, closes)
+    ]
+    pane._bench_volume_item = pg.BarGraphItem(x=x, height=volumes, width=width, brushes=brushes, pen=pg.mkPen(None))
+    pane.vb_vol.addItem(pane._bench_volume_item)
+
+
+@pytest.mark.skipif(not os.environ.get("SENTINEL_BENCH"), reason="set SENTINEL_BENCH=1 to run benchmarks")
+@pytest.mark.parametrize("count", [1_000, 10_000])
+def test_benchmark_volume_frame_time(count) -> None:
+    app = QApplication.instance() or QApplication([])
+    pane = _pane(10)
+    bars = _candles(count).to_numpy(dtype=np.float64).T
+    x, opens, closes, volumes = bars[0] / 1000.0, bars[1], bars[4], bars[5]
+    pane.vb_vol.setXRange(x[0], x[-1], padding=0.0)
+
+    def run(update, frames):
+        start = time.perf_counter()
+        for _ in range(frames):
+            volumes[-1] += 1.0
+            update()
+            pane.grab()
+        return (time.perf_counter() - start) / frames * 1000
+
+    pane._update_volume(np.empty(0), np.empty(0), np.empty(0, dtype=bool), 1.0)
+    # The old path makes one QPainter call per bar, and this PySide build leaks a
+    # reference to None on every such call, so only a couple of frames are safe.
+    before = run(lambda: _recreate_volume_item(pane, x, volumes, opens, closes, 43.2), max(2_000 // count, 1))
+    pane.vb_vol.removeItem(pane._bench_volume_item)
+    after = run(lambda: pane._update_volume(x, volumes, closes >= opens, 43.2), 20)
+
+    print(f"\n{count} bars  recreate {before:.2f}ms/frame | in place {after:.2f}ms/frame")
+    assert after < before
+    pane.close()
+    app.processEvents()
@@ -1,4 +1,12 @@
+import os
+import random
+import time
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
 from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.widgets.dom_widget import COL_ASK_QTY, COL_BID_QTY, COL_PRICE, DomDockWidget, DomLadderModel
 
 
 def test_build_dom_ladder_compacts_empty_tick_levels() -> None:
@@ -56,3 +64,81 @@ def test_build_dom_ladder_preserves_cumulative_values_for_populated_rows() -> No
     assert ask_rows[0]["ask_cum"] == 7.0
     assert bid_rows[0]["bid_cum"] == 1.0
     assert bid_rows[1]["bid_cum"] == 3.0
+
+
+def test_build_dom_ladder_columnar_matches_rows() -> None:
+    processor = OrderBookProcessor(price_precision=0.01)
+    raw_bids = [[100.00 - i * 0.01, 1.0 + i] for i in range(30)]
+    raw_asks = [[100.02 + i * 0.01, 2.0 + i] for i in range(30)]
+
+    rows = processor.build_dom_ladder(raw_bids, raw_asks, levels_per_side=10, current_price=100.01)["rows"]
+    columns = processor.build_dom_ladder(
+        raw_bids, raw_asks, levels_per_side=10, current_price=100.01, columnar=True
+    )["columns"]
+
+    assert len(columns) == len(rows) == 21
+    assert columns.to_rows() == rows
+    assert columns.price.tolist() == [row["price"] for row in rows]
+    assert columns.ask_cum.tolist() == [row["ask_cum"] for row in rows]
+
+
+def _ladder(processor, bids, asks, levels):
+    return processor.build_dom_ladder(bids, asks, levels_per_side=levels, current_price=100.01, columnar=True)["columns"]
+
+
+def test_dom_model_signals_only_changed_rows() -> None:
+    processor = OrderBookProcessor(price_precision=0.01)
+    bids = [[100.00 - i * 0.01, 1.0 + i] for i in range(30)]
+    asks = [[100.02 + i * 0.01, 2.0 + i] for i in range(30)]
+    model = DomLadderModel(rows=2 * 10 + 1)
+    changes = []
+    model.dataChanged.connect(lambda top, bottom: changes.append((top.row(), bottom.row())))
+
+    assert model.set_columns(_ladder(processor, bids, asks, 10)) == 21
+    assert model.data(model.index(10, COL_PRICE)) == "100.01 MID"
+    assert model.data(model.index(11, COL_BID_QTY)) == "1.0000"
+    assert model.data(model.index(11, COL_ASK_QTY)) == ""
+
+    changes.clear()
+    bids[2][1] = 0.25
+    assert model.set_columns(_ladder(processor, bids, asks, 10)) == 8
+    # The qty change at row 13 moves every cumulative total below it
+    assert changes == [(13, 20)]
+    assert model.data(model.index(13, COL_BID_QTY)) == "0.2500"
+
+    changes.clear()
+    assert model.set_columns(_ladder(processor, bids, asks, 10)) == 0
+    assert changes == []
+
+
+@pytest.mark.skipif(not os.environ.get("SENTINEL_BENCH"), reason="set SENTINEL_BENCH=1 to run benchmarks")
+def test_benchmark_dom_frame_time_with_hundreds_of_levels() -> None:
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(1)
+    levels = 250
+    dock = DomDockWidget(instance_id="dom_bench", runtime=None, levels=levels)
+    dock.resize(500, 900)
+    dock.show()
+    bids = {round(100 - i * 0.01, 2): rng.uniform(0.1, 3) for i in range(1, levels + 50)}
+    asks = {round(100 + i * 0.01, 2): rng.uniform(0.1, 3) for i in range(1, levels + 50)}
+
+    frames = 50
+    update = paint = 0.0
+    for _ in range(frames):
+        for side in (bids, asks):
+            for price in rng.sample(sorted(side), 10):
+                side[price] = rng.uniform(0.1, 3)
+        dock.last_orderbook = {"symbol": "BTC/USD", "bids": sorted(bids.items(), reverse=True), "asks": sorted(asks.items())}
+        dock._dirty = True
+        start = time.perf_counter()
+        dock._render_if_dirty()
+        middle = time.perf_counter()
+        # Full viewport repaint; a shown view only repaints the rows that changed
+        dock.table.viewport().grab()
+        update += middle - start
+        paint += time.perf_counter() - middle
+
+    print(f"\n{levels} levels/side  update {update / frames * 1000:.2f}ms  full repaint {paint / frames * 1000:.2f}ms")
+    assert (update + paint) / frames < 1 / 30
+    dock.close()
+    app.processEvents()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sentinel.core.data.ohlcv_buffer import OHLCV_COLUMNS, OHLCVBuffer
+
+
+def test_append_and_update_last_in_place():
+    buf = OHLCVBuffer(max_history=10, initial_capacity=2)
+    buf.append(60.0, 10.0, 10.0, 10.0, 10.0, 1.0)
+    view = buf.view()
+
+    buf.apply_trade_to_last(12.0, 0.5)
+    buf.apply_trade_to_last(9.0, 0.25)
+
+    # The earlier view shares memory with the live bar.
+    assert view[-1].tolist() == [60.0, 10.0, 12.0, 9.0, 9.0, 1.75]
+    assert buf.last_timestamp == 60.0
+    assert len(buf) == 1
+
+
+def test_max_history_evicts_oldest_and_keeps_old_views_valid():
+    buf = OHLCVBuffer(max_history=4, initial_capacity=1)
+    for i in range(4):
+        buf.append(float(i), i, i, i, i, 1.0)
+    snapshot = buf.view()
+
+    for i in range(4, 11):
+        buf.append(float(i), i, i, i, i, 1.0)
+
+    assert len(buf) == 4
+    assert buf.capacity <= 8
+    assert buf.column("dates").tolist() == [7.0, 8.0, 9.0, 10.0]
+    # Reallocation never overwrites memory behind an outstanding view.
+    assert snapshot[:, 0].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_to_frame_is_zero_copy_and_read_only():
+    buf = OHLCVBuffer(max_history=8)
+    buf.extend(np.arange(18, dtype=float).reshape(3, 6))
+
+    frame = buf.to_frame()
+    assert list(frame.columns) == OHLCV_COLUMNS
+    assert frame["dates"].dtype == np.int64
+    assert np.shares_memory(frame["closes"].to_numpy(), buf.view())
+    with pytest.raises(ValueError):
+        frame.iloc[0, 4] = -1.0
+
+    tail = buf.to_frame(last_n=1)
+    assert tail["dates"].tolist() == [12]
+
+
+def test_replace_keeps_loaded_history_and_caps_live_growth():
+    frame = pd.DataFrame(
+        {
+            "dates": [1, 2, 3],
+            "opens": [1.0, 2.0, 3.0],
+            "highs": [1.0, 2.0, 3.0],
+            "lows": [1.0, 2.0, 3.0],
+            "closes": [1.0, 2.0, 3.0],
+            "volumes": [5.0, 6.0, 7.0],
+            "exchange": ["binance"] * 3,
+        }
+    )
+    buf = OHLCVBuffer(max_history=2)
+    buf.replace(frame)
+    assert buf.column("dates").tolist() == [1.0, 2.0, 3.0]
+
+    # Live bars may add max_history rows on top of the load before eviction starts
+    for date in (4.0, 5.0, 6.0):
+        buf.append(date, 1.0, 1.0, 1.0, 1.0, 1.0)
+    assert buf.column("dates").tolist() == [2.0, 3.0, 4.0, 5.0, 6.0]
+
+    buf.replace(pd.DataFrame(columns=OHLCV_COLUMNS))
+    assert buf.empty
@@ -0,0 +1,200 @@
+import asyncio
+import random
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from sentinel.analysis.order_book_model import OrderBookModel
+from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.core.data.order_book_store import OrderBookStore
+from sentinel.core.signals import SignalEmitter, Signals
+from sentinel.core.stream_subscription import StreamSubscription
+from sentinel.core.task_manager import TaskManager
+
+
+def _random_book(rng, mid=100.0, depth=200):
+    bids = sorted({round(mid - rng.uniform(0.01, 20), 2) for _ in range(depth)}, reverse=True)
+    asks = sorted({round(mid + rng.uniform(0.01, 20), 2) for _ in range(depth)})
+    return (
+        [[p, round(rng.uniform(0.01, 5), 4)] for p in bids],
+        [[p, round(rng.uniform(0.01, 5), 4)] for p in asks],
+    )
+
+
+def _mutate(rng, book, changes=10):
+    """Change, drop and add a few levels of a [[price, qty], ...] side."""
+    levels = {p: q for p, q in book}
+    for price in rng.sample(sorted(levels), k=min(changes, len(levels))):
+        if rng.random() < 0.3:
+            del levels[price]
+        else:
+            levels[price] = round(rng.uniform(0.01, 5), 4)
+    return [[p, q] for p, q in levels.items()]
+
+
+def _reference(processor, side, descending):
+    return processor._vector_aggregate(np.asarray(side, dtype=np.float64), descending=descending)
+
+
+@pytest.mark.parametrize("tick", [0.01, 0.5, 2.0])
+def test_incremental_buckets_match_full_reaggregation(tick):
+    rng = random.Random(3)
+    processor = OrderBookProcessor(price_precision=0.01, initial_tick_size=tick)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    bids, asks = _random_book(rng)
+    model.apply_snapshot(bids, asks)
+    # Start tracking the tick before the updates so buckets are maintained incrementally
+    model.sides(tick, aggregate=True)
+
+    for _ in range(25):
+        bids, asks = _mutate(rng, bids), _mutate(rng, asks)
+        model.apply_snapshot(bids, asks)
+        model.apply_deltas(bids=[[bids[0][0], 0.0]])
+        bids = bids[1:]
+
+    (bid_prices, bid_qtys), (ask_prices, ask_qtys) = model.sides(tick, aggregate=True)
+    expected_bids = _reference(processor, bids, descending=True)
+    expected_asks = _reference(processor, asks, descending=False)
+    np.testing.assert_allclose(bid_prices, expected_bids[:, 0])
+    np.testing.assert_allclose(bid_qtys, expected_bids[:, 1])
+    np.testing.assert_allclose(ask_prices, expected_asks[:, 0])
+    np.testing.assert_allclose(ask_qtys, expected_asks[:, 1])
+
+
+def test_apply_snapshot_touches_only_changed_levels():
+    model = OrderBookModel("coinbase", "BTC/USD")
+    model.apply_snapshot([[99.0, 1.0], [98.0, 2.0]], [[101.0, 1.0], [102.0, 2.0]], nonce=1)
+    assert model.version == 1
+
+    changed = model.apply_snapshot([[99.0, 1.5], [98.0, 2.0]], [[101.0, 1.0], [103.0, 4.0]], nonce=2)
+
+    # 99 changed size, 102 was removed and 103 added
+    assert changed == 3
+    assert model.version == 2 and model.nonce == 2
+    assert model.asks.levels == {101.0: 1.0, 103.0: 4.0}
+
+    assert model.apply_snapshot([[99.0, 1.5], [98.0, 2.0]], [[101.0, 1.0], [103.0, 4.0]], nonce=3) == 0
+    assert model.version == 2
+
+
+def test_process_orderbook_from_model_matches_raw_path():
+    rng = random.Random(5)
+    processor = OrderBookProcessor(price_precision=0.01, initial_tick_size=0.25)
+    bids, asks = _random_book(rng)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    model.apply_snapshot(bids, asks)
+
+    for aggregate in (True, False):
+        processor.aggregation_enabled = aggregate
+        raw = processor.process_orderbook(bids, asks, current_price=100.0)
+        from_model = processor.process_orderbook(None, None, current_price=100.0, book=model)
+        np.testing.assert_allclose(from_model["bids_processed"], raw["bids_processed"])
+        np.testing.assert_allclose(from_model["asks_processed"], raw["asks_processed"])
+        assert from_model["best_bid"] == raw["best_bid"]
+        assert from_model["x_axis_limits"] == raw["x_axis_limits"]
+
+
+def test_store_keeps_one_model_per_market():
+    emitter = SignalEmitter()
+    store = OrderBookStore(emitter)
+    emitter.emit(
+        Signals.ORDER_BOOK_UPDATE,
+        exchange="coinbase",
+        orderbook={"symbol": "BTC/USD", "bids": [[99.0, 1.0]], "asks": [[101.0, 1.0]], "nonce": 7},
+    )
+
+    model = store.get("coinbase", "BTC/USD")
+    assert model is not None and model.nonce == 7
+    assert store.get("coinbase", "ETH/USD") is None
+
+    store.cleanup()
+    emitter.emit(
+        Signals.ORDER_BOOK_UPDATE,
+        exchange="coinbase",
+        orderbook={"symbol": "BTC/USD", "bids": [[99.0, 2.0]], "asks": [[101.0, 1.0]]},
+    )
+    assert store.get("coinbase", "BTC/USD") is None
+
+
+def test_stopping_an_order_book_stream_discards_its_book():
+    loop = asyncio.new_event_loop()
+    emitter = SignalEmitter()
+    store = OrderBookStore(emitter)
+    task_manager = TaskManager(data=MagicMock(), sec_fetcher=None, mode="external", loop=loop)
+    task_manager.order_books = store
+    for symbol in ("BTC/USD", "ETH/USD"):
+        emitter.emit(
+            Signals.ORDER_BOOK_UPDATE,
+            exchange="coinbase",
+            orderbook={"symbol": symbol, "bids": [[99.0, 1.0]], "asks": [[101.0, 1.0]]},
+        )
+        task_manager.stream_subscriptions[f"orderbook_coinbase_{symbol}"] = StreamSubscription()
+
+    task_manager._stop_stream("orderbook_coinbase_BTC/USD")
+
+    assert store.get("coinbase", "BTC/USD") is None
+    assert store.get("coinbase", "ETH/USD") is not None
+    store.cleanup()
+    loop.close()
+
+
+def test_processed_sides_are_shared_until_the_book_changes():
+    rng = random.Random(9)
+    bids, asks = _random_book(rng)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    model.apply_snapshot(bids, asks)
+    dom = OrderBookProcessor(price_precision=0.01, initial_tick_size=0.5)
+    ladder = OrderBookProcessor(price_precision=0.01, initial_tick_size=0.5)
+
+    dom.build_dom_ladder(None, None, levels_per_side=10, book=model)
+    ladder.build_visible_ladder(None, None, price_min=95.0, price_max=105.0, book=model)
+    assert (model.processed_misses, model.processed_hits) == (1, 1)
+
+    model.apply_snapshot(_mutate(rng, bids), asks)
+    dom.build_dom_ladder(None, None, levels_per_side=10, book=model)
+    assert model.processed_misses == 2
+
+
+@pytest.mark.parametrize("aggregate", [True, False])
+def test_ladders_from_model_match_raw_path(aggregate):
+    rng = random.Random(13)
+    bids, asks = _random_book(rng)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    model.apply_snapshot(bids, asks)
+    processor = OrderBookProcessor(price_precision=0.01, initial_tick_size=0.1)
+    processor.aggregation_enabled = aggregate
+
+    raw_dom = processor.build_dom_ladder(bids, asks, levels_per_side=15)
+    model_dom = processor.build_dom_ladder(None, None, levels_per_side=15, book=model)
+    assert len(model_dom["rows"]) == len(raw_dom["rows"])
+    for got, want in zip(model_dom["rows"], raw_dom["rows"]):
+        assert got["kind"] == want["kind"]
+        assert got["price"] == pytest.approx(want["price"])
+        assert got["bid_cum"] == pytest.approx(want["bid_cum"])
+        assert got["ask_cum"] == pytest.approx(want["ask_cum"])
+
+    raw_visible = processor.build_visible_ladder(bids, asks, price_min=97.0, price_max=103.0)
+    model_visible = processor.build_visible_ladder(None, None, price_min=97.0, price_max=103.0, book=model)
+    assert [row["kind"] for row in model_visible["rows"]] == [row["kind"] for row in raw_visible["rows"]]
+    assert [row["price"] for row in model_visible["rows"]] == pytest.approx([row["price"] for row in raw_visible["rows"]])
+    assert [row["total"] for row in model_visible["rows"]] == pytest.approx([row["total"] for row in raw_visible["rows"]])
+
+
+@pytest.mark.parametrize("aggregate", [True, False])
+def test_snapshot_matches_model_and_ignores_later_updates(aggregate):
+    rng = random.Random(21)
+    bids, asks = _random_book(rng)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    model.apply_snapshot(bids, asks)
+    snapshot = model.snapshot()
+    assert model.snapshot() is snapshot
+
+    expected = [side.copy() for side in model.processed(0.5, aggregate)]
+    for got, want in zip(snapshot.processed(0.5, aggregate), expected):
+        np.testing.assert_allclose(got, want)
+
+    model.apply_snapshot(_mutate(rng, bids), _mutate(rng, asks))
+    assert model.snapshot() is not snapshot
+    for got, want in zip(snapshot.processed(0.5, aggregate), expected):
+        np.testing.assert_allclose(got, want)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pyqtgraph as pg
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from sentinel.app.render_scheduler import render_scheduler
+from sentinel.widgets.orderbook_widget import OrderbookDockWidget
+
+
+def _book(levels, seed=0):
+    rng = np.random.default_rng(seed)
+    bids = np.column_stack([100.0 - 0.01 * np.arange(1, levels + 1), rng.uniform(0.1, 5.0, levels)])
+    asks = np.column_stack([100.0 + 0.01 * np.arange(1, levels + 1), rng.uniform(0.1, 5.0, levels)])
+    return {"symbol": "BTC/USD", "bids": bids.tolist(), "asks": asks.tolist()}
+
+
+def _dock():
+    dock = OrderbookDockWidget(instance_id="ob_test", runtime=None)
+    dock.resize(500, 400)
+    dock.show()
+    render_scheduler().unregister(dock)
+    return dock
+
+
+def _refresh(dock, book):
+    dock._on_order_book_update("coinbase", book)
+    dock._render_if_dirty()
+
+
+def test_depth_items_are_updated_in_place() -> None:
+    app = QApplication.instance() or QApplication([])
+    dock = _dock()
+    bids_bars, asks_bars = dock._bids_bars, dock._asks_bars
+    dock.processor.set_tick_size(0.01)
+
+    dock.agg_checkbox.setChecked(False)
+    for seed in range(3):
+        book = _book(200, seed)
+        _refresh(dock, book)
+    assert (dock._bids_bars, dock._asks_bars) == (bids_bars, asks_bars)
+    assert dock.plot.getPlotItem().items.count(bids_bars) == 1
+    assert bids_bars.isVisible() and asks_bars.isVisible()
+    heights = asks_bars.opts["height"]
+    assert np.allclose(np.sort(heights), np.sort([qty for price, qty in book["asks"][: len(heights)]]))
+    assert len(dock.bids_line.getData()[0] or []) == 0
+
+    # Aggregated depth switches to the cumulative lines and only hides the bars
+    dock.agg_checkbox.setChecked(True)
+    _refresh(dock, book)
+    assert not bids_bars.isVisible() and len(bids_bars.opts["x"]) == 0
+    x, cum = dock.asks_line.getData()
+    assert np.all(np.diff(x) > 0) and np.all(np.diff(cum) >= 0)
+
+    # Step mode draws filled cumulative steps whatever the aggregation setting
+    dock.agg_checkbox.setChecked(False)
+    dock.set_step_depth(True)
+    _refresh(dock, book)
+    assert not bids_bars.isVisible()
+    assert dock.bids_line.opts["stepMode"] == "right" and dock.bids_line.opts["fillLevel"] == 0.0
+    assert dock.export_definition()["config"]["step_depth"] is True
+
+    # Turning Step off goes back to plain lines, not step curves left over in the item opts
+    dock.set_step_depth(False)
+    dock.agg_checkbox.setChecked(True)
+    _refresh(dock, book)
+    assert not dock.bids_line.opts["stepMode"] and not dock.asks_line.opts["stepMode"]
+    assert dock.bids_line.opts["fillLevel"] is None
+    x, cum = dock.bids_line.getData()
+    assert len(x) == len(cum) > 0
+
+    dock.close()
+    app.processEvents()
+
+
+def _recreate_bars(dock, book):
+    """The previous per-frame path: nested lists, list columns and two new BarGraphItems."""
+    for item in getattr(dock, "_bench_bars", ()):
+        dock.plot.removeItem(item)
+    processed = dock.processor.process_orderbook(book["bids"], book["asks"])
+    bids, asks = processed["bids_processed"], processed["asks_processed"]
+    width = max(dock.processor.tick_size, 1e-9) * 0.85
+    dock._bench_bars = (
+        pg.BarGraphItem(x=[row[0] for row in bids], height=[row[1] for row in bids], width=width,
+                        brush=(40, 210, 120, 160), pen=pg.mkPen((40, 210, 120), width=1)),
+        pg.BarGraphItem(x=[row[0] for row in asks], height=[row[1] for row in asks], width=width,
+                        brush=(220, 80, 90, 160), pen=pg.mkPen((220, 80, 90), width=1)),
+    )
+    for item in dock._bench_bars:
+        dock.plot.addItem(item)
+
+
+@pytest.mark.skipif(not os.environ.get("SENTINEL_BENCH"), reason="set SENTINEL_BENCH=1 to run benchmarks")
+def test_benchmark_unaggregated_depth_frame_time() -> None:
+    app = QApplication.instance() or QApplication([])
+    dock = _dock()
+    dock.processor.set_tick_size(0.01)
+    dock.agg_checkbox.setChecked(False)
+    book = _book(2_000)
+    _refresh(dock, book)
+
+    def run(update, frames=10):
+        spent = 0.0
+        for _ in range(frames):
+            start = time.perf_counter()
+            update()
+            spent += time.perf_counter() - start
+            dock.grab()
+        return spent / frames * 1000
+
+    dock._clear_bars()
+    before = run(lambda: _recreate_bars(dock, book))
+    for item in dock._bench_bars:
+        dock.plot.removeItem(item)
+    after = run(lambda: (dock._on_order_book_update("coinbase", book), dock._render_if_dirty()))
+    dock.set_step_depth(True)
+    step = run(lambda: (dock._on_order_book_update("coinbase", book), dock._render_if_dirty()))
+
+    print(f"\n2000 levels  update: recreate {before:.2f}ms | in place {after:.2f}ms | step {step:.2f}ms")
+    assert after < before
+    dock.close()
+    app.processEvents()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sentinel.analysis.order_book_model import OrderBookModel
+from sentinel.analysis.orderbook_processor import OrderBookProcessor
+from sentinel.analysis.orderbook_worker import OrderBookComputeWorker, SnapshotBuffer
+
+
+def test_snapshot_buffer_counts_results_replaced_before_they_were_taken() -> None:
+    buffer = SnapshotBuffer()
+    assert buffer.take() is None
+
+    buffer.publish(1)
+    buffer.publish(2)
+    assert buffer.ready
+    assert buffer.take() == 2
+    assert not buffer.ready and buffer.take() is None
+    assert (buffer.published, buffer.taken, buffer.dropped) == (2, 1, 1)
+
+
+def test_worker_keeps_one_job_in_flight_and_only_the_latest_pending() -> None:
+    release = threading.Event()
+    finished = threading.Event()
+
+    def job(value):
+        if value == 0:
+            release.wait(5)
+        if value == 3:
+            finished.set()
+        return value
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        worker = OrderBookComputeWorker(executor)
+        for value in range(4):
+            worker.submit(job, value)
+        # 1 and 2 were replaced while 0 was still running
+        assert worker.superseded == 2
+        release.set()
+        assert finished.wait(5)
+        executor.shutdown(wait=True)
+
+    assert worker.take() == 3
+    assert worker.stats() == {"submitted": 4, "completed": 2, "superseded": 2, "dropped": 1, "failed": 0}
+
+
+def test_offloaded_ladder_matches_the_synchronous_build() -> None:
+    rng = random.Random(5)
+    model = OrderBookModel("coinbase", "BTC/USD")
+    bids = [[round(100 - 0.01 * i, 2), rng.uniform(0.1, 3)] for i in range(1, 500)]
+    asks = [[round(100 + 0.01 * i, 2), rng.uniform(0.1, 3)] for i in range(1, 500)]
+    model.apply_snapshot(bids, asks)
+    processor = OrderBookProcessor(price_precision=0.01, initial_tick_size=0.05)
+    expected = processor.build_dom_ladder(None, None, 20, 100.0, book=model, columnar=True)
+
+    done = threading.Event()
+
+    def build(book):
+        try:
+            return processor.build_dom_ladder(None, None, 20, 100.0, book=book, columnar=True)
+        finally:
+            done.set()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker = OrderBookComputeWorker(executor)
+        worker.submit(build, model.snapshot())
+        # The live book moving on does not touch the queued snapshot
+        model.apply_deltas(bids=[[bids[0][0], 0.0]])
+        assert done.wait(5)
+        executor.shutdown(wait=True)
+
+    result = worker.take()
+    assert (result["best_bid"], result["best_ask"]) == (expected["best_bid"], expected["best_ask"])
+    for name in ("price", "bid_qty", "bid_cum", "ask_qty", "ask_cum", "kind"):
+        np.testing.assert_allclose(getattr(result["columns"], name), getattr(expected["columns"], name))
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+
+from PySide6.QtCore import QEvent
+from PySide6.QtWidgets import QApplication, QWidget
+
+from sentinel.app.render_scheduler import RenderScheduler
+
+
+class _Pane(QWidget):
+    def __init__(self, log, name, cost_ms=0.0):
+        super().__init__()
+        self.log = log
+        self.name = name
+        self.cost_ms = cost_ms
+        self.dirty = True
+        self.resize(50, 50)
+
+    def render(self):
+        self.log.append(self.name)
+        self.dirty = False
+        time.sleep(self.cost_ms / 1000.0)
+
+
+def test_scheduler_skips_hidden_and_clean_widgets_and_records_times() -> None:
+    app = QApplication.instance() or QApplication([])
+    scheduler = RenderScheduler(budget_ms=50.0)
+    log = []
+    shown, hidden = _Pane(log, "shown", cost_ms=1.0), _Pane(log, "hidden")
+    shown.show()
+    for pane in (shown, hidden):
+        scheduler.register(pane, pane.render, name=pane.name, is_dirty=lambda pane=pane: pane.dirty)
+
+    assert scheduler.tick() == 1
+    assert scheduler.tick() == 0  # nothing dirty any more
+    assert log == ["shown"]
+    stats = scheduler.stats()
+    assert stats["shown"]["renders"] == 1 and stats["shown"]["histogram"]["<2ms"] == 1
+    assert stats["hidden"]["skipped_hidden"] == 2
+
+    hidden.show()
+    scheduler.tick()
+    assert log == ["shown", "hidden"]
+
+    shown.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    assert [target.name for target in scheduler.targets()] == ["hidden"]
+    scheduler.unregister(hidden)
+    hidden.close()
+    app.processEvents()
+
+
+def test_scheduler_spends_frame_budget_by_priority_then_staleness() -> None:
+    app = QApplication.instance() or QApplication([])
+    scheduler = RenderScheduler(budget_ms=4.0)
+    log = []
+    panes = [_Pane(log, name, cost_ms=5.0) for name in ("a", "b", "urgent")]
+    for pane in panes:
+        pane.show()
+        scheduler.register(pane, pane.render, name=pane.name, priority=1 if pane.name == "urgent" else 0)
+
+    # Over budget after one render: the rest waits and is the stalest on the next frames
+    assert scheduler.tick() == 1
+    assert scheduler.tick() == 1
+    assert scheduler.tick() == 1
+    assert log == ["urgent", "a", "b"]
+    assert scheduler.stats()["b"]["deferred"] == 2
+    assert scheduler.over_budget_frames == 3
+
+    # A frame rate cap keeps a widget out until its interval has passed
+    capped = scheduler.register(panes[0], panes[0].render, name="a", fps=1)
+    capped.last_run = time.perf_counter()
+    scheduler.tick()
+    scheduler.tick()
+    assert log[3:] == ["urgent", "b"]
+
+    for pane in panes:
+        scheduler.unregister(pane)
+        pane.close()
+    app.processEvents()
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+
+from sentinel.core.signals import SignalEmitter, Signals
+
+
+def test_keyed_trade_dispatch_reaches_only_matching_market():
+    emitter = SignalEmitter()
+    btc, eth, broadcast = [], [], []
+    emitter.register_keyed(Signals.NEW_TRADE, ("coinbase", "BTC/USD"), lambda exchange, trade_data: btc.append(trade_data))
+    emitter.register_keyed(Signals.NEW_TRADE, ("coinbase", "ETH/USD"), lambda exchange, trade_data: eth.append(trade_data))
+    emitter.register(Signals.NEW_TRADE, lambda exchange, trade_data: broadcast.append(trade_data))
+
+    emitter.emit(Signals.NEW_TRADE, exchange="coinbase", trade_data={"symbol": "BTC/USD", "price": 1.0})
+    emitter.emit(Signals.NEW_TRADE, exchange="kraken", trade_data={"symbol": "BTC/USD", "price": 2.0})
+
+    assert [t["price"] for t in btc] == [1.0]
+    assert eth == []
+    assert len(broadcast) == 2
+    # One skipped for the coinbase BTC trade (ETH listener), two for the kraken trade.
+    assert emitter.skipped_callback_counts() == {"NEW_TRADE": 3}
+
+
+def test_keyed_dispatch_falls_back_to_all_listeners_without_symbol():
+    emitter = SignalEmitter()
+    seen = []
+    emitter.register_keyed(Signals.ORDER_BOOK_UPDATE, ("coinbase", "BTC/USD"), lambda exchange, orderbook: seen.append("btc"))
+    emitter.register_keyed(Signals.ORDER_BOOK_UPDATE, ("coinbase", "ETH/USD"), lambda exchange, orderbook: seen.append("eth"))
+
+    emitter.emit(Signals.ORDER_BOOK_UPDATE, exchange="coinbase", orderbook={"bids": [], "asks": []})
+
+    assert sorted(seen) == ["btc", "eth"]
+
+
+def test_unregister_keyed_stops_delivery():
+    emitter = SignalEmitter()
+    seen = []
+
+    def handler(exchange, symbol, ticker_data_dict):
+        seen.append(symbol)
+
+    emitter.register_keyed(Signals.NEW_TICKER_DATA, ("coinbase", "BTC/USD"), handler)
+    emitter.emit(Signals.NEW_TICKER_DATA, exchange="coinbase", symbol="BTC/USD", ticker_data_dict={})
+    emitter.unregister_keyed(Signals.NEW_TICKER_DATA, ("coinbase", "BTC/USD"), handler)
+    emitter.emit(Signals.NEW_TICKER_DATA, exchange="coinbase", symbol="BTC/USD", ticker_data_dict={})
+
+    assert seen == ["BTC/USD"]
+
+
+def test_register_keyed_rejects_unroutable_signal():
+    emitter = SignalEmitter()
+    with pytest.raises(ValueError):
+        emitter.register_keyed(Signals.NEW_CANDLES, ("coinbase", "BTC/USD"), lambda **_: None)
+
+
+def _run_one_iteration(loop):
+    loop.run_until_complete(asyncio.sleep(0))
+
+
+def test_batched_delivery_coalesces_order_books_per_market():
+    loop = asyncio.new_event_loop()
+    try:
+        emitter = SignalEmitter()
+        emitter.enable_batching()
+        books, trades = [], []
+        emitter.register(Signals.ORDER_BOOK_UPDATE, lambda exchange, orderbook: books.append(orderbook["nonce"]))
+        emitter.register(Signals.NEW_TRADE, lambda events: trades.append([e["trade_data"]["id"] for e in events]), batched=True)
+
+        for nonce in range(3):
+            emitter.emit_threadsafe(loop, Signals.ORDER_BOOK_UPDATE, exchange="coinbase", orderbook={"symbol": "BTC/USD", "nonce": nonce})
+            emitter.emit_threadsafe(loop, Signals.ORDER_BOOK_UPDATE, exchange="coinbase", orderbook={"symbol": "ETH/USD", "nonce": 10 + nonce})
+            emitter.emit_threadsafe(loop, Signals.NEW_TRADE, exchange="coinbase", trade_data={"symbol": "BTC/USD", "id": nonce})
+
+        # Nothing is delivered until the loop drains the buffer
+        assert books == [] and trades == []
+        _run_one_iteration(loop)
+
+        assert books == [2, 12]
+        assert trades == [[0, 1, 2]]
+        assert emitter.batch_stats == {"events": 9, "drains": 1, "coalesced": 4}
+    finally:
+        loop.close()
+
+
+def test_batched_delivery_from_background_thread_uses_one_drain():
+    loop = asyncio.new_event_loop()
+    try:
+        emitter = SignalEmitter()
+        emitter.enable_batching(coalesce=())
+        seen = []
+        emitter.register(Signals.NEW_TRADE, lambda exchange, trade_data: seen.append((threading.get_ident(), trade_data["id"])))
+
+        def produce():
+            for i in range(50):
+                emitter.emit_threadsafe(loop, Signals.NEW_TRADE, exchange="coinbase", trade_data={"symbol": "BTC/USD", "id": i})
+
+        worker = threading.Thread(target=produce)
+        worker.start()
+        worker.join()
+        _run_one_iteration(loop)
+
+        assert [i for _, i in seen] == list(range(50))
+        assert {tid for tid, _ in seen} == {threading.get_ident()}
+        assert emitter.batch_stats["drains"] == 1
+    finally:
+        loop.close()
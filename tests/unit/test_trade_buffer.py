@@ -0,0 +1,32 @@
+import numpy as np
+
+from sentinel.core.data.trade_buffer import SIDE_BUY, SIDE_SELL, TradeBuffer, aggregate_trades
+
+
+def test_buffer_keeps_the_newest_trades_in_order():
+    buf = TradeBuffer(capacity=3)
+    for i in range(10):
+        buf.append(float(i), 100.0 + i, 1.0, SIDE_BUY)
+    buf.append_trade({"timestamp": 10_000, "price": 50.0, "amount": None, "side": "sell"})
+
+    ts, prices, amounts, sides = buf.columns()
+    assert len(buf) == 3
+    assert ts.tolist() == [8.0, 9.0, 10.0]
+    assert prices.tolist() == [108.0, 109.0, 50.0]
+    assert amounts[-1] == 0.0 and sides[-1] == SIDE_SELL
+    assert not ts.flags.writeable
+
+
+def test_aggregate_trades_merges_by_time_price_and_side():
+    ts = np.array([0.0, 10.0, 20.0, 70.0, 5.0])
+    prices = np.array([100.0, 100.2, 100.1, 100.0, 100.0])
+    amounts = np.array([1.0, 3.0, 0.0, 2.0, 4.0])
+    sides = np.array([SIDE_BUY, SIDE_BUY, SIDE_BUY, SIDE_BUY, SIDE_SELL])
+
+    out_ts, out_prices, out_amounts, out_sides = aggregate_trades(ts, prices, amounts, sides, 60.0, 1.0)
+
+    assert len(out_ts) == 3
+    assert out_amounts.sum() == amounts.sum()
+    merged = np.flatnonzero((out_sides == SIDE_BUY) & (out_ts < 60.0))[0]
+    assert out_amounts[merged] == 4.0
+    assert np.isclose(out_prices[merged], (100.0 * 1 + 100.2 * 3) / 4)